@@ -0,0 +1,122 @@
+"""
+Project: IoT Smart Home
+File: bench_db_queries.py
+Description:
+Benchmark for the indexed, partitioned device_readings schema.
+Seeds the table up to a target row count (10M by default) spread over several months
+and many devices, then times the DBClient query APIs that rely on the indexes.
+
+Usage (MySQL from docker-compose must be running):
+    python -m iot_app.app.benchmarks.bench_db_queries --rows 10000000
+    python -m iot_app.app.benchmarks.bench_db_queries --skip-seed --repeat 20
+"""
+
+import argparse
+import random
+import statistics
+import time
+from datetime import datetime, timedelta
+
+from iot_app.app.core.db_client import DBClient, INSERT_QUERIES
+from iot_app.app.utils.logger import set_console_level
+
+METRICS = {"dht": ["temperature", "humidity"], "light": ["lux"], "motion": ["motion"]}
+
+
+def seed(db: DBClient, rows: int, devices: int, days: int, chunk: int = 20_000):
+    """
+    Insert synthetic readings until device_readings holds at least `rows` rows.
+
+    Args:
+        db (DBClient): Connected client.
+        rows (int): Target table size.
+        devices (int): Number of distinct devices per type.
+        days (int): Time span covered by the data, ending now.
+        chunk (int): Rows per executemany/commit.
+    """
+    with db.connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT COUNT(*) FROM device_readings")
+        existing = cursor.fetchone()[0]
+        missing = rows - existing
+        print(f"device_readings has {existing:,} rows, inserting {max(missing, 0):,}")
+
+        end = datetime.now()
+        span = days * 86400
+        started = time.perf_counter()
+        inserted = 0
+        while inserted < missing:
+            batch = []
+            for _ in range(min(chunk, missing - inserted)):
+                device_type = random.choice(list(METRICS))
+                device_id = f"room{random.randint(1, 10)}/{device_type}/{random.randint(1, devices)}"
+                ts = end - timedelta(seconds=random.random() * span)
+                batch.append((device_id, device_type, random.choice(METRICS[device_type]), random.random() * 100, ts))
+            cursor.executemany(INSERT_QUERIES["device_readings"], batch)
+            conn.commit()
+            inserted += len(batch)
+            if inserted % 1_000_000 < chunk:
+                rate = inserted / (time.perf_counter() - started)
+                print(f"  {inserted:,} rows ({rate:,.0f} rows/s)")
+        cursor.close()
+
+
+def timed(label: str, repeat: int, fn):
+    """
+    Run a query function `repeat` times and print median and max latency.
+    """
+    samples = []
+    rows = 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        rows = len(fn())
+        samples.append((time.perf_counter() - started) * 1000)
+    print(f"{label:<48} median {statistics.median(samples):8.2f} ms   max {max(samples):8.2f} ms   ({rows:,} rows)")
+
+
+def main(argv=None):
+    """
+    Seed the table (unless skipped) and time the indexed query paths.
+    """
+    parser = argparse.ArgumentParser(description="device_readings query latency benchmark")
+    parser.add_argument("--rows", type=int, default=10_000_000, help="target row count")
+    parser.add_argument("--devices", type=int, default=200, help="devices per type and room")
+    parser.add_argument("--days", type=int, default=120, help="days of history to spread rows over")
+    parser.add_argument("--repeat", type=int, default=10, help="runs per query")
+    parser.add_argument("--skip-seed", action="store_true", help="use the existing table contents")
+    args = parser.parse_args(argv)
+
+    set_console_level("WARNING")
+    db = DBClient()
+    db.connect()
+    if not db.is_connected:
+        print("MySQL is not reachable — start it with docker-compose first.")
+        return
+
+    if not args.skip_seed:
+        seed(db, args.rows, args.devices, args.days)
+        with db.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("ANALYZE TABLE device_readings")
+            cursor.fetchall()
+            cursor.close()
+
+    now = datetime.now()
+    device = "room1/dht/1"
+    timed("latest 100 readings (ORDER BY id DESC)", args.repeat, lambda: db.fetch_latest_readings(100))
+    timed("fetch_range 1 device, last hour", args.repeat,
+          lambda: db.fetch_range(device, now - timedelta(hours=1), now))
+    timed("fetch_range 1 device+metric, last 7 days", args.repeat,
+          lambda: db.fetch_range(device, now - timedelta(days=7), now, metric="temperature"))
+    timed("fetch_range 1 device, last 30 days", args.repeat,
+          lambda: db.fetch_range(device, now - timedelta(days=30), now))
+    timed("fetch_latest_per_device (dht, last day)", args.repeat,
+          lambda: db.fetch_latest_per_device("dht", since=now - timedelta(days=1)))
+    timed("fetch_latest_per_device (all)", max(1, args.repeat // 5),
+          lambda: db.fetch_latest_per_device())
+    print(f"pool: {db.get_pool_stats()}")
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
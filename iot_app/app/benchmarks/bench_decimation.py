@@ -0,0 +1,45 @@
+"""
+Project: IoT Smart Home
+File: bench_decimation.py
+Description:
+Benchmark of the live chart data path: reading a window from a TimeSeriesStore ring buffer
+and reducing it with decimate_minmax() to the plot width, for growing sample counts.
+The decimated output stays at about two points per pixel regardless of the input size.
+
+Usage:
+    python -m iot_app.app.benchmarks.bench_decimation --width 700
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from iot_app.app.core.timeseries import TimeSeriesStore, decimate_minmax
+
+
+def main(argv=None):
+    """
+    Fill series of increasing length and time window read + decimation.
+    """
+    parser = argparse.ArgumentParser(description="Ring buffer window + min/max decimation benchmark")
+    parser.add_argument("--width", type=int, default=700, help="plot width in pixels (decimation bins)")
+    parser.add_argument("--repeat", type=int, default=20, help="measurements per size")
+    args = parser.parse_args(argv)
+
+    for size in (1_000, 10_000, 100_000, 1_000_000):
+        history = TimeSeriesStore(capacity=size)
+        values = np.random.default_rng(0).normal(20.0, 2.0, size)
+        for i in range(size):
+            history.append("dht", float(i), {"temperature": values[i]})
+
+        started = time.perf_counter()
+        for _ in range(args.repeat):
+            t, v = history.window("dht", "temperature")
+            points = len(decimate_minmax(t, v, args.width)[0])
+        elapsed_ms = (time.perf_counter() - started) * 1000 / args.repeat
+        print(f"{size:>9,} samples → {points:>5,} points  {elapsed_ms:>7.2f} ms per refresh")
+
+
+if __name__ == "__main__":
+    main()
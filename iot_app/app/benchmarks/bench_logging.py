@@ -0,0 +1,105 @@
+"""
+Project: IoT Smart Home
+File: bench_logging.py
+Description:
+Benchmark for per-publish logging overhead.
+Compares the original pattern (an eagerly built f-string logged on every publish)
+with the get_logger() facade (lazy formatting, level gates, rate limiting and sampling).
+Sinks are configured like the app: colored console, rotating file and the GUI sink;
+console output is redirected to os.devnull so the terminal does not skew results.
+
+Usage:
+    python -m iot_app.app.benchmarks.bench_logging --calls 20000
+"""
+
+import argparse
+import os
+import sys
+import time
+
+from iot_app.app.utils.logger import (
+    logger, get_logger, set_console_level, set_subsystem_level, add_gui_sink
+)
+
+TOPIC = "Home/kitchen/dht/42"
+PAYLOAD = '{"temperature": "23.4 °C", "humidity": "51.2 %"}'
+
+
+def measure(label: str, calls: int, fn, baseline_ns=0.0):
+    """
+    Call fn(i) `calls` times and print the mean cost per call.
+
+    Returns:
+        float: Mean nanoseconds per call.
+    """
+    started = time.perf_counter_ns()
+    for i in range(calls):
+        fn(i)
+    per_call = (time.perf_counter_ns() - started) / calls
+    overhead = f"(+{per_call - baseline_ns:,.0f} ns logging)" if baseline_ns else ""
+    print(f"{label:<52} {per_call:>10,.0f} ns/publish {overhead}", file=sys.__stdout__)
+    return per_call
+
+
+def main(argv=None):
+    """
+    Run every logging variant and print the per-publish cost.
+    """
+    parser = argparse.ArgumentParser(description="Per-publish logging overhead benchmark")
+    parser.add_argument("--calls", type=int, default=20_000, help="publishes per variant")
+    args = parser.parse_args(argv)
+
+    sys.stdout = open(os.devnull, "w", encoding="utf-8")
+    set_console_level("DEBUG")
+    sink = add_gui_sink(capacity=args.calls * 2)
+    log = get_logger("bench", "MQTT")
+    counter = {"n": 0}
+
+    def publish(i):
+        counter["n"] += 1
+
+    base = measure("no logging", args.calls, publish)
+
+    # ===== Before: original f-string logging =====
+    def eager_info(i):
+        publish(i)
+        logger.info(f"[MQTT] Published to '{TOPIC}': {PAYLOAD} #{i}")
+    measure("before: logger.info(f-string), all sinks", args.calls, eager_info, base)
+    sink.clear()
+
+    set_console_level("INFO")
+
+    def eager_debug(i):
+        publish(i)
+        logger.debug(f"[MQTT] Published to '{TOPIC}': {PAYLOAD} #{i}")
+    measure("before: logger.debug(f-string), DEBUG filtered", args.calls, eager_debug, base)
+
+    # ===== After: facade =====
+    def lazy_debug(i):
+        publish(i)
+        log.debug("Published to '{}': {} #{}", TOPIC, PAYLOAD, i)
+    measure("after: facade debug, DEBUG filtered", args.calls, lazy_debug, base)
+
+    set_subsystem_level("bench", "WARNING")
+
+    def gated_info(i):
+        publish(i)
+        log.info("Published to '{}': {} #{}", TOPIC, PAYLOAD, i)
+    measure("after: facade info, subsystem gated at WARNING", args.calls, gated_info, base)
+
+    set_subsystem_level("bench", None)
+
+    def limited_info(i):
+        publish(i)
+        log.rate_limited(1.0, "INFO", "Published to '{}': {} #{}", TOPIC, PAYLOAD, i)
+    measure("after: facade rate_limited(1s) info, all sinks", args.calls, limited_info, base)
+
+    def sampled_info(i):
+        publish(i)
+        log.sampled(100, "INFO", "Published to '{}': {} #{}", TOPIC, PAYLOAD, i)
+    measure("after: facade sampled(1/100) info, all sinks", args.calls, sampled_info, base)
+    sink.clear()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Project: IoT Smart Home
+File: bench_payload_codec.py
+Description:
+Benchmark comparing the JSON/text emulator payloads with the compact binary encoding.
+Reports bytes on the wire per message and the CPU cost of encoding on the emulator side
+and decoding on the listener side (down to the (active, reading) pair shown in the GUI).
+
+Usage:
+    python -m iot_app.app.benchmarks.bench_payload_codec --messages 100000
+"""
+
+import argparse
+import time
+
+from iot_app.app.core.payload_codec import decode_payload, encode_batch, decode_batch
+from iot_app.app.emulators.dht_emulator import DHTEmulator
+from iot_app.app.emulators.light_emulator import LightEmulator
+from iot_app.app.emulators.motion_emulator import MotionEmulator
+from iot_app.app.mqtt_listener import PAYLOAD_PARSERS
+
+
+def per_call_ns(fn, count: int) -> float:
+    """
+    Call fn() `count` times and return the mean nanoseconds per call.
+    """
+    started = time.perf_counter_ns()
+    for _ in range(count):
+        fn()
+    return (time.perf_counter_ns() - started) / count
+
+
+def bench_device(emulator, count: int):
+    """
+    Compare both encodings for one emulator's current value and print a report line.
+    """
+    device_type = emulator.device_type
+    text = emulator.build_payload()
+    binary = emulator.build_binary_payload()
+    text_parser = PAYLOAD_PARSERS[device_type]
+
+    def decode_binary():
+        return decode_payload(binary)[1]
+
+    encode_json = per_call_ns(emulator.build_payload, count)
+    encode_bin = per_call_ns(emulator.build_binary_payload, count)
+    decode_json = per_call_ns(lambda: text_parser(text), count)
+    decode_bin = per_call_ns(decode_binary, count)
+
+    print(f"{device_type:<7} json {len(text.encode()):>3} B  enc {encode_json:>6,.0f} ns  dec {decode_json:>6,.0f} ns | "
+          f"binary {len(binary):>2} B  enc {encode_bin:>6,.0f} ns  dec {decode_bin:>6,.0f} ns")
+
+
+def main(argv=None):
+    """
+    Generate a value for each sensor type and compare the encodings.
+    """
+    parser = argparse.ArgumentParser(description="JSON vs binary payload benchmark")
+    parser.add_argument("--messages", type=int, default=100_000, help="encode/decode calls per measurement")
+    args = parser.parse_args(argv)
+
+    emulators = []
+    for cls in (DHTEmulator, LightEmulator, MotionEmulator):
+        emulator = cls(None, None)
+        emulator.generate_value()
+        bench_device(emulator, args.messages)
+        emulators.append(emulator)
+
+    # One window of 1000 devices: per-message publishes vs a single batch frame
+    dht = emulators[0]
+    entries = [(f"Home/room1/dht/{i}", dht.build_binary_payload()) for i in range(1000)]
+    frame = encode_batch(entries)
+    unpack = per_call_ns(lambda: decode_batch(frame), max(1, args.messages // 1000))
+    print(f"batch   {len(entries)} msgs → 1 frame of {len(frame):,} B "
+          f"(payloads {sum(len(p) for _, p in entries):,} B), unpack {unpack / 1000:,.0f} µs")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,23 +4,70 @@ File: db_client.py
 Description:
 MySQL client module using mysql-connector-python.
 Handles connection to Dockerized MySQL database and provides read/write operations.
+Sensor inserts are queued and written in batches by a background writer thread.
+All database access goes through a bounded connection pool with checkout timeouts.
 """
 
+import itertools
+import math
+import queue
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import date
 import mysql.connector
-from iot_app.app.utils.logger import logger
+from mysql.connector import pooling
+from iot_app.app.utils.logger import logger, get_logger
+
+_log = get_logger("db", "DB")
+
+# ==================== Write-Behind Queue Settings ====================
+
+INSERT_QUERIES = {
+    "device_data": "INSERT INTO device_data (device_type, value, timestamp) VALUES (%s, %s, %s)",
+    "device_readings": "INSERT INTO device_readings (device_id, device_type, metric, value, ts) "
+                       "VALUES (%s, %s, %s, %s, %s)",
+}
+
+_STOP = object()
+_POOL_IDS = itertools.count(1)
+
+# Tables partitioned by month, mapped to their partitioning column
+PARTITIONED_TABLES = {
+    "device_data": "timestamp",
+    "device_readings": "ts",
+}
+
+# Rollup tables of device_readings, finest first: table → (bucket seconds, bucket expression on ts)
+ROLLUP_TABLES = {
+    "device_readings_1m": (60, "DATE_ADD(DATE(ts), INTERVAL HOUR(ts) * 60 + MINUTE(ts) MINUTE)"),
+    "device_readings_1h": (3600, "DATE_ADD(DATE(ts), INTERVAL HOUR(ts) HOUR)"),
+    "device_readings_1d": (86400, "DATE(ts)"),
+}
 
 
 class DBClient:
     """
     MySQL client wrapper for IoT sensor data handling.
     Supports connection, reconnection, insertion, fetching, and testing.
+    Inserts go through a write-behind queue drained by a background writer thread,
+    and every operation checks a connection out of a bounded pool.
     """
     def __init__(self,
                  host="localhost",
                  port=3307,
                  user="iotuser",
                  password="iotpass",
-                 database="iot_data"):
+                 database="iot_data",
+                 batch_size=500,
+                 flush_interval_ms=1000,
+                 max_queue_size=20000,
+                 enqueue_timeout_ms=50,
+                 max_retry_rows=20000,
+                 pool_size=5,
+                 checkout_timeout=5.0,
+                 max_idle_secs=300):
         """
         Initialize the DB client with connection parameters.
 
@@ -30,22 +77,73 @@ class DBClient:
             user (str): MySQL username.
             password (str): MySQL password.
             database (str): Database name to connect to.
+            batch_size (int): Maximum rows written by a single flush.
+            flush_interval_ms (int): Maximum time a queued row waits before being flushed.
+            max_queue_size (int): Capacity of the write-behind queue.
+            enqueue_timeout_ms (int): How long an insert may block on a full queue before it is dropped.
+            max_retry_rows (int): Rows of failed batches kept for the next flush; the oldest are dropped beyond it.
+            pool_size (int): Number of pooled connections.
+            checkout_timeout (float): Seconds to wait for a free pooled connection.
+            max_idle_secs (float): Connections idle longer than this are recycled on checkout.
         """
         self.host = host
         self.port = port
         self.user = user
         self.password = password
         self.database = database
-        self.conn = None
+        self.pool = None
+        self.pool_size = pool_size
+        self.checkout_timeout = checkout_timeout
+        self.max_idle_secs = max_idle_secs
+
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval_ms / 1000
+        self.enqueue_timeout = enqueue_timeout_ms / 1000
+        self.max_retry_rows = max_retry_rows
+
+        self._pool_slots = threading.BoundedSemaphore(pool_size)
+        self._idle_since = {}
+        self._pool_lock = threading.Lock()
+        self._pool_waits_ms = deque(maxlen=1000)
+        self._pool_stats = {
+            "checkouts": 0,
+            "in_use": 0,
+            "timeouts": 0,
+            "recycled": 0,
+            "health_failures": 0,
+            "max_wait_ms": 0.0,
+        }
+
+        self._write_queue = queue.Queue(maxsize=max_queue_size)
+        self._writer_thread = None
+        # Rows of failed batches, retried ahead of the next batch (writer thread only)
+        self._retry_rows = deque()
+        self._unwritten_at_stop = 0
+        self._stats_lock = threading.Lock()
+        self._write_stats = {
+            "enqueued": 0,
+            "written": 0,
+            "failed": 0,
+            "dropped": 0,
+            "retry_dropped": 0,
+            "backpressure_events": 0,
+            "flushes": 0,
+            "last_flush_ms": 0.0,
+            "max_flush_ms": 0.0,
+            "total_flush_ms": 0.0,
+        }
 
     def connect(self):
         """
-        Establish connection to the MySQL database.
+        Create the connection pool for the MySQL database.
         Uses mysql_native_password authentication.
         """
         try:
-            logger.info(f"[DB] Connecting to MySQL at {self.host}:{self.port}...")
-            self.conn = mysql.connector.connect(
+            logger.info(f"[DB] Connecting to MySQL at {self.host}:{self.port} (pool of {self.pool_size})...")
+            self.pool = pooling.MySQLConnectionPool(
+                pool_name=f"iot_pool_{next(_POOL_IDS)}",
+                pool_size=self.pool_size,
+                pool_reset_session=False,
                 host=self.host,
                 port=self.port,
                 user=self.user,
@@ -53,8 +151,10 @@ class DBClient:
                 database=self.database,
                 auth_plugin="mysql_native_password"
             )
-            if self.conn.is_connected():
-                logger.success("[DB] Connected to MySQL database ✔")
+            self._idle_since.clear()
+            logger.success("[DB] Connected to MySQL database ✔")
+            self.ensure_partitions()
+            self._start_writer()
         except mysql.connector.InterfaceError as e:
             logger.error(f"[DB] InterfaceError: {e}")
         except mysql.connector.DatabaseError as e:
@@ -64,42 +164,365 @@ class DBClient:
 
     def reconnect(self):
         """
-        Reconnect to the database after closing any existing connection.
+        Rebuild the connection pool after closing any idle pooled connections.
+        """
+        self._close_pool()
+        self.connect()
+
+    @property
+    def is_connected(self):
+        """
+        Check if the connection pool has been created.
+
+        Returns:
+            bool: True if a pool exists.
         """
+        return self.pool is not None
+
+    # ==================== Connection Pool ====================
+
+    @contextmanager
+    def connection(self, timeout=None):
+        """
+        Check a connection out of the pool for the duration of a with-block.
+        Waits up to `timeout` for a free slot; connections idle longer than
+        max_idle_secs are recycled before use. The pool itself re-validates
+        each connection on checkout and reconnects dead ones.
+
+        Args:
+            timeout (float): Seconds to wait for a free connection (defaults to checkout_timeout).
+
+        Yields:
+            PooledMySQLConnection: A live connection, returned to the pool on exit.
+
+        Raises:
+            mysql.connector.errors.PoolError: If no pool exists or no connection became free in time.
+        """
+        pool = self.pool
+        if pool is None:
+            raise mysql.connector.errors.PoolError("no connection pool (not connected)")
+
+        started = time.perf_counter()
+        if not self._pool_slots.acquire(timeout=self.checkout_timeout if timeout is None else timeout):
+            with self._pool_lock:
+                self._pool_stats["timeouts"] += 1
+            raise mysql.connector.errors.PoolError("timed out waiting for a pooled connection")
+
+        cnx = None
         try:
-            if self.conn and self.conn.is_connected():
-                self.conn.close()
-                logger.info("[DB] Previous connection closed.")
+            try:
+                cnx = pool.get_connection()
+            except mysql.connector.Error:
+                with self._pool_lock:
+                    self._pool_stats["health_failures"] += 1
+                raise
+
+            key = id(cnx._cnx)
+            idle_since = self._idle_since.get(key)
+            if idle_since is not None and time.monotonic() - idle_since > self.max_idle_secs:
+                cnx.reconnect(attempts=1)
+                with self._pool_lock:
+                    self._pool_stats["recycled"] += 1
+
+            wait_ms = (time.perf_counter() - started) * 1000
+            with self._pool_lock:
+                stats = self._pool_stats
+                stats["checkouts"] += 1
+                stats["in_use"] += 1
+                stats["max_wait_ms"] = max(stats["max_wait_ms"], wait_ms)
+                self._pool_waits_ms.append(wait_ms)
+
+            try:
+                yield cnx
+            finally:
+                with self._pool_lock:
+                    self._pool_stats["in_use"] -= 1
+                self._idle_since[key] = time.monotonic()
+        finally:
+            if cnx is not None:
+                try:
+                    cnx.close()
+                except mysql.connector.Error as e:
+                    logger.warning(f"[DB] Failed to return connection to pool: {e}")
+            self._pool_slots.release()
+
+    def get_pool_stats(self):
+        """
+        Return a snapshot of connection pool metrics.
+
+        Returns:
+            dict: Pool size, connections in use, utilization, checkout/timeout/recycle counters
+                  and wait-time statistics in milliseconds.
+        """
+        with self._pool_lock:
+            stats = dict(self._pool_stats)
+            waits = sorted(self._pool_waits_ms)
+        stats["size"] = self.pool_size
+        stats["utilization"] = stats["in_use"] / self.pool_size if self.pool_size else 0.0
+        stats["avg_wait_ms"] = sum(waits) / len(waits) if waits else 0.0
+        stats["p95_wait_ms"] = waits[int((len(waits) - 1) * 0.95)] if waits else 0.0
+        return stats
+
+    def _close_pool(self):
+        """
+        Close every idle connection held by the pool and drop the pool.
+        """
+        pool, self.pool = self.pool, None
+        if pool is None:
+            return
+        try:
+            pool._remove_connections()
+            logger.info("[DB] Connection pool closed.")
         except Exception as e:
-            logger.warning(f"[DB] Error while closing existing connection: {e}")
-        self.connect()
+            logger.warning(f"[DB] Error while closing pooled connections: {e}")
+
+    # ==================== Write-Behind Pipeline ====================
 
     def insert_sensor_data(self, device_type: str, value: str, timestamp):
         """
-        Insert a sensor reading into the database.
+        Queue a sensor reading for insertion into the database.
+        The row is written by the background writer on the next flush.
 
         Args:
             device_type (str): Device key (e.g., 'dht').
             value (str): Sensor reading.
             timestamp (datetime): Time of reading.
+
+        Returns:
+            bool: True if the row was queued, False if it was dropped.
+        """
+        return self._enqueue("device_data", (device_type, value, timestamp))
+
+    def insert_readings(self, device_id: str, device_type: str, readings, timestamp):
+        """
+        Queue typed numeric readings for insertion into the device_readings table.
+        Each (metric, value) pair becomes one row.
+
+        Args:
+            device_id (str): Device key (e.g., 'dht' or 'kitchen/dht/12').
+            device_type (str): Device type (e.g., 'dht').
+            readings (list[tuple]): (metric, value) pairs with float values.
+            timestamp (datetime): Time of reading.
+
+        Returns:
+            bool: True if every row was queued, False if any was dropped.
+        """
+        queued = True
+        for metric, value in readings:
+            queued &= self._enqueue("device_readings", (device_id, device_type, metric, float(value), timestamp))
+        return queued
+
+    def _enqueue(self, table: str, row: tuple):
+        """
+        Put a row on the write-behind queue, applying backpressure when it is full.
+
+        Args:
+            table (str): Key into INSERT_QUERIES.
+            row (tuple): Query parameters for a single row.
+
+        Returns:
+            bool: True if queued, False if dropped.
         """
-        if not self.conn or not self.conn.is_connected():
-            logger.warning("[DB] Cannot insert — no active connection.")
+        item = (table, row)
+        try:
+            self._write_queue.put_nowait(item)
+        except queue.Full:
+            with self._stats_lock:
+                self._write_stats["backpressure_events"] += 1
+            try:
+                self._write_queue.put(item, timeout=self.enqueue_timeout)
+            except queue.Full:
+                with self._stats_lock:
+                    self._write_stats["dropped"] += 1
+                    dropped = self._write_stats["dropped"]
+                if dropped == 1 or dropped % 1000 == 0:
+                    logger.warning(f"[DB] Write queue full — {dropped} rows dropped so far.")
+                return False
+
+        with self._stats_lock:
+            self._write_stats["enqueued"] += 1
+        return True
+
+    def _start_writer(self):
+        """
+        Start the background writer thread if it is not already running.
+        """
+        if self._writer_thread and self._writer_thread.is_alive():
             return
+        self._writer_thread = threading.Thread(target=self._writer_loop, name="DBWriter", daemon=True)
+        self._writer_thread.start()
+        logger.debug("[DB] Background writer started.")
+
+    def _writer_loop(self):
+        """
+        Drain the write queue into batched inserts.
+        A batch is flushed when it reaches batch_size or its oldest row is older than flush_interval.
+        """
+        pending = []
+        deadline = None
+        control = None
 
+        while True:
+            if control is not None:
+                item, control = control, None
+            else:
+                timeout = self.flush_interval if deadline is None else max(0.0, deadline - time.monotonic())
+                try:
+                    item = self._write_queue.get(timeout=timeout)
+                except queue.Empty:
+                    item = None
+
+            if item is _STOP:
+                self._flush_batch(pending)
+                self._unwritten_at_stop = len(self._retry_rows)
+                if self._retry_rows:
+                    logger.error(f"[DB] Writer stopped with {len(self._retry_rows)} unwritten rows — dropped.")
+                    with self._stats_lock:
+                        self._write_stats["retry_dropped"] += len(self._retry_rows)
+                    self._retry_rows.clear()
+                return
+
+            if isinstance(item, threading.Event):
+                self._flush_batch(pending)
+                pending, deadline = [], None
+                # Rows requeued by this flush (or earlier ones) are still unwritten
+                item.unwritten = len(self._retry_rows)
+                item.set()
+                continue
+
+            if item is not None:
+                if not pending:
+                    deadline = time.monotonic() + self.flush_interval
+                pending.append(item)
+
+                # Greedily pull whatever is already queued, up to one batch
+                while len(pending) < self.batch_size:
+                    try:
+                        extra = self._write_queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if extra is _STOP or isinstance(extra, threading.Event):
+                        control = extra
+                        break
+                    pending.append(extra)
+
+            if pending and (len(pending) >= self.batch_size or time.monotonic() >= deadline):
+                self._flush_batch(pending)
+                pending, deadline = [], None
+            elif item is None and not pending and self._retry_rows:
+                # Idle: retry failed rows once per flush interval
+                self._flush_batch(pending)
+
+    def _flush_batch(self, batch):
+        """
+        Write a batch of queued rows using one executemany and one commit per table.
+        Rows of earlier failed batches are written first; a failed batch is kept for retry.
+
+        Args:
+            batch (list[tuple]): Items of (table, row) taken from the write queue.
+        """
+        new_rows = len(batch)
+        if self._retry_rows:
+            batch = list(self._retry_rows) + batch
+            self._retry_rows.clear()
+        if not batch:
+            return
+
+        grouped = {}
+        for table, row in batch:
+            grouped.setdefault(table, []).append(row)
+
+        started = time.perf_counter()
+        written = 0
         try:
-            cursor = self.conn.cursor()
-            query = "INSERT INTO device_data (device_type, value, timestamp) VALUES (%s, %s, %s)"
-            cursor.execute(query, (device_type, value, timestamp))
-            self.conn.commit()
-            cursor.close()
-            logger.info(f"[DB] Inserted: {device_type} | {value} | {timestamp}")
-        except mysql.connector.ProgrammingError as e:
-            logger.error(f"[DB] ProgrammingError: {e}")
-        except mysql.connector.DatabaseError as e:
-            logger.error(f"[DB] Insert DatabaseError: {e}")
+            with self.connection() as conn:
+                cursor = conn.cursor()
+                for table, rows in grouped.items():
+                    cursor.executemany(INSERT_QUERIES[table], rows)
+                    written += len(rows)
+                conn.commit()
+                cursor.close()
+        except mysql.connector.Error as e:
+            self._requeue(batch, new_rows, e)
+            return
         except Exception as e:
-            logger.error(f"[DB] Unexpected insert error: {e}")
+            logger.error(f"[DB] Unexpected batch insert error: {e}")
+            self._requeue(batch, new_rows, e)
+            return
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        with self._stats_lock:
+            stats = self._write_stats
+            stats["written"] += written
+            stats["flushes"] += 1
+            stats["last_flush_ms"] = elapsed_ms
+            stats["max_flush_ms"] = max(stats["max_flush_ms"], elapsed_ms)
+            stats["total_flush_ms"] += elapsed_ms
+        _log.debug("Flushed {} rows in {:.1f} ms", written, elapsed_ms)
+
+    def _requeue(self, batch, new_rows, error):
+        """
+        Keep a failed batch for the next flush, dropping the oldest rows beyond max_retry_rows.
+
+        Args:
+            batch (list[tuple]): The (table, row) items that were not written.
+            new_rows (int): Rows of the batch failing for the first time (counted as 'failed').
+            error (Exception): The failure, for the log.
+        """
+        self._retry_rows.extend(batch)
+        overflow = max(len(self._retry_rows) - self.max_retry_rows, 0)
+        for _ in range(overflow):
+            self._retry_rows.popleft()
+        with self._stats_lock:
+            self._write_stats["failed"] += new_rows
+            self._write_stats["retry_dropped"] += overflow
+
+        if overflow:
+            logger.error(f"[DB] Batch insert failed ({len(batch)} rows): {error} — "
+                         f"retry buffer full, {overflow} oldest rows dropped.")
+        else:
+            _log.rate_limited(10.0, "ERROR", "Batch insert failed ({} rows, {} waiting for retry): {}",
+                              len(batch), len(self._retry_rows), error)
+
+    def flush(self, timeout=5.0):
+        """
+        Block until every row queued before this call has been written.
+
+        Args:
+            timeout (float): Maximum seconds to wait.
+
+        Returns:
+            bool: True if the flush completed in time and no row is left waiting for a retry.
+        """
+        if not self._writer_thread or not self._writer_thread.is_alive():
+            return False
+        done = threading.Event()
+        self._write_queue.put(done)
+        if not done.wait(timeout):
+            return False
+        if done.unwritten:
+            logger.warning(f"[DB] Flush incomplete: {done.unwritten} rows waiting for retry.")
+            return False
+        return True
+
+    def get_write_stats(self):
+        """
+        Return a snapshot of the write-behind pipeline metrics.
+
+        Returns:
+            dict: Queue depth, row counters, flush latency, backpressure/drop counters and retry buffer depth.
+        """
+        with self._stats_lock:
+            stats = dict(self._write_stats)
+        flushes = stats.pop("flushes")
+        total_ms = stats.pop("total_flush_ms")
+        stats["flushes"] = flushes
+        stats["avg_flush_ms"] = total_ms / flushes if flushes else 0.0
+        stats["queue_depth"] = self._write_queue.qsize()
+        stats["retry_pending"] = len(self._retry_rows)
+        return stats
+
+    # ==================== Queries ====================
 
     def fetch_latest_records(self, limit=10):
         """
@@ -111,16 +534,17 @@ class DBClient:
         Returns:
             list[dict]: A list of result rows as dictionaries.
         """
-        if not self.conn or not self.conn.is_connected():
+        if not self.pool:
             logger.warning("[DB] Cannot fetch — no active connection.")
             return []
 
         try:
-            cursor = self.conn.cursor(dictionary=True)
-            query = "SELECT * FROM device_data ORDER BY timestamp DESC LIMIT %s"
-            cursor.execute(query, (limit,))
-            records = cursor.fetchall()
-            cursor.close()
+            with self.connection() as conn:
+                cursor = conn.cursor(dictionary=True)
+                query = "SELECT * FROM device_data ORDER BY timestamp DESC LIMIT %s"
+                cursor.execute(query, (limit,))
+                records = cursor.fetchall()
+                cursor.close()
             logger.info(f"[DB] Fetched {len(records)} records.")
             return records
         except mysql.connector.ProgrammingError as e:
@@ -131,6 +555,191 @@ class DBClient:
             logger.error(f"[DB] Unexpected fetch error: {e}")
             return []
 
+    def fetch_latest_readings(self, limit=10):
+        """
+        Fetch the most recent typed readings.
+
+        Args:
+            limit (int): Number of readings to retrieve.
+
+        Returns:
+            list[dict]: Rows with device_id, device_type, metric, value (float) and ts.
+        """
+        query = ("SELECT device_id, device_type, metric, value, ts FROM device_readings "
+                 "ORDER BY id DESC LIMIT %s")
+        return self._fetch_all(query, [limit])
+
+    def fetch_range(self, device_id: str, start, end, metric=None, limit=100_000):
+        """
+        Fetch typed readings of one device inside a time range, oldest first.
+        Served by the (device_id, metric, ts) index with partition pruning on ts.
+
+        Args:
+            device_id (str): Device key (e.g., 'dht' or 'kitchen/dht/12').
+            start (datetime): Inclusive range start.
+            end (datetime): Exclusive range end.
+            metric (str): Optional metric filter (e.g., 'temperature').
+            limit (int): Maximum rows returned.
+
+        Returns:
+            list[dict]: Rows with device_id, metric, value and ts.
+        """
+        query = "SELECT device_id, metric, value, ts FROM device_readings WHERE device_id = %s"
+        params = [device_id]
+        if metric is not None:
+            query += " AND metric = %s"
+            params.append(metric)
+        query += " AND ts >= %s AND ts < %s ORDER BY ts LIMIT %s"
+        params += [start, end, limit]
+        return self._fetch_all(query, params)
+
+    def fetch_latest_per_device(self, device_type=None, since=None):
+        """
+        Fetch the latest reading of every (device, metric) pair.
+        The inner MAX(ts) GROUP BY runs as a loose index scan over (device_id, metric, ts).
+
+        Args:
+            device_type (str): Optional device type filter.
+            since (datetime): Optional lower bound on ts, enabling partition pruning.
+
+        Returns:
+            list[dict]: One row per device and metric with device_id, device_type, metric, value and ts.
+        """
+        conditions, params = [], []
+        if device_type is not None:
+            conditions.append("device_type = %s")
+            params.append(device_type)
+        if since is not None:
+            conditions.append("ts >= %s")
+            params.append(since)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        query = (
+            "SELECT r.device_id, r.device_type, r.metric, r.value, r.ts "
+            "FROM device_readings r "
+            "JOIN (SELECT device_id, metric, MAX(ts) AS ts FROM device_readings "
+            f"{where} GROUP BY device_id, metric) latest "
+            "ON r.device_id = latest.device_id AND r.metric = latest.metric AND r.ts = latest.ts"
+        )
+        return self._fetch_all(query, params)
+
+    def fetch_history(self, device_id: str, start, end, metric=None, max_points=500):
+        """
+        Fetch downsampled history of one device, at most max_points buckets per metric.
+        Reads from the coarsest rollup table whose resolution still fits the request
+        (raw device_readings for short ranges), then merges its buckets into evenly
+        sized steps. Readings newer than the last RollupJob run are not yet included.
+
+        Args:
+            device_id (str): Device key (e.g., 'dht' or 'kitchen/dht/12').
+            start (datetime): Inclusive range start.
+            end (datetime): Exclusive range end.
+            metric (str): Optional metric filter (e.g., 'temperature').
+            max_points (int): Maximum buckets returned per metric.
+
+        Returns:
+            list[dict]: Rows with metric, bucket_start, min_value, max_value, avg_value and
+                        sample_count, ordered by metric and bucket_start.
+        """
+        span = max((end - start).total_seconds(), 1.0)
+        step = max(1, math.ceil(span / max(1, max_points)))
+
+        source, bucket_secs = "device_readings", 1
+        for table, (secs, _) in ROLLUP_TABLES.items():
+            if secs <= step:
+                source, bucket_secs = table, secs
+        step = math.ceil(step / bucket_secs) * bucket_secs
+
+        if source == "device_readings":
+            column = "ts"
+            min_expr, max_expr, avg_expr, count_expr = "MIN(value)", "MAX(value)", "AVG(value)", "COUNT(*)"
+        else:
+            column = "bucket"
+            min_expr, max_expr = "MIN(min_value)", "MAX(max_value)"
+            avg_expr, count_expr = "SUM(sum_value) / SUM(sample_count)", "SUM(sample_count)"
+
+        query = (
+            f"SELECT metric, FROM_UNIXTIME(FLOOR(UNIX_TIMESTAMP({column}) / {step}) * {step}) AS bucket_start, "
+            f"{min_expr} AS min_value, {max_expr} AS max_value, {avg_expr} AS avg_value, "
+            f"{count_expr} AS sample_count FROM {source} WHERE device_id = %s"
+        )
+        params = [device_id]
+        if metric is not None:
+            query += " AND metric = %s"
+            params.append(metric)
+        query += f" AND {column} >= %s AND {column} < %s GROUP BY metric, bucket_start ORDER BY metric, bucket_start"
+        params += [start, end]
+
+        logger.debug(f"[DB] History for {device_id} from {source} in {step}s steps")
+        return self._fetch_all(query, params)
+
+    def _fetch_all(self, query: str, params):
+        """
+        Run a read query and return all rows as dictionaries.
+
+        Args:
+            query (str): SQL query with %s placeholders.
+            params (list): Query parameters.
+
+        Returns:
+            list[dict]: Result rows, or an empty list on error.
+        """
+        if not self.pool:
+            logger.warning("[DB] Cannot fetch — no active connection.")
+            return []
+
+        try:
+            with self.connection() as conn:
+                cursor = conn.cursor(dictionary=True)
+                cursor.execute(query, tuple(params))
+                records = cursor.fetchall()
+                cursor.close()
+            return records
+        except mysql.connector.Error as e:
+            logger.error(f"[DB] Query error: {e}")
+            return []
+
+    # ==================== Partition Maintenance ====================
+
+    def ensure_partitions(self, months_ahead=3):
+        """
+        Make sure monthly partitions exist from the current month to months_ahead,
+        by splitting the catch-all pmax partition. Tables that are not partitioned are skipped.
+
+        Args:
+            months_ahead (int): Number of future months to pre-create.
+        """
+        try:
+            with self.connection() as conn:
+                cursor = conn.cursor()
+                for table in PARTITIONED_TABLES:
+                    cursor.execute(
+                        "SELECT PARTITION_NAME FROM information_schema.PARTITIONS "
+                        "WHERE TABLE_SCHEMA = %s AND TABLE_NAME = %s AND PARTITION_NAME IS NOT NULL",
+                        (self.database, table)
+                    )
+                    existing = {row[0] for row in cursor.fetchall()}
+                    if "pmax" not in existing:
+                        continue
+
+                    today = date.today()
+                    for offset in range(months_ahead + 1):
+                        year, month = divmod(today.month - 1 + offset, 12)
+                        first = date(today.year + year, month + 1, 1)
+                        name = f"p{first:%Y%m}"
+                        if name in existing:
+                            continue
+                        ny, nm = divmod(first.month, 12)
+                        upper = date(first.year + ny, nm + 1, 1)
+                        cursor.execute(
+                            f"ALTER TABLE {table} REORGANIZE PARTITION pmax INTO ("
+                            f"PARTITION {name} VALUES LESS THAN (TO_DAYS('{upper.isoformat()}')), "
+                            f"PARTITION pmax VALUES LESS THAN MAXVALUE)"
+                        )
+                        logger.info(f"[DB] Created partition {table}.{name}")
+                cursor.close()
+        except mysql.connector.Error as e:
+            logger.warning(f"[DB] Partition maintenance skipped: {e}")
+
     def test_connection(self):
         """
         Test the current database connection and reconnect if needed.
@@ -139,11 +748,12 @@ class DBClient:
             bool: True if ping succeeded, False otherwise.
         """
         try:
-            if not self.conn or not self.conn.is_connected():
+            if not self.pool:
                 logger.warning("[DB] No active connection. Attempting to reconnect...")
                 self.connect()
 
-            self.conn.ping(reconnect=True)
+            with self.connection() as conn:
+                conn.ping(reconnect=True)
             logger.success("[DB] Ping successful ✔")
             return True
 
@@ -151,10 +761,40 @@ class DBClient:
             logger.error(f"[DB] Ping or reconnect error: {e}")
             return False
 
+    def ping(self, timeout=2.0):
+        """
+        Check the database with one round trip on a pooled connection, creating the
+        pool first if needed. Blocking; meant for HealthMonitor's worker threads.
+
+        Args:
+            timeout (float): Seconds to wait for a free pooled connection.
+
+        Returns:
+            float: Round-trip time of the ping in milliseconds.
+
+        Raises:
+            mysql.connector.Error: If there is no pool or the ping failed.
+        """
+        if not self.pool:
+            self.connect()
+        with self.connection(timeout=timeout) as conn:
+            started = time.perf_counter()
+            conn.ping(reconnect=False)
+            return (time.perf_counter() - started) * 1000
+
     def close(self):
         """
-        Close the current database connection.
+        Flush pending writes, stop the writer thread and close the pooled connections.
+
+        Returns:
+            bool: True if every queued row was written before the writer stopped.
         """
-        if self.conn and self.conn.is_connected():
-            self.conn.close()
-            logger.info("[DB] Connection closed.")
+        flushed = True
+        if self._writer_thread and self._writer_thread.is_alive():
+            self._write_queue.put(_STOP)
+            self._writer_thread.join(timeout=5.0)
+            flushed = not self._writer_thread.is_alive() and not self._unwritten_at_stop
+            self._writer_thread = None
+
+        self._close_pool()
+        return flushed
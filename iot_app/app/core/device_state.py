@@ -0,0 +1,246 @@
+"""
+Project: IoT Smart Home
+File: device_state.py
+Description:
+Thread-safe, Qt-free cache of the latest state of every device.
+Each device keeps its typed readings, active flag, last-seen timestamp and a version
+counter that only increases when the state actually changes. Changed devices are
+collected in a dirty set; consumers are woken once per batch of changes and drain it.
+Fed by MQTTListener (received messages) and the emulators (local publishes).
+An optional TimeSeriesStore receives every reading for the live charts.
+"""
+
+import threading
+import time
+
+# Display formatting from typed readings, shared by the views
+READING_FORMATTERS = {
+    "dht": lambda v: f"{v['temperature']:.1f} °C, {v['humidity']:.1f} %",
+    "light": lambda v: f"{v['lux']:.0f} lx",
+    "motion": lambda v: "motion detected" if v.get("motion") else "no motion",
+    "relay": lambda v: "ON" if v.get("state") else "OFF",
+    "button": lambda v: "Pressed" if v.get("pressed") else None,
+}
+
+
+def format_reading(device_type: str, values):
+    """
+    Format typed readings for display.
+
+    Args:
+        device_type (str): Device type selecting the formatter.
+        values (dict | None): Metric → value, or None when the device has no value.
+
+    Returns:
+        str | None: Display text, or None if there is nothing to show.
+    """
+    if not values:
+        return None
+    formatter = READING_FORMATTERS.get(device_type)
+    if formatter is None:
+        return ", ".join(f"{metric}={value:g}" for metric, value in values.items())
+    try:
+        return formatter(values)
+    except KeyError:
+        return None
+
+
+# Active flag from typed readings, shared by the listener and the emulators so a local
+# reading and its MQTT echo agree; types without a rule are active whenever they have values
+ACTIVE_RULES = {
+    "motion": lambda v: bool(v.get("motion")),
+    "relay": lambda v: bool(v.get("state")),
+    "button": lambda v: bool(v.get("pressed")),
+}
+
+
+def is_active(device_type: str, values) -> bool:
+    """
+    Derive a device's active flag from its typed readings.
+
+    Args:
+        device_type (str): Device type selecting the rule.
+        values (dict | None): Metric → value, or None when the device has no value.
+
+    Returns:
+        bool: True if the device is active.
+    """
+    if not values:
+        return False
+    rule = ACTIVE_RULES.get(device_type)
+    return rule(values) if rule else True
+
+
+class DeviceState:
+    """
+    Latest known state of one device.
+    """
+    __slots__ = ("device_key", "device_type", "active", "values", "last_seen", "version", "source")
+
+    def __init__(self, device_key, device_type):
+        self.device_key = device_key
+        self.device_type = device_type
+        self.active = False
+        self.values = None
+        self.last_seen = 0.0
+        self.version = 0
+        self.source = None
+
+    @property
+    def reading(self):
+        """
+        Display text of the current readings (None when the device has no value).
+        """
+        return format_reading(self.device_type, self.values)
+
+    def copy(self):
+        """
+        Return a detached copy, safe to hand to another thread.
+        """
+        clone = DeviceState(self.device_key, self.device_type)
+        clone.active = self.active
+        clone.values = self.values
+        clone.last_seen = self.last_seen
+        clone.version = self.version
+        clone.source = self.source
+        return clone
+
+
+class DeviceStateStore:
+    """
+    Latest state per device key, with change versions and a dirty set for batched notification.
+    """
+    def __init__(self, history=None, history_source="mqtt"):
+        """
+        Initialize an empty store.
+
+        Args:
+            history (TimeSeriesStore): Optional sample history; every update with values from
+                                       history_source is appended, including unchanged ones.
+            history_source (str): The one source feeding the history. Local emulator readings come
+                                  back as MQTT echoes, so recording both would store each one twice.
+        """
+        self.history = history
+        self.history_source = history_source
+        self._lock = threading.Lock()
+        self._states = {}
+        self._dirty = set()
+        self._wakers = []
+        self.updates = 0
+        self.changes = 0
+
+    def __len__(self):
+        return len(self._states)
+
+    def add_waker(self, callback):
+        """
+        Register a callback invoked (from the updating thread) when the dirty set goes from
+        empty to non-empty. Consumers then call drain_dirty(); further changes before that
+        do not wake them again.
+
+        Args:
+            callback (Callable[[], None]): Thread-safe wake-up function (e.g. a queued Qt signal emit).
+        """
+        self._wakers.append(callback)
+
+    def update(self, device_key: str, device_type: str, active: bool, values=None, source=None, timestamp=None):
+        """
+        Record a device's latest state. The version only advances if active or values changed.
+
+        Args:
+            device_key (str): Device key ('dht' or '<room>/<type>/<id>').
+            device_type (str): Device type.
+            active (bool): Whether the device is active.
+            values (dict | None): Metric → typed value, or None when the device has no value.
+            source (str): Where the update came from ('mqtt' or 'emulator').
+            timestamp (float): Epoch seconds of the observation (defaults to now).
+
+        Returns:
+            bool: True if the state changed.
+        """
+        wake = False
+        with self._lock:
+            # Stamped and recorded under the lock, so history timestamps ascend in append order
+            timestamp = timestamp or time.time()
+            if self.history is not None and values and source == self.history_source:
+                self.history.append(device_key, timestamp, values)
+            self.updates += 1
+            state = self._states.get(device_key)
+            if state is None:
+                state = self._states[device_key] = DeviceState(device_key, device_type)
+            state.last_seen = timestamp
+            if state.version and state.active == active and state.values == values:
+                return False
+            state.active = active
+            state.values = values
+            state.source = source
+            state.version += 1
+            self.changes += 1
+            wake = not self._dirty
+            self._dirty.add(device_key)
+
+        if wake:
+            for callback in self._wakers:
+                callback()
+        return True
+
+    def drain_dirty(self):
+        """
+        Return and clear the keys changed since the previous drain.
+
+        Returns:
+            set[str]: Changed device keys.
+        """
+        with self._lock:
+            dirty, self._dirty = self._dirty, set()
+        return dirty
+
+    def get(self, device_key: str):
+        """
+        Return a copy of one device's state.
+
+        Args:
+            device_key (str): Device key.
+
+        Returns:
+            DeviceState | None: The state, or None if the device was never seen.
+        """
+        with self._lock:
+            state = self._states.get(device_key)
+            return state.copy() if state is not None else None
+
+    def snapshot(self, device_keys=None):
+        """
+        Return copies of several device states.
+
+        Args:
+            device_keys (Iterable[str]): Keys to return; all devices if None. Unknown keys are skipped.
+
+        Returns:
+            dict: Device key → DeviceState.
+        """
+        with self._lock:
+            if device_keys is None:
+                return {key: state.copy() for key, state in self._states.items()}
+            states = self._states
+            return {key: states[key].copy() for key in device_keys if key in states}
+
+    def keys(self, device_type=None):
+        """
+        Return known device keys, optionally of one type.
+        """
+        with self._lock:
+            if device_type is None:
+                return list(self._states)
+            return [key for key, state in self._states.items() if state.device_type == device_type]
+
+    def get_stats(self):
+        """
+        Return store counters.
+
+        Returns:
+            dict: Devices, updates received, state changes and pending dirty keys.
+        """
+        with self._lock:
+            return {"devices": len(self._states), "updates": self.updates,
+                    "changes": self.changes, "dirty": len(self._dirty)}
@@ -0,0 +1,231 @@
+"""
+Project: IoT Smart Home
+File: health_monitor.py
+Description:
+Background health checks for the app's services (MQTT broker, MySQL).
+A monitor thread runs every probe once per interval, each on its own worker thread
+with a timeout, so a hung service never blocks the GUI or the other probes.
+Round-trip times are kept in rolling histograms per probe, and each cycle's results
+are handed to listeners (e.g. health_bridge.HealthSignalBridge for the GUI).
+"""
+
+import bisect
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from iot_app.app.utils.logger import logger
+
+# Upper bounds (ms) of the RTT histogram buckets; the last bucket is open-ended
+RTT_BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+
+class RttHistogram:
+    """
+    Rolling histogram of the last `window` round-trip times.
+    """
+    def __init__(self, window: int = 1000):
+        self._samples = deque(maxlen=window)
+        self._counts = [0] * (len(RTT_BUCKETS_MS) + 1)
+
+    def add(self, rtt_ms: float):
+        """
+        Record one round trip, evicting the oldest once the window is full.
+        """
+        if len(self._samples) == self._samples.maxlen:
+            self._counts[bisect.bisect_left(RTT_BUCKETS_MS, self._samples[0])] -= 1
+        self._samples.append(rtt_ms)
+        self._counts[bisect.bisect_left(RTT_BUCKETS_MS, rtt_ms)] += 1
+
+    def snapshot(self):
+        """
+        Return bucket counts and percentiles of the window.
+
+        Returns:
+            dict: buckets ('<=N ms' → count, plus '>N ms'), p50/p95/max and samples.
+        """
+        labels = [f"<={bound} ms" for bound in RTT_BUCKETS_MS] + [f">{RTT_BUCKETS_MS[-1]} ms"]
+        stats = {"buckets": dict(zip(labels, self._counts)), "samples": len(self._samples)}
+        if self._samples:
+            ordered = sorted(self._samples)
+            last = len(ordered) - 1
+            stats.update(p50=ordered[int(last * 0.50)], p95=ordered[int(last * 0.95)], max=ordered[-1])
+        return stats
+
+
+class HealthMonitor:
+    """
+    Runs named probes periodically off the GUI thread.
+    A probe is a callable that returns its round-trip time in ms (or None) and raises on failure.
+    """
+    def __init__(self, probes, interval_s: float = 30.0, timeout_s: float = 3.0, window: int = 1000):
+        """
+        Initialize the monitor; probing starts with start().
+
+        Args:
+            probes (dict): Probe name → callable.
+            interval_s (float): Seconds between check cycles.
+            timeout_s (float): Time a probe may take before it is reported as timed out.
+            window (int): Round trips kept per probe histogram.
+        """
+        self.probes = dict(probes)
+        self.interval_s = interval_s
+        self.timeout_s = timeout_s
+
+        self._lock = threading.Lock()
+        self._listeners = []
+        self._histograms = {name: RttHistogram(window) for name in self.probes}
+        self._results = {}
+        self._counts = {name: {"checks": 0, "failures": 0, "timeouts": 0} for name in self.probes}
+        # One worker per probe: a hung probe only occupies its own thread
+        self._executors = {name: ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"Health-{name}")
+                           for name in self.probes}
+        self._running = {}
+
+        self._thread = None
+        self._stop_event = threading.Event()
+        self._wake_event = threading.Event()
+
+    def add_listener(self, callback):
+        """
+        Register a callback receiving each cycle's results, called from the monitor thread.
+
+        Args:
+            callback (Callable[[dict], None]): Receives probe name → result dict.
+        """
+        self._listeners.append(callback)
+
+    def start(self):
+        """
+        Start the monitor thread; the first cycle runs immediately.
+        """
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="HealthMonitor", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 2.0):
+        """
+        Stop the monitor thread. Probes still running are abandoned.
+        """
+        self._stop_event.set()
+        self._wake_event.set()
+        if self._thread:
+            self._thread.join(timeout=timeout)
+            self._thread = None
+        for executor in self._executors.values():
+            executor.shutdown(wait=False)
+
+    def check_now(self):
+        """
+        Run the next check cycle immediately instead of waiting out the interval.
+        """
+        self._wake_event.set()
+
+    def _run(self):
+        """
+        Thread body: one check cycle per interval until stopped.
+        """
+        while not self._stop_event.is_set():
+            self._wake_event.clear()
+            results = self.run_checks()
+            for callback in self._listeners:
+                try:
+                    callback(results)
+                except Exception as e:
+                    logger.warning(f"[Health] Listener failed: {e}")
+            self._wake_event.wait(self.interval_s)
+
+    def run_checks(self):
+        """
+        Run every probe in parallel and wait at most timeout_s for all of them.
+        A probe whose previous run is still hanging is not started again and reports a timeout.
+
+        Returns:
+            dict: Probe name → {"ok", "rtt_ms", "error", "checked_at", "consecutive_failures"}.
+        """
+        started = {}
+        for name, probe in self.probes.items():
+            future = self._running.get(name)
+            if future is None or future.done():
+                future = self._running[name] = self._executors[name].submit(self._timed, probe)
+            started[name] = future
+
+        deadline = time.monotonic() + self.timeout_s
+        results = {}
+        for name, future in started.items():
+            try:
+                ok, rtt_ms, error = future.result(timeout=max(deadline - time.monotonic(), 0))
+            except FutureTimeout:
+                ok, rtt_ms, error = False, None, f"timed out after {self.timeout_s:.1f}s"
+            results[name] = self._record(name, ok, rtt_ms, error, timed_out=not future.done())
+        return results
+
+    @staticmethod
+    def _timed(probe):
+        """
+        Run one probe on its worker thread.
+
+        Returns:
+            tuple: (ok, rtt_ms, error message)
+        """
+        started = time.perf_counter()
+        try:
+            rtt_ms = probe()
+        except Exception as e:
+            return False, None, str(e) or type(e).__name__
+        if rtt_ms is None:
+            rtt_ms = (time.perf_counter() - started) * 1000
+        return True, rtt_ms, None
+
+    def _record(self, name, ok, rtt_ms, error, timed_out):
+        """
+        Update counters and the histogram for one probe result and log state changes.
+
+        Returns:
+            dict: The result as stored for get_results().
+        """
+        with self._lock:
+            counts = self._counts[name]
+            counts["checks"] += 1
+            previous = self._results.get(name)
+            if ok:
+                self._histograms[name].add(rtt_ms)
+                failures = 0
+            else:
+                counts["failures"] += 1
+                counts["timeouts"] += timed_out
+                failures = (previous["consecutive_failures"] if previous else 0) + 1
+            result = {"ok": ok, "rtt_ms": rtt_ms, "error": error,
+                      "checked_at": time.time(), "consecutive_failures": failures}
+            self._results[name] = result
+
+        if previous is None or previous["ok"] != ok:
+            if ok:
+                logger.success(f"[Health] {name} OK ({rtt_ms:.1f} ms)")
+            else:
+                logger.error(f"[Health] {name} failed: {error}")
+        return result
+
+    def get_results(self):
+        """
+        Return the latest result of every probe that has run.
+        """
+        with self._lock:
+            return {name: dict(result) for name, result in self._results.items()}
+
+    def get_stats(self):
+        """
+        Return per-probe counters and RTT histograms.
+
+        Returns:
+            dict: Probe name → checks, failures, timeouts, latest ok flag and 'rtt' histogram snapshot.
+        """
+        with self._lock:
+            stats = {}
+            for name in self.probes:
+                latest = self._results.get(name)
+                stats[name] = dict(self._counts[name], ok=latest["ok"] if latest else None,
+                                   rtt=self._histograms[name].snapshot())
+            return stats
@@ -4,38 +4,105 @@ File: mqtt_client.py
 Description:
 MQTT client module for subscribing and publishing to the IoT broker.
 Connects to Mosquitto broker and interacts with the RoomView GUI.
+Publishes use per-topic QoS, a bounded in-flight window and queue, and are tracked
+to completion through on_publish for ack-latency and queue-depth metrics.
+Each broker connection runs one long-lived network thread that reconnects with jittered
+exponential backoff; publishes made while offline are buffered and drained at a bounded
+rate on reconnect. MQTTClient can spread work over several connections, sharding
+publishes by topic hash so per-topic ordering is preserved.
 """
 
+import random
 import socket
 import threading
+import time
+import zlib
+from collections import deque
 import paho.mqtt.client as mqtt
-from iot_app.app.utils.logger import logger
+from iot_app.app.core.payload_codec import EncodingPolicy, is_binary, is_batch
+from iot_app.app.utils.logger import logger, get_logger
 
+_log = get_logger("mqtt", "MQTT")
 
-class MQTTClient:
+QOS_LEVELS = (0, 1, 2)
+# Health pings go outside 'Home/#' so no listener receives them
+HEALTH_TOPIC = "_health/ping"
+
+
+def _percentiles(samples):
     """
-    MQTT client wrapper for managing connection, publishing, subscription, and reconnection.
+    Return p50/p95/p99/max of sorted latency samples.
     """
+    last = len(samples) - 1
+    return {
+        "p50": samples[int(last * 0.50)],
+        "p95": samples[int(last * 0.95)],
+        "p99": samples[int(last * 0.99)],
+        "max": samples[-1],
+        "samples": len(samples),
+    }
 
-    def __init__(self, broker_host="localhost", broker_port=1883, topics=None, on_message_callback=None):
+
+class _BrokerConnection:
+    """
+    One paho client with its own socket, network thread, offline buffer and publish tracking.
+    Configuration (broker, limits, subscriptions, callbacks) is read from the owning MQTTClient.
+    """
+    def __init__(self, owner, index, client_id):
         """
-        Initialize MQTT client with broker details and optional message handler.
+        Initialize the connection; the network thread starts with start().
 
         Args:
-            broker_host (str): MQTT broker address.
-            broker_port (int): MQTT broker port.
-            topics (list): List of topics to subscribe to.
-            on_message_callback (callable): Callback function on new message.
+            owner (MQTTClient): Client holding the shared configuration.
+            index (int): Connection index within the pool.
+            client_id (str): MQTT client id, unique per connection.
         """
-        self.broker_host = broker_host
-        self.broker_port = broker_port
-        self.topics = topics or []
-        self.on_message_callback = on_message_callback
+        self.owner = owner
+        self.index = index
+        self.client_id = client_id
+        self.name = "MQTTNetwork" if index == 0 else f"MQTTNetwork-{index}"
 
-        hostname = socket.gethostname()
-        self.client = mqtt.Client(client_id=f"SmartHomeApp-{hostname}")
-        self.client.on_connect = self._on_connect
-        self.client.on_message = self._on_message
+        # mid → (send time, qos) for publishes not yet completed by on_publish
+        self._publish_lock = threading.Lock()
+        self._pending = {}
+        self._early_acks = {}
+        # Health ping mids awaiting their PUBACK (kept out of the publish stats)
+        self._ping_waiters = {}
+        self._ack_latency_ms = {qos: deque(maxlen=owner.latency_window) for qos in QOS_LEVELS}
+        self._publish_stats = {"published": 0, "acked": 0, "rejected": 0, "failed": 0, "lost": 0,
+                               "max_pending": 0, "received": 0, "bytes_out": 0, "bytes_in": 0}
+        self._rate_mark = (time.monotonic(), 0, 0)
+
+        self._online = False
+        self._connected = threading.Event()
+        self._attempt = 0
+        self._connack_ok = False
+        self._thread = None
+        self._stop_event = threading.Event()
+        self._wake_event = threading.Event()
+        self._offline = deque(maxlen=owner.offline_buffer)
+        self._conn_stats = {"connects": 0, "disconnects": 0, "failed_attempts": 0, "buffered": 0,
+                            "offline_dropped": 0, "drained": 0, "last_error": None, "next_retry_s": 0.0}
+
+        self.client = self._create_client()
+
+    def _create_client(self):
+        """
+        Create and configure the paho client: callbacks and flow-control limits.
+
+        Returns:
+            mqtt.Client: Configured client.
+        """
+        client = mqtt.Client(client_id=self.client_id)
+        client.on_connect = self._on_connect
+        client.on_message = self._on_message
+        client.on_publish = self._on_publish
+        client.on_disconnect = self._on_disconnect
+        client.max_inflight_messages_set(self.owner.max_inflight)
+        client.max_queued_messages_set(self.owner.max_queued)
+        return client
+
+    # ==================== paho Callbacks ====================
 
     def _on_connect(self, client, userdata, flags, rc):
         """
@@ -47,13 +114,66 @@ class MQTTClient:
             flags: Connection flags.
             rc: Result code.
         """
+        owner = self.owner
         if rc == 0:
-            logger.success(f"[MQTT] Connected to broker at {self.broker_host}:{self.broker_port}")
-            for topic in self.topics:
-                client.subscribe(topic)
-                logger.info(f"[MQTT] Subscribed to topic: {topic}")
+            logger.success(f"[MQTT] Connected to broker at {owner.broker_host}:{owner.broker_port}"
+                           + (f" (connection {self.index})" if self.index else ""))
+            self._attempt = 0
+            self._connack_ok = True
+            self._conn_stats["connects"] += 1
+            self._online = True
+            self._connected.set()
+            # With a persistent session the broker still holds our subscriptions
+            subscriptions = owner.subscriptions_for(self.index)
+            if subscriptions and not flags.get("session present"):
+                client.subscribe(list(subscriptions.items()))
+                logger.info(f"[MQTT] Subscribed to topics: {', '.join(subscriptions)}")
+            if self._offline:
+                logger.info(f"[MQTT] Draining {len(self._offline)} offline publishes at {owner.drain_rate:.0f} msg/s")
         else:
-            logger.error(f"[MQTT] Failed to connect (RC={rc}) to broker at {self.broker_host}:{self.broker_port}")
+            logger.error(f"[MQTT] Failed to connect (RC={rc}) to broker at {owner.broker_host}:{owner.broker_port}")
+
+    def _on_disconnect(self, client, userdata, rc):
+        """
+        Internal callback for disconnection. paho drops queued QoS 0 messages on
+        reconnect, so their pending entries will never complete.
+        """
+        self._online = False
+        self._connected.clear()
+        self._conn_stats["disconnects"] += 1
+        with self._publish_lock:
+            lost = [mid for mid, (_, qos) in self._pending.items() if qos == 0]
+            for mid in lost:
+                del self._pending[mid]
+            self._publish_stats["lost"] += len(lost)
+        if rc != 0:
+            logger.warning(f"[MQTT] Unexpected disconnect (RC={rc}), {len(lost)} QoS 0 publishes lost")
+
+    def _on_publish(self, client, userdata, mid):
+        """
+        Internal callback for publish completion: QoS 0 written to the socket,
+        QoS 1 PUBACK or QoS 2 PUBCOMP received.
+        """
+        now = time.perf_counter()
+        with self._publish_lock:
+            waiter = self._ping_waiters.pop(mid, None)
+            if waiter is not None:
+                waiter.set()
+                return
+            entry = self._pending.pop(mid, None)
+            if entry is None:
+                # Completed before _send() registered the mid (e.g. QoS 0 written inline)
+                self._early_acks[mid] = now
+                return
+            self._complete(now, entry)
+
+    def _complete(self, now, entry):
+        """
+        Record one completed publish. Called with the publish lock held.
+        """
+        sent, qos = entry
+        self._ack_latency_ms[qos].append((now - sent) * 1000)
+        self._publish_stats["acked"] += 1
 
     def _on_message(self, client, userdata, msg):
         """
@@ -64,94 +184,645 @@ class MQTTClient:
             userdata: Unused.
             msg: Incoming MQTT message.
         """
+        owner = self.owner
         try:
-            payload = msg.payload.decode()
+            raw = msg.payload
+            self._publish_stats["received"] += 1
+            self._publish_stats["bytes_in"] += len(raw)
+            if owner.journal:
+                owner.journal.append(msg.topic, raw)
+            # Binary payloads and batch frames are handed on as bytes; text payloads are decoded as before
+            payload = raw if is_binary(raw) or is_batch(raw) else raw.decode()
             topic = msg.topic
-            logger.debug(f"[MQTT] Received on '{topic}': {payload}")
+            _log.sampled(1000, "DEBUG", "Received on '{}': {}", topic, payload)
 
-            if self.on_message_callback:
-                self.on_message_callback(topic, payload)
+            if owner.on_message_callback:
+                owner.on_message_callback(topic, payload)
         except Exception as e:
             logger.warning(f"[MQTT] Error processing message: {e}")
 
+    # ==================== Network Thread ====================
+
     def start(self):
         """
-        Start MQTT client loop in a background thread.
+        Start the network thread. It connects, reconnects with backoff, and runs until stop().
         """
-        logger.info(f"[MQTT] Attempting to connect to {self.broker_host}:{self.broker_port}...")
-        thread = threading.Thread(target=self._run_loop, daemon=True)
-        thread.start()
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run_loop, name=self.name, daemon=True)
+        self._thread.start()
 
-    def _run_loop(self):
+    def stop(self, timeout=5.0):
         """
-        Internal loop that maintains connection with the broker.
+        Disconnect and stop the network thread.
         """
+        self._stop_event.set()
+        self._wake_event.set()
         try:
-            logger.debug(f"[MQTT] Running MQTT loop for {self.broker_host}:{self.broker_port}")
-            self.client.connect(self.broker_host, self.broker_port, 60)
-            self.client.loop_forever()
+            self.client.disconnect()
         except Exception as e:
-            logger.error(f"[MQTT] Connection loop failed: {e}")
+            logger.warning(f"[MQTT] Disconnect failed: {e}")
+        if self._thread:
+            self._thread.join(timeout)
+
+    def _backoff_delay(self):
+        """
+        Return the delay before the next connection attempt: exponential in the number of
+        consecutive failures, capped, with jitter so many clients do not retry in lockstep.
+        """
+        owner = self.owner
+        # Exponent clamped: after ~1024 failures 2 ** attempt no longer converts to float
+        ceiling = min(owner.reconnect_max_s, owner.reconnect_min_s * (2 ** min(self._attempt, 16)))
+        return ceiling / 2 + random.uniform(0, ceiling / 2)
+
+    def _run_loop(self):
+        """
+        Network thread body: connect, run the paho loop until the connection drops,
+        then back off and try again. Uses one thread for the connection's whole lifetime.
+        """
+        owner = self.owner
+        while not self._stop_event.is_set():
+            self._connack_ok = False
+            try:
+                logger.debug(f"[MQTT] Connecting to {owner.broker_host}:{owner.broker_port}")
+                self.client.connect(owner.broker_host, owner.broker_port, owner.keepalive)
+            except (OSError, ValueError) as e:
+                self._attempt += 1
+                self._conn_stats["failed_attempts"] += 1
+                self._conn_stats["last_error"] = str(e)
+                self._wait_before_retry(e)
+                continue
+
+            rc = mqtt.MQTT_ERR_SUCCESS
+            drain_budget, drained_at = 0.0, time.monotonic()
+            while rc == mqtt.MQTT_ERR_SUCCESS and not self._stop_event.is_set():
+                rc = self.client.loop(timeout=0.05 if self._offline else 1.0)
+                if self._online and self._offline:
+                    now = time.monotonic()
+                    drain_budget = min(owner.drain_rate, drain_budget + (now - drained_at) * owner.drain_rate)
+                    drained_at = now
+                    drain_budget -= self._drain_offline(int(drain_budget))
+                else:
+                    drain_budget, drained_at = 0.0, time.monotonic()
+
+            self._online = False
+            self._connected.clear()
+            if self._stop_event.is_set():
+                break
+            # A connection that never got a successful CONNACK (e.g. refused) counts as a failed attempt
+            if not self._connack_ok:
+                self._attempt += 1
+                self._conn_stats["failed_attempts"] += 1
+            self._conn_stats["last_error"] = mqtt.error_string(rc)
+            self._wait_before_retry(mqtt.error_string(rc))
+
+    def _wait_before_retry(self, reason):
+        """
+        Sleep for the backoff delay, or until reconnect() / stop() wakes the thread.
+        """
+        delay = self._backoff_delay()
+        self._conn_stats["next_retry_s"] = delay
+        _log.rate_limited(10.0, "WARNING", "Broker {}:{} unavailable ({}), retrying in {:.1f}s",
+                          self.owner.broker_host, self.owner.broker_port, reason, delay)
+        self._wake_event.wait(delay)
+        self._wake_event.clear()
+
+    def _drain_offline(self, budget):
+        """
+        Publish up to `budget` buffered messages. Runs on the network thread.
+
+        Returns:
+            int: Number of messages released.
+        """
+        released = 0
+        while released < budget and self._offline and self._online:
+            entry = self._offline.popleft()
+            if not self._send(*entry):
+                # Queue full: keep the message at the head and retry on the next pass
+                self._offline.appendleft(entry)
+                break
+            released += 1
+        self._conn_stats["drained"] += released
+        return released
 
     def reconnect(self):
         """
-        Reconnect to the MQTT broker by resetting the client.
+        Force a reconnect: drop the current connection, or skip the backoff wait if the
+        network thread is waiting to retry. The client and its thread are reused.
         """
+        if not self._thread or not self._thread.is_alive():
+            self.start()
+            return
+        if self.client.is_connected():
+            try:
+                self.client.disconnect()
+            except Exception as e:
+                logger.warning(f"[MQTT] Disconnect before reconnect failed: {e}")
+        self._attempt = 0
+        self._wake_event.set()
+
+    # ==================== Publishing ====================
+
+    def publish(self, topic, message, qos, retain):
+        """
+        Send a message, or buffer it while disconnected or while earlier offline
+        messages are still draining.
+
+        Returns:
+            bool: True if the message was sent, queued by paho, or buffered offline.
+        """
+        if not self._online or self._offline:
+            if len(self._offline) == self._offline.maxlen:
+                self._conn_stats["offline_dropped"] += 1
+            self._offline.append((topic, message, qos, retain))
+            self._conn_stats["buffered"] += 1
+            return True
+        return self._send(topic, message, qos, retain)
+
+    def _send(self, topic, message, qos, retain):
+        """
+        Hand one message to paho and register it for completion tracking.
+
+        Returns:
+            bool: True if paho accepted the message.
+        """
+        max_queued = self.owner.max_queued
+        if max_queued and len(self._pending) >= max_queued:
+            # paho only bounds QoS 1/2 queueing; this also caps the QoS 0 socket backlog
+            with self._publish_lock:
+                self._publish_stats["rejected"] += 1
+            _log.rate_limited(1.0, "WARNING", "Publish queue full, rejected '{}'", topic)
+            return False
         try:
-            logger.info("[MQTT] Reconnecting to broker...")
-            self.client.disconnect()
+            sent = time.perf_counter()
+            # The lock is not held across the paho call: on_publish may run inline on this thread
+            result = self.client.publish(topic, message, qos=qos, retain=retain)
         except Exception as e:
-            logger.warning(f"[MQTT] Disconnect before reconnect failed: {e}")
+            logger.error(f"[MQTT] Publish exception: {e}")
+            with self._publish_lock:
+                self._publish_stats["failed"] += 1
+            return False
 
-        hostname = socket.gethostname()
-        self.client = mqtt.Client(client_id=f"SmartHomeApp-{hostname}")
-        self.client.on_connect = self._on_connect
-        self.client.on_message = self._on_message
-        self.start()
+        rc = result.rc
+        accepted = False
+        with self._publish_lock:
+            stats = self._publish_stats
+            if rc == mqtt.MQTT_ERR_QUEUE_SIZE:
+                stats["rejected"] += 1
+            elif rc != mqtt.MQTT_ERR_SUCCESS and not (rc == mqtt.MQTT_ERR_NO_CONN and qos > 0):
+                stats["failed"] += 1
+            else:
+                # QoS 1/2 publishes without a connection stay queued in paho and are sent on connect
+                accepted = True
+                stats["published"] += 1
+                stats["bytes_out"] += len(message)
+                acked_at = self._early_acks.pop(result.mid, None)
+                if acked_at is not None:
+                    self._complete(acked_at, (sent, qos))
+                else:
+                    self._pending[result.mid] = (sent, qos)
+                    if len(self._pending) > stats["max_pending"]:
+                        stats["max_pending"] = len(self._pending)
 
-    def publish(self, topic, message):
+        if accepted:
+            _log.rate_limited(1.0, "INFO", "Published to '{}' (qos={}): {}", topic, qos, message)
+            return True
+        _log.rate_limited(1.0, "WARNING", "Failed to publish to '{}' (rc={})", topic, rc)
+        return False
+
+    def ping(self, topic, timeout):
         """
-        Publish a message to a given MQTT topic.
+        Publish an empty QoS 1 message and wait for its PUBACK. Bypasses the offline buffer.
 
         Args:
-            topic (str): Topic to publish to.
-            message (str): Message content.
+            topic (str): Topic no one subscribes to.
+            timeout (float): Seconds to wait for the PUBACK.
+
+        Returns:
+            float: Round-trip time in milliseconds.
+
+        Raises:
+            ConnectionError: If the connection is down or paho rejected the publish.
+            TimeoutError: If no PUBACK arrived in time.
         """
-        try:
-            result = self.client.publish(topic, message)
-            if result.rc == mqtt.MQTT_ERR_SUCCESS:
-                logger.info(f"[MQTT] Published to '{topic}': {message}")
+        if not self._online:
+            raise ConnectionError(f"{self.name} offline")
+        done = threading.Event()
+        sent = time.perf_counter()
+        result = self.client.publish(topic, b"", qos=1)
+        if result.rc != mqtt.MQTT_ERR_SUCCESS:
+            raise ConnectionError(f"{self.name} publish failed (rc={result.rc})")
+        with self._publish_lock:
+            # The PUBACK may already have been handled as an early ack
+            if self._early_acks.pop(result.mid, None) is None:
+                self._ping_waiters[result.mid] = done
             else:
-                logger.warning(f"[MQTT] Failed to publish to '{topic}' (rc={result.rc})")
-        except Exception as e:
-            logger.error(f"[MQTT] Publish exception: {e}")
+                done.set()
+        if not done.wait(timeout):
+            with self._publish_lock:
+                self._ping_waiters.pop(result.mid, None)
+            raise TimeoutError(f"{self.name} no PUBACK within {timeout:.1f}s")
+        return (time.perf_counter() - sent) * 1000
+
+    # ==================== Stats ====================
+
+    def publish_snapshot(self):
+        """
+        Return publish counters, pending depth and raw latency samples per QoS.
+        """
+        with self._publish_lock:
+            stats = dict(self._publish_stats)
+            stats["pending"] = len(self._pending)
+            samples = {qos: list(latencies) for qos, latencies in self._ack_latency_ms.items() if latencies}
+        return stats, samples
 
-    def test_connection(self):
+    def connection_snapshot(self):
         """
-        Test connection to the MQTT broker, and reconnect if needed.
+        Return connection management counters.
+        """
+        stats = dict(self._conn_stats)
+        stats["online"] = self._online
+        stats["attempt"] = self._attempt
+        stats["offline_pending"] = len(self._offline)
+        return stats
+
+    def throughput(self):
+        """
+        Return per-connection throughput since the previous call.
 
         Returns:
-            bool: True if connection is active, else False.
+            dict: index, client id, online state, totals, publish / receive rates in msg/s,
+                  bytes, pending depth and offline buffer depth.
         """
-        try:
-            if self.client is None:
-                logger.error("[MQTT] Client not initialized.")
-                return False
+        stats, _ = self.publish_snapshot()
+        now = time.monotonic()
+        marked_at, published, received = self._rate_mark
+        self._rate_mark = (now, stats["published"], stats["received"])
+        elapsed = now - marked_at
+        return {
+            "index": self.index,
+            "client_id": self.client_id,
+            "online": self._online,
+            "published": stats["published"],
+            "received": stats["received"],
+            "publish_rate": (stats["published"] - published) / elapsed if elapsed else 0.0,
+            "receive_rate": (stats["received"] - received) / elapsed if elapsed else 0.0,
+            "bytes_out": stats["bytes_out"],
+            "bytes_in": stats["bytes_in"],
+            "pending": stats["pending"],
+            "offline_pending": len(self._offline),
+        }
 
-            if not self.client.is_connected():
-                logger.warning("[MQTT] Not connected. Attempting to reconnect...")
-                self.reconnect()
 
-            if self.client.is_connected():
-                logger.success("[MQTT] Ping successful ✔")
-                return True
-            else:
-                logger.error("[MQTT] Reconnection failed ✖")
+class MQTTClient:
+    """
+    MQTT client wrapper for managing connection, publishing, subscription, and reconnection.
+    With connections > 1, publishes are sharded over a pool of broker connections by a hash
+    of the topic, so every topic keeps its ordering on a single connection.
+    """
+
+    def __init__(self, broker_host="localhost", broker_port=1883, topics=None, on_message_callback=None,
+                 journal=None, payload_encodings=None, topic_qos=None, default_qos=0,
+                 max_inflight=20, max_queued=1000, latency_window=10_000, keepalive=60,
+                 reconnect_min_s=0.5, reconnect_max_s=30.0, offline_buffer=10_000, drain_rate=500.0,
+                 connections=1, split_subscriptions=False, client_id=None):
+        """
+        Initialize MQTT client with broker details and optional message handler.
+
+        Args:
+            broker_host (str): MQTT broker address.
+            broker_port (int): MQTT broker port.
+            topics (list): List of topics to subscribe to.
+            on_message_callback (callable): Callback function on new message. With several
+                                            connections it is called from several network threads.
+            journal (MQTTJournal): Optional journal recording every received message.
+            payload_encodings (dict): Topic prefix → 'json' or 'binary' for emulator publishes.
+            topic_qos (dict): Topic prefix → publish QoS (0, 1 or 2); the longest prefix wins.
+            default_qos (int): QoS for topics matching no prefix.
+            max_inflight (int): QoS 1/2 messages awaiting broker acknowledgement before paho queues.
+            max_queued (int): Outgoing messages (in flight + waiting) allowed before publishes are
+                              rejected instead of growing memory (0 = unbounded). Per connection.
+            latency_window (int): Number of recent ack latencies kept per QoS for percentiles.
+            keepalive (int): MQTT keepalive interval in seconds.
+            reconnect_min_s (float): Backoff ceiling for the first reconnect attempt.
+            reconnect_max_s (float): Maximum backoff between reconnect attempts.
+            offline_buffer (int): Publishes kept while disconnected; the oldest are dropped beyond it.
+            drain_rate (float): Messages per second released from the offline buffer after reconnect.
+            connections (int): Number of parallel broker connections.
+            split_subscriptions (bool): Spread subscription filters over the connections by hash
+                                        instead of subscribing everything on the first one.
+            client_id (str): Base MQTT client id (default 'SmartHomeApp-<hostname>');
+                             connection i > 0 appends '-i'.
+        """
+        if connections < 1:
+            raise ValueError(f"connections must be >= 1, got {connections}")
+        self.broker_host = broker_host
+        self.broker_port = broker_port
+        self.keepalive = keepalive
+        self.on_message_callback = on_message_callback
+        self.journal = journal
+        self.encodings = EncodingPolicy(payload_encodings)
+
+        self.default_qos = default_qos
+        self.topic_qos = {}
+        self._qos_cache = {}
+        for prefix, qos in (topic_qos or {}).items():
+            self.set_topic_qos(prefix, qos)
+        self.max_inflight = max_inflight
+        self.max_queued = max_queued
+        self.latency_window = latency_window
+
+        self.reconnect_min_s = reconnect_min_s
+        self.reconnect_max_s = reconnect_max_s
+        self.offline_buffer = offline_buffer
+        self.drain_rate = drain_rate
+
+        # Subscription set (topic → QoS), replayed in one SUBSCRIBE per connection on every (re)connect
+        self.subscriptions = {topic: 0 for topic in topics or []}
+        self.split_subscriptions = split_subscriptions
+
+        base_id = client_id or f"SmartHomeApp-{socket.gethostname()}"
+        self.connections = [
+            _BrokerConnection(self, index, base_id if index == 0 else f"{base_id}-{index}")
+            for index in range(connections)
+        ]
+        self._shard_cache = {}
+
+    @property
+    def topics(self):
+        """
+        Topics currently in the subscription set.
+        """
+        return list(self.subscriptions)
+
+    @property
+    def client(self):
+        """
+        The paho client of the first (primary) connection.
+        """
+        return self.connections[0].client
+
+    # ==================== Sharding ====================
+
+    def _shard_index(self, topic: str) -> int:
+        """
+        Return the connection index for a topic (CRC32 of the topic, stable across runs).
+        """
+        index = self._shard_cache.get(topic)
+        if index is None:
+            index = zlib.crc32(topic.encode()) % len(self.connections)
+            self._shard_cache[topic] = index
+        return index
+
+    def connection_for(self, topic: str):
+        """
+        Return the connection that publishes a topic.
+
+        Args:
+            topic (str): Concrete topic.
+
+        Returns:
+            _BrokerConnection: Connection owning the topic.
+        """
+        if len(self.connections) == 1:
+            return self.connections[0]
+        return self.connections[self._shard_index(topic)]
+
+    def subscriptions_for(self, index: int):
+        """
+        Return the subscription filters assigned to one connection.
+
+        Args:
+            index (int): Connection index.
+
+        Returns:
+            dict: Topic filter → QoS.
+        """
+        if not self.split_subscriptions:
+            return self.subscriptions if index == 0 else {}
+        return {topic: qos for topic, qos in self.subscriptions.items() if self._shard_index(topic) == index}
+
+    # ==================== Lifecycle ====================
+
+    def start(self):
+        """
+        Start the network thread of every connection. Each connects, reconnects with
+        backoff, and runs until stop().
+        """
+        logger.info(f"[MQTT] Attempting to connect to {self.broker_host}:{self.broker_port}"
+                    + (f" with {len(self.connections)} connections" if len(self.connections) > 1 else "") + "...")
+        for connection in self.connections:
+            connection.start()
+
+    def stop(self, timeout=5.0):
+        """
+        Disconnect and stop all network threads. Offline publishes still buffered are discarded.
+
+        Args:
+            timeout (float): Seconds to wait for each thread to exit.
+        """
+        for connection in self.connections:
+            connection.stop(timeout)
+
+    def reconnect(self):
+        """
+        Force a reconnect of every connection: drop it, or skip the backoff wait if its
+        network thread is waiting to retry. Clients and threads are reused.
+        """
+        logger.info("[MQTT] Reconnecting to broker...")
+        for connection in self.connections:
+            connection.reconnect()
+
+    def subscribe(self, topic: str, qos: int = 0):
+        """
+        Add a topic to the subscription set; subscribing again with the same QoS is a no-op.
+
+        Args:
+            topic (str): Topic filter.
+            qos (int): Subscription QoS.
+        """
+        if self.subscriptions.get(topic) == qos:
+            return
+        self.subscriptions[topic] = qos
+        connection = self.connections[self._shard_index(topic) if self.split_subscriptions else 0]
+        if connection._online:
+            connection.client.subscribe(topic, qos)
+            logger.info(f"[MQTT] Subscribed to topic: {topic}")
+
+    def unsubscribe(self, topic: str):
+        """
+        Remove a topic from the subscription set.
+
+        Args:
+            topic (str): Topic filter.
+        """
+        if self.subscriptions.pop(topic, None) is None:
+            return
+        connection = self.connections[self._shard_index(topic) if self.split_subscriptions else 0]
+        if connection._online:
+            connection.client.unsubscribe(topic)
+
+    # ==================== Publishing ====================
+
+    def encoding_for(self, topic):
+        """
+        Return the payload encoding negotiated for a topic.
+
+        Args:
+            topic (str): Topic to publish to.
+
+        Returns:
+            str: 'json' or 'binary'.
+        """
+        return self.encodings.encoding_for(topic)
+
+    def set_topic_qos(self, prefix: str, qos: int):
+        """
+        Set the publish QoS for a topic prefix.
+
+        Args:
+            prefix (str): Topic prefix, e.g. 'Home/relay'.
+            qos (int): 0, 1 or 2.
+
+        Raises:
+            ValueError: If the QoS level is invalid.
+        """
+        if qos not in QOS_LEVELS:
+            raise ValueError(f"Invalid QoS: {qos!r}")
+        self.topic_qos[prefix] = qos
+        self._qos_cache.clear()
+
+    def qos_for(self, topic: str) -> int:
+        """
+        Return the publish QoS configured for a topic (longest matching prefix).
+
+        Args:
+            topic (str): Topic to publish to.
+
+        Returns:
+            int: QoS level.
+        """
+        qos = self._qos_cache.get(topic)
+        if qos is None:
+            best = ""
+            qos = self.default_qos
+            for prefix, candidate in self.topic_qos.items():
+                if topic.startswith(prefix) and len(prefix) >= len(best):
+                    best, qos = prefix, candidate
+            self._qos_cache[topic] = qos
+        return qos
+
+    def publish(self, topic, message, qos=None, retain=False):
+        """
+        Publish a message to a given MQTT topic and track it until completion.
+        While the topic's connection is down, or while its earlier offline messages are
+        still draining, the message goes to that connection's offline buffer instead.
+
+        Args:
+            topic (str): Topic to publish to.
+            message (str | bytes): Message content.
+            qos (int): QoS override; defaults to the topic's configured QoS.
+            retain (bool): Ask the broker to retain the message.
+
+        Returns:
+            bool: True if the message was sent, queued by paho, or buffered offline.
+        """
+        if qos is None:
+            qos = self.qos_for(topic)
+        return self.connection_for(topic).publish(topic, message, qos, retain)
+
+    # ==================== Health & Stats ====================
+
+    def ping(self, timeout=2.0):
+        """
+        Measure broker round trips with a QoS 1 publish on every connection.
+        Blocks up to `timeout` per connection; meant for HealthMonitor's worker threads.
+
+        Args:
+            timeout (float): Seconds to wait for each PUBACK.
+
+        Returns:
+            float: Slowest round-trip time in milliseconds.
+
+        Raises:
+            ConnectionError: If a connection is down.
+            TimeoutError: If a PUBACK did not arrive in time.
+        """
+        return max(connection.ping(f"{HEALTH_TOPIC}/{connection.client_id}", timeout)
+                   for connection in self.connections)
+
+    def get_publish_stats(self):
+        """
+        Return publish flow-control counters and ack latency percentiles, summed over all connections.
+
+        Returns:
+            dict: published / acked / rejected (queue full) / failed / lost counts, current and maximum
+                  pending (in flight + queued) messages, and per-QoS p50/p95/p99/max ack latency in ms.
+        """
+        stats = {}
+        merged = {}
+        for connection in self.connections:
+            counters, samples = connection.publish_snapshot()
+            for key, value in counters.items():
+                stats[key] = stats.get(key, 0) + value
+            for qos, values in samples.items():
+                merged.setdefault(qos, []).extend(values)
+        stats["latency_ms"] = {qos: _percentiles(sorted(values)) for qos, values in merged.items()}
+        return stats
+
+    def get_connection_stats(self):
+        """
+        Return connection management counters, summed over all connections.
+
+        Returns:
+            dict: online state (all connections up), connects / disconnects / failed attempts, highest
+                  backoff step, last error, and offline buffer depth / buffered / dropped / drained.
+        """
+        stats = {}
+        snapshots = [connection.connection_snapshot() for connection in self.connections]
+        for snapshot in snapshots:
+            for key, value in snapshot.items():
+                if isinstance(value, bool) or value is None or isinstance(value, str):
+                    continue
+                stats[key] = stats.get(key, 0) + value
+        stats["online"] = all(snapshot["online"] for snapshot in snapshots)
+        stats["attempt"] = max(snapshot["attempt"] for snapshot in snapshots)
+        stats["next_retry_s"] = max(snapshot["next_retry_s"] for snapshot in snapshots)
+        stats["last_error"] = next((s["last_error"] for s in snapshots if s["last_error"]), None)
+        return stats
+
+    def get_shard_stats(self):
+        """
+        Return per-connection throughput since the previous call.
+
+        Returns:
+            list[dict]: One entry per connection (see _BrokerConnection.throughput()).
+        """
+        return [connection.throughput() for connection in self.connections]
+
+    def wait_connected(self, timeout=None):
+        """
+        Block until every connection has been accepted by the broker.
+
+        Args:
+            timeout (float): Maximum seconds to wait; None waits indefinitely.
+
+        Returns:
+            bool: True if all connections are up.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for connection in self.connections:
+            remaining = None if deadline is None else max(deadline - time.monotonic(), 0)
+            if not connection._connected.wait(remaining):
                 return False
+        return self._all_connected()
 
-        except Exception as e:
-            logger.error(f"[MQTT] Ping or reconnect error: {e}")
-            return False
+    def _all_connected(self):
+        """
+        Return True if every connection's paho client is connected.
+        """
+        return all(connection.client.is_connected() for connection in self.connections)
 
     @property
     def is_connected(self):
@@ -159,8 +830,8 @@ class MQTTClient:
         Check if the MQTT client is connected.
 
         Returns:
-            bool: True if connected.
+            bool: True if every connection is connected.
         """
-        connected = self.client is not None and self.client.is_connected()
-        logger.debug(f"[MQTT] is_connected check: {connected}")
+        connected = self._all_connected()
+        _log.debug("is_connected check: {}", connected)
         return connected
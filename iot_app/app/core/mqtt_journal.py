@@ -0,0 +1,294 @@
+"""
+Project: IoT Smart Home
+File: mqtt_journal.py
+Description:
+Persistent journal of the raw MQTT stream.
+MQTTJournal appends (timestamp, topic, payload bytes) records to size-capped binary
+segment files; JournalReader memory-maps segments and yields records without copying
+payloads; replay_journal() feeds them to a handler (MQTTListener routing, the GUI bridge,
+or a broker republish) at recorded speed, N times faster, or as fast as possible.
+
+Segment layout:
+    file header:   b"IOTJ" + uint16 version
+    record header: float64 timestamp (epoch seconds), uint16 topic length, uint32 payload length
+    record body:   topic (UTF-8) followed by the payload bytes
+"""
+
+import mmap
+import os
+import struct
+import threading
+import time
+from iot_app.app.core.payload_codec import is_binary, is_batch
+from iot_app.app.utils.logger import logger
+
+MAGIC = b"IOTJ"
+VERSION = 1
+FILE_HEADER = struct.Struct("<4sH")
+RECORD_HEADER = struct.Struct("<dHI")
+SEGMENT_SUFFIX = ".mqj"
+
+
+class MQTTJournal:
+    """
+    Append-only writer for the MQTT journal. Safe to call from the paho network thread.
+    Writes go through a large userspace buffer that a background thread flushes every
+    flush_interval_s, and that is also flushed on segment rotation and on close.
+    """
+    def __init__(self, directory="mqtt_journal", segment_bytes=32 * 1024 * 1024,
+                 max_segments=16, flush_interval_s=1.0, buffer_bytes=1024 * 1024):
+        """
+        Initialize the journal and open a fresh segment.
+
+        Args:
+            directory (str): Folder holding the segment files.
+            segment_bytes (int): Size after which a new segment is started.
+            max_segments (int): Number of segments kept; the oldest are deleted (None keeps all).
+            flush_interval_s (float): Maximum age of buffered records before they are written out.
+            buffer_bytes (int): Size of the write buffer.
+        """
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.max_segments = max_segments
+        self.flush_interval_s = flush_interval_s
+        self.buffer_bytes = buffer_bytes
+
+        self._lock = threading.Lock()
+        self._file = None
+        self._segment_size = 0
+        self._segment_seq = 0
+        self.records = 0
+        self.bytes_written = 0
+
+        os.makedirs(directory, exist_ok=True)
+        self._open_segment()
+
+        # Flushing from a timer thread keeps buffered records from going stale when traffic stops
+        self._closed = threading.Event()
+        self._flusher = threading.Thread(target=self._flush_loop, name="JournalFlush", daemon=True)
+        self._flusher.start()
+
+    def append(self, topic: str, payload, timestamp=None):
+        """
+        Append one message to the current segment.
+
+        Args:
+            topic (str): MQTT topic.
+            payload (bytes): Raw payload bytes (str is encoded as UTF-8).
+            timestamp (float): Receive time in epoch seconds (defaults to now).
+        """
+        topic_bytes = topic.encode()
+        if isinstance(payload, str):
+            payload = payload.encode()
+        header = RECORD_HEADER.pack(timestamp or time.time(), len(topic_bytes), len(payload))
+        size = len(header) + len(topic_bytes) + len(payload)
+
+        with self._lock:
+            if self._file is None:
+                return
+            write = self._file.write
+            write(header)
+            write(topic_bytes)
+            write(payload)
+            self._segment_size += size
+            self.records += 1
+            self.bytes_written += size
+
+            if self._segment_size >= self.segment_bytes:
+                self._rotate()
+
+    def flush(self):
+        """
+        Write buffered records to disk.
+        """
+        with self._lock:
+            if self._file:
+                self._file.flush()
+
+    def _flush_loop(self):
+        """
+        Flusher thread body: flush every flush_interval_s until closed.
+        """
+        while not self._closed.wait(self.flush_interval_s):
+            self.flush()
+
+    def close(self):
+        """
+        Stop the flusher, then flush and close the current segment.
+        """
+        self._closed.set()
+        with self._lock:
+            if self._file:
+                self._file.close()
+                self._file = None
+        logger.info(f"[Journal] Closed after {self.records:,} records.")
+
+    # ==================== Segments ====================
+
+    def _open_segment(self):
+        """
+        Start a new segment named after the current time in milliseconds and a sequence number.
+        """
+        self._segment_seq += 1
+        name = f"{int(time.time() * 1000):013d}-{self._segment_seq:05d}{SEGMENT_SUFFIX}"
+        path = os.path.join(self.directory, name)
+        self._file = open(path, "ab", buffering=self.buffer_bytes)
+        self._file.write(FILE_HEADER.pack(MAGIC, VERSION))
+        self._segment_size = FILE_HEADER.size
+        logger.debug(f"[Journal] Writing segment {path}")
+
+    def _rotate(self):
+        """
+        Close the full segment, open the next one and apply segment retention.
+        Called with the lock held.
+        """
+        self._file.close()
+        self._open_segment()
+        if self.max_segments:
+            segments = list_segments(self.directory)
+            for path in segments[:-self.max_segments]:
+                try:
+                    os.remove(path)
+                except OSError as e:
+                    logger.warning(f"[Journal] Could not delete old segment {path}: {e}")
+
+
+def list_segments(path):
+    """
+    Return the segment files of a journal directory in recording order.
+
+    Args:
+        path (str): Journal directory, or a single segment file.
+
+    Returns:
+        list[str]: Segment file paths.
+    """
+    if os.path.isfile(path):
+        return [path]
+    return sorted(
+        os.path.join(path, name) for name in os.listdir(path) if name.endswith(SEGMENT_SUFFIX)
+    )
+
+
+class JournalReader:
+    """
+    Memory-mapped reader over journal segments.
+    Payloads are yielded as memoryview slices of the mapping (no copy); a view is only
+    valid while its segment is being iterated, so consumers that keep payloads must copy them.
+    """
+    def __init__(self, path):
+        """
+        Initialize the reader.
+
+        Args:
+            path (str): Journal directory or a single segment file.
+        """
+        self.path = path
+        self.segments = list_segments(path)
+
+    def __iter__(self):
+        return self.records()
+
+    def records(self, start_ts=None, end_ts=None, topic_prefix=None):
+        """
+        Iterate over journal records in recording order.
+
+        Args:
+            start_ts (float): Skip records older than this epoch time.
+            end_ts (float): Stop at the first record at or after this epoch time.
+            topic_prefix (str): Only yield topics starting with this prefix.
+
+        Yields:
+            tuple: (timestamp, topic, payload) with payload as a memoryview.
+        """
+        topics = {}
+        for segment in self.segments:
+            for ts, topic, payload in self._read_segment(segment, topics):
+                if start_ts is not None and ts < start_ts:
+                    continue
+                if end_ts is not None and ts >= end_ts:
+                    return
+                if topic_prefix is not None and not topic.startswith(topic_prefix):
+                    continue
+                yield ts, topic, payload
+
+    @staticmethod
+    def _read_segment(path, topics):
+        """
+        Yield the records of one segment. A truncated trailing record (e.g. after a crash) ends the segment.
+
+        Args:
+            path (str): Segment file.
+            topics (dict): Cache of decoded topic names keyed by their bytes.
+        """
+        size = os.path.getsize(path)
+        if size <= FILE_HEADER.size:
+            return
+        with open(path, "rb") as file:
+            mm = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(mm)
+        try:
+            magic, version = FILE_HEADER.unpack_from(mm, 0)
+            if magic != MAGIC or version != VERSION:
+                logger.warning(f"[Journal] Skipping {path}: not a v{VERSION} journal segment")
+                return
+
+            unpack_from = RECORD_HEADER.unpack_from
+            header_size = RECORD_HEADER.size
+            offset = FILE_HEADER.size
+            while offset + header_size <= size:
+                ts, topic_len, payload_len = unpack_from(mm, offset)
+                start = offset + header_size
+                end = start + topic_len + payload_len
+                if end > size:
+                    break
+                raw_topic = mm[start:start + topic_len]
+                topic = topics.get(raw_topic)
+                if topic is None:
+                    topic = topics[raw_topic] = raw_topic.decode()
+                yield ts, topic, view[start + topic_len:end]
+                offset = end
+        finally:
+            try:
+                view.release()
+                mm.close()
+            except BufferError:
+                # A consumer still holds a payload view; the mapping is closed once it is released
+                pass
+
+
+def replay_journal(reader, handler, speed=None, decode=False, **filters):
+    """
+    Feed journal records to a handler, preserving recorded timing scaled by `speed`.
+
+    Args:
+        reader (JournalReader): Source of records.
+        handler (Callable[[str, object], None]): Receives (topic, payload), e.g. MQTTListener.route_message,
+                                                 MQTTSignalBridge.submit or MQTTClient.publish.
+        speed (float): 1.0 for real time, N for N times faster, None or 0 for maximum speed.
+        decode (bool): Pass payloads as MQTTClient delivers them (str, or bytes for binary payloads)
+                       instead of a memoryview.
+        **filters: start_ts, end_ts and topic_prefix forwarded to JournalReader.records().
+
+    Returns:
+        dict: count, elapsed_s and rate (messages per second).
+    """
+    count = 0
+    started = time.perf_counter()
+    first_ts = None
+    for ts, topic, payload in reader.records(**filters):
+        if speed:
+            if first_ts is None:
+                first_ts = ts
+            delay = (ts - first_ts) / speed - (time.perf_counter() - started)
+            if delay > 0.001:
+                time.sleep(delay)
+        if decode:
+            payload = bytes(payload) if is_binary(payload) or is_batch(payload) else str(payload, "utf-8", "replace")
+        handler(topic, payload)
+        count += 1
+
+    elapsed = time.perf_counter() - started
+    rate = count / elapsed if elapsed else 0.0
+    logger.info(f"[Journal] Replayed {count:,} messages in {elapsed:.2f}s ({rate:,.0f} msg/s)")
+    return {"count": count, "elapsed_s": elapsed, "rate": rate}
@@ -0,0 +1,237 @@
+"""
+Project: IoT Smart Home
+File: payload_codec.py
+Description:
+Compact binary encoding for emulator payloads, as an opt-in alternative to JSON/text.
+A payload is a magic byte, a schema id byte, and a fixed little-endian struct of the
+device's readings (an empty body means the device has no value, e.g. turned off).
+The magic byte 0xB1 can never start valid UTF-8, so receivers tell binary and text
+payloads apart without any out-of-band signalling.
+Batch frames (magic 0xB2) carry many (topic, payload) messages in one MQTT publish.
+"""
+
+import struct
+
+MAGIC = 0xB1
+BATCH_MAGIC = 0xB2
+BATCH_VERSION = 1
+BATCH_HEADER = struct.Struct("<BBI")
+BATCH_ENTRY = struct.Struct("<HI")
+
+# Schema id → (device type, struct layout, metric names in layout order, scale applied before packing)
+SCHEMAS = {
+    1: ("dht", struct.Struct("<hH"), ("temperature", "humidity"), 10),
+    2: ("light", struct.Struct("<H"), ("lux",), 1),
+    3: ("motion", struct.Struct("<B"), ("motion",), 1),
+    4: ("relay", struct.Struct("<B"), ("state",), 1),
+    5: ("button", struct.Struct("<B"), ("pressed",), 1),
+}
+
+SCHEMA_IDS = {device_type: schema_id for schema_id, (device_type, _, _, _) in SCHEMAS.items()}
+
+# Precomputed per-schema state so encoding and decoding do no lookups beyond one dict access
+_ENCODERS = {
+    device_type: (bytes((MAGIC, schema_id)), layout.pack, metrics, scale)
+    for schema_id, (device_type, layout, metrics, scale) in SCHEMAS.items()
+}
+_DECODERS = {
+    schema_id: (device_type, layout.unpack_from, metrics, scale)
+    for schema_id, (device_type, layout, metrics, scale) in SCHEMAS.items()
+}
+
+ENCODINGS = ("json", "binary")
+
+
+def is_binary(payload) -> bool:
+    """
+    Check whether a raw payload uses the binary encoding.
+
+    Args:
+        payload (bytes): Raw MQTT payload.
+
+    Returns:
+        bool: True if the payload starts with the binary magic byte.
+    """
+    return len(payload) >= 2 and payload[0] == MAGIC
+
+
+def encode_readings(device_type: str, readings) -> bytes:
+    """
+    Encode a device's typed readings.
+
+    Args:
+        device_type (str): Device type selecting the schema (e.g., 'dht').
+        readings (list[tuple] | None): (metric, value) pairs as returned by BaseEmulator.readings(),
+                                       or None / empty when the device has no value.
+
+    Returns:
+        bytes: Binary payload.
+
+    Raises:
+        KeyError: If the device type has no schema.
+    """
+    header, pack, metrics, scale = _ENCODERS[device_type]
+    if not readings:
+        return header
+    if len(metrics) == 1:
+        return header + pack(round(readings[0][1] * scale))
+    values = dict(readings)
+    return header + pack(*[round(values[metric] * scale) for metric in metrics])
+
+
+def decode_payload(payload):
+    """
+    Decode a binary payload.
+
+    Args:
+        payload (bytes): Raw payload starting with the magic byte.
+
+    Returns:
+        tuple: (device type, {metric: float} or None if the device has no value).
+
+    Raises:
+        ValueError: If the payload is not binary or uses an unknown schema.
+    """
+    if len(payload) < 2 or payload[0] != MAGIC:
+        raise ValueError("not a binary payload")
+    decoder = _DECODERS.get(payload[1])
+    if decoder is None:
+        raise ValueError(f"unknown payload schema id {payload[1]}")
+    device_type, unpack_from, metrics, scale = decoder
+    if len(payload) == 2:
+        return device_type, None
+    values = unpack_from(payload, 2)
+    if scale == 1:
+        return device_type, dict(zip(metrics, values))
+    return device_type, {metric: value / scale for metric, value in zip(metrics, values)}
+
+
+def is_batch(payload) -> bool:
+    """
+    Check whether a raw payload is a batch frame.
+
+    Args:
+        payload (bytes): Raw MQTT payload.
+
+    Returns:
+        bool: True if the payload starts with the batch magic byte.
+    """
+    return len(payload) >= BATCH_HEADER.size and payload[0] == BATCH_MAGIC
+
+
+def encode_batch(entries) -> bytes:
+    """
+    Pack (topic, payload) messages into one batch frame.
+
+    Args:
+        entries (list[tuple]): (topic, payload) pairs; payloads may be str or bytes.
+
+    Returns:
+        bytes: Batch frame.
+    """
+    parts = [BATCH_HEADER.pack(BATCH_MAGIC, BATCH_VERSION, len(entries))]
+    pack_entry = BATCH_ENTRY.pack
+    for topic, payload in entries:
+        topic_bytes = topic.encode()
+        if isinstance(payload, str):
+            payload = payload.encode()
+        parts.append(pack_entry(len(topic_bytes), len(payload)))
+        parts.append(topic_bytes)
+        parts.append(payload)
+    return b"".join(parts)
+
+
+def decode_batch(payload):
+    """
+    Unpack a batch frame. Payloads come back as MQTTClient delivers them:
+    bytes for binary payloads, str for text.
+
+    Args:
+        payload (bytes): Batch frame.
+
+    Returns:
+        list[tuple]: (topic, payload) pairs in publish order.
+
+    Raises:
+        ValueError: If the frame is malformed or of an unknown version.
+    """
+    if not is_batch(payload):
+        raise ValueError("not a batch frame")
+    _, version, count = BATCH_HEADER.unpack_from(payload, 0)
+    if version != BATCH_VERSION:
+        raise ValueError(f"unknown batch version {version}")
+
+    data = memoryview(payload)
+    unpack_entry = BATCH_ENTRY.unpack_from
+    entry_size = BATCH_ENTRY.size
+    offset = BATCH_HEADER.size
+    entries = []
+    for _ in range(count):
+        topic_len, payload_len = unpack_entry(data, offset)
+        start = offset + entry_size
+        end = start + topic_len + payload_len
+        if end > len(data):
+            raise ValueError("truncated batch frame")
+        topic = str(data[start:start + topic_len], "utf-8")
+        body = bytes(data[start + topic_len:end])
+        entries.append((topic, body if is_binary(body) else body.decode()))
+        offset = end
+    return entries
+
+
+class EncodingPolicy:
+    """
+    Topic-prefix → payload encoding table, shared by publishers and subscribers.
+    The longest matching prefix wins; topics matching no prefix use the default.
+    """
+    def __init__(self, prefixes=None, default="json"):
+        """
+        Initialize the policy.
+
+        Args:
+            prefixes (dict): Topic prefix → 'json' or 'binary', e.g. {'Home/fleet/': 'binary'}.
+            default (str): Encoding for topics matching no prefix.
+
+        Raises:
+            ValueError: If an encoding name is unknown.
+        """
+        self.default = default
+        self.prefixes = {}
+        self._cache = {}
+        for prefix, encoding in (prefixes or {}).items():
+            self.set(prefix, encoding)
+        if default not in ENCODINGS:
+            raise ValueError(f"Unknown payload encoding: {default!r}")
+
+    def set(self, prefix: str, encoding: str):
+        """
+        Set the encoding for a topic prefix.
+
+        Args:
+            prefix (str): Topic prefix.
+            encoding (str): 'json' or 'binary'.
+        """
+        if encoding not in ENCODINGS:
+            raise ValueError(f"Unknown payload encoding: {encoding!r}")
+        self.prefixes[prefix] = encoding
+        self._cache.clear()
+
+    def encoding_for(self, topic: str) -> str:
+        """
+        Return the encoding negotiated for a topic.
+
+        Args:
+            topic (str): Concrete topic.
+
+        Returns:
+            str: 'json' or 'binary'.
+        """
+        encoding = self._cache.get(topic)
+        if encoding is None:
+            best = ""
+            encoding = self.default
+            for prefix, candidate in self.prefixes.items():
+                if topic.startswith(prefix) and len(prefix) >= len(best):
+                    best, encoding = prefix, candidate
+            self._cache[topic] = encoding
+        return encoding
@@ -0,0 +1,173 @@
+"""
+Project: IoT Smart Home
+File: publish_aggregator.py
+Description:
+Optional publish aggregator between the emulators and MQTTClient.
+Messages published within a time window are packed into one batch frame on a
+batch topic, so thousands of simulated devices cost one broker message per window
+instead of one per device. MQTTListener and MQTTSignalBridge fan batches back out.
+Topics the client publishes at QoS > 0 (relay, button) bypass batching, since a frame
+is published at the batch topic's QoS and would drop their delivery guarantee.
+"""
+
+import threading
+from iot_app.app.core.payload_codec import encode_batch, BATCH_ENTRY, BATCH_HEADER
+from iot_app.app.utils.logger import get_logger
+
+_log = get_logger("aggregator", "Aggregator")
+
+BATCH_TOPIC = "Home/_batch"
+
+
+class PublishAggregator:
+    """
+    Wraps an MQTTClient and exposes the same publish() / encoding_for() interface,
+    so emulators use it transparently. A background thread flushes every window;
+    a batch that reaches max_batch_bytes is flushed immediately.
+    Batches are detached and published under one send lock, so they reach the client in
+    the order they were filled, whichever thread flushes them.
+    """
+    def __init__(self, mqtt_client, batch_topic=BATCH_TOPIC, window_ms=50, max_batch_bytes=64 * 1024):
+        """
+        Initialize the aggregator and start its flush thread.
+
+        Args:
+            mqtt_client (MQTTClient): Client that publishes the batch frames.
+            batch_topic (str): Topic batch frames are published on (listeners subscribe to 'Home/_batch/#').
+            window_ms (int): Maximum time a message waits before its batch is published.
+            max_batch_bytes (int): Frame size at which a batch is published early.
+        """
+        self.client = mqtt_client
+        self.batch_topic = batch_topic
+        self.window_s = window_ms / 1000
+        self.max_batch_bytes = max_batch_bytes
+
+        self._lock = threading.Lock()
+        # Held from detaching a batch until the client has it; orders batches and direct publishes
+        self._send_lock = threading.Lock()
+        self._pending = []
+        self._pending_bytes = BATCH_HEADER.size
+        self._stop_event = threading.Event()
+
+        self._stats = {"messages": 0, "batches": 0, "bytes": 0, "size_flushes": 0, "unbatched": 0}
+
+        self._thread = threading.Thread(target=self._run, name="PublishAggregator", daemon=True)
+        self._thread.start()
+
+    def encoding_for(self, topic):
+        """
+        Return the payload encoding the wrapped client negotiated for a topic.
+        """
+        return self.client.encoding_for(topic)
+
+    def publish(self, topic, message):
+        """
+        Queue a message for the current batch; QoS > 0 and oversized messages are published directly.
+
+        Args:
+            topic (str): Topic the message belongs to.
+            message (str | bytes): Message content.
+
+        Returns:
+            bool: True if queued, else the wrapped client's publish result.
+        """
+        # Sized (and queued) encoded: payloads like '23.4 °C' are longer in UTF-8 than in characters
+        payload = message.encode() if isinstance(message, str) else message
+        size = BATCH_ENTRY.size + len(topic.encode()) + len(payload)
+        if BATCH_HEADER.size + size > self.max_batch_bytes or self.client.qos_for(topic) > 0:
+            # Too large to share a frame with anything else, or needs its own acknowledged delivery.
+            # Pending readings go first, so this one cannot overtake older ones of its topic
+            with self._send_lock:
+                with self._lock:
+                    batch = self._take()
+                    self._stats["unbatched"] += 1
+                if batch:
+                    self._send(batch)
+                return self.client.publish(topic, message)
+
+        with self._lock:
+            if self._pending_bytes + size <= self.max_batch_bytes:
+                self._append(topic, payload, size)
+                return True
+
+        with self._send_lock:
+            batch = None
+            with self._lock:
+                # Re-checked: another thread may have flushed since
+                if self._pending_bytes + size > self.max_batch_bytes:
+                    batch = self._take()
+                    self._stats["size_flushes"] += 1
+                self._append(topic, payload, size)
+            if batch:
+                self._send(batch)
+        return True
+
+    def flush(self):
+        """
+        Publish the pending batch now.
+        """
+        with self._send_lock:
+            with self._lock:
+                batch = self._take()
+            if batch:
+                self._send(batch)
+
+    def stop(self):
+        """
+        Stop the flush thread and publish whatever is still pending.
+        """
+        self._stop_event.set()
+        self._thread.join(timeout=2.0)
+        self.flush()
+
+    def _run(self):
+        """
+        Thread body: flush once per window until stopped.
+        """
+        while not self._stop_event.wait(self.window_s):
+            self.flush()
+
+    def _append(self, topic, payload, size):
+        """
+        Add an encoded message to the pending batch. Called with the lock held.
+        """
+        self._pending.append((topic, payload))
+        self._pending_bytes += size
+        self._stats["messages"] += 1
+
+    def _take(self):
+        """
+        Detach the pending batch. Called with the lock held.
+
+        Returns:
+            list[tuple]: Pending (topic, message) pairs.
+        """
+        batch = self._pending
+        self._pending = []
+        self._pending_bytes = BATCH_HEADER.size
+        return batch
+
+    def _send(self, batch):
+        """
+        Encode and publish one batch frame. Called with the send lock held.
+        """
+        frame = encode_batch(batch)
+        self.client.publish(self.batch_topic, frame)
+        with self._lock:
+            self._stats["batches"] += 1
+            self._stats["bytes"] += len(frame)
+        _log.log("TRACE", "Published batch of {} messages ({} B)", len(batch), len(frame))
+
+    def get_stats(self):
+        """
+        Return aggregation counters.
+
+        Returns:
+            dict: messages, batches, frame bytes, early (size) flushes, unbatched (oversized or QoS > 0) messages,
+                  average messages per batch and pending messages.
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats["pending"] = len(self._pending)
+        stats["avg_batch_size"] = stats["messages"] / stats["batches"] if stats["batches"] else 0.0
+        return stats
@@ -0,0 +1,210 @@
+"""
+Project: IoT Smart Home
+File: rollup.py
+Description:
+Background aggregation job that keeps the 1-minute, 1-hour and 1-day rollup tables
+of device_readings up to date. Each run folds only the readings added since the
+table's watermark (last processed id) into min/max/sum/count buckets, so no history
+is ever rescanned. Optionally drops raw monthly partitions past a retention period.
+"""
+
+import threading
+import time
+from datetime import date, timedelta
+import mysql.connector
+from iot_app.app.core.db_client import ROLLUP_TABLES
+from iot_app.app.utils.logger import logger
+
+# Folds a device_readings id range into a rollup table; existing buckets are merged
+ROLLUP_QUERY = (
+    "INSERT INTO {table} (device_id, device_type, metric, bucket, min_value, max_value, sum_value, sample_count) "
+    "SELECT * FROM ("
+    "SELECT device_id, device_type, metric, {bucket} AS b, "
+    "MIN(value) AS agg_min, MAX(value) AS agg_max, SUM(value) AS agg_sum, COUNT(*) AS agg_count "
+    "FROM device_readings WHERE id > %s AND id <= %s "
+    "GROUP BY device_id, device_type, metric, b) AS agg "
+    "ON DUPLICATE KEY UPDATE "
+    "min_value = LEAST(min_value, agg_min), max_value = GREATEST(max_value, agg_max), "
+    "sum_value = sum_value + agg_sum, sample_count = sample_count + agg_count"
+)
+
+
+class RollupJob:
+    """
+    Periodically aggregates new device_readings rows into the rollup tables.
+    Every table is advanced in its own transaction together with its watermark,
+    so a crash never double-counts or skips readings.
+    """
+    def __init__(self, db_client, interval_s=60, max_rows_per_run=500_000, raw_retention_days=None):
+        """
+        Initialize the rollup job.
+
+        Args:
+            db_client (DBClient): Connected database client (connections are taken from its pool).
+            interval_s (float): Seconds between runs.
+            max_rows_per_run (int): Upper bound on ids folded per table and run, to keep transactions short.
+            raw_retention_days (int): Drop raw monthly partitions older than this many days
+                                      once the rollups have caught up (None keeps raw data forever).
+        """
+        self.db = db_client
+        self.interval_s = interval_s
+        self.max_rows_per_run = max_rows_per_run
+        self.raw_retention_days = raw_retention_days
+
+        self._thread = None
+        self._stop_event = threading.Event()
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            "runs": 0,
+            "errors": 0,
+            "last_run_ms": 0.0,
+            "max_run_ms": 0.0,
+            "head_id": 0,
+            "watermarks": {},
+            "partitions_dropped": 0,
+        }
+
+    # ==================== Lifecycle ====================
+
+    def start(self):
+        """
+        Start the background rollup thread (no-op if already running).
+        """
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="RollupJob", daemon=True)
+        self._thread.start()
+        logger.info(f"[Rollup] Job started (every {self.interval_s}s).")
+
+    def stop(self, timeout=5.0):
+        """
+        Stop the background thread after its current run.
+
+        Args:
+            timeout (float): Seconds to wait for the thread to exit.
+        """
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=timeout)
+            self._thread = None
+        logger.info("[Rollup] Job stopped.")
+
+    def _run(self):
+        """
+        Thread body: run once per interval until stopped.
+        """
+        while not self._stop_event.is_set():
+            self.run_once()
+            self._stop_event.wait(self.interval_s)
+
+    # ==================== Aggregation ====================
+
+    def run_once(self):
+        """
+        Advance every rollup table to the current head of device_readings.
+
+        Returns:
+            bool: True if the run completed without errors.
+        """
+        if not self.db.is_connected:
+            return False
+
+        started = time.perf_counter()
+        try:
+            with self.db.connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute("SELECT COALESCE(MAX(id), 0) FROM device_readings")
+                head = cursor.fetchone()[0]
+                conn.commit()
+
+                watermarks = {}
+                for table, (_, bucket) in ROLLUP_TABLES.items():
+                    watermarks[table] = self._roll_table(conn, cursor, table, bucket, head)
+
+                if self.raw_retention_days is not None and all(wm >= head for wm in watermarks.values()):
+                    self._apply_retention(conn, cursor)
+                cursor.close()
+        except mysql.connector.Error as e:
+            with self._stats_lock:
+                self._stats["errors"] += 1
+            logger.warning(f"[Rollup] Run failed: {e}")
+            return False
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        with self._stats_lock:
+            stats = self._stats
+            stats["runs"] += 1
+            stats["last_run_ms"] = elapsed_ms
+            stats["max_run_ms"] = max(stats["max_run_ms"], elapsed_ms)
+            stats["head_id"] = head
+            stats["watermarks"] = watermarks
+        logger.debug(f"[Rollup] Rolled up to id {head} in {elapsed_ms:.1f} ms")
+        return True
+
+    def _roll_table(self, conn, cursor, table, bucket, head):
+        """
+        Fold readings between the table's watermark and head into the table.
+
+        Args:
+            conn: Pooled connection.
+            cursor: Cursor on that connection.
+            table (str): Rollup table name.
+            bucket (str): SQL expression mapping ts to the bucket start.
+            head (int): Highest device_readings id to consider.
+
+        Returns:
+            int: The table's new watermark.
+        """
+        cursor.execute("INSERT IGNORE INTO rollup_watermarks (rollup_table, last_id) VALUES (%s, 0)", (table,))
+        cursor.execute("SELECT last_id FROM rollup_watermarks WHERE rollup_table = %s FOR UPDATE", (table,))
+        last_id = cursor.fetchone()[0]
+        upper = min(head, last_id + self.max_rows_per_run)
+        if upper <= last_id:
+            conn.commit()
+            return last_id
+
+        cursor.execute(ROLLUP_QUERY.format(table=table, bucket=bucket), (last_id, upper))
+        cursor.execute("UPDATE rollup_watermarks SET last_id = %s WHERE rollup_table = %s", (upper, table))
+        conn.commit()
+        return upper
+
+    def _apply_retention(self, conn, cursor):
+        """
+        Drop raw device_readings partitions whose whole range is older than the retention period.
+
+        Args:
+            conn: Pooled connection.
+            cursor: Cursor on that connection.
+        """
+        cutoff = date.today() - timedelta(days=self.raw_retention_days)
+        cursor.execute(
+            "SELECT PARTITION_NAME FROM information_schema.PARTITIONS "
+            "WHERE TABLE_SCHEMA = %s AND TABLE_NAME = 'device_readings' "
+            "AND PARTITION_NAME IS NOT NULL AND PARTITION_NAME <> 'pmax' "
+            "AND CAST(PARTITION_DESCRIPTION AS UNSIGNED) <= TO_DAYS(%s)",
+            (self.db.database, cutoff)
+        )
+        expired = [row[0] for row in cursor.fetchall()]
+        for name in expired:
+            cursor.execute(f"ALTER TABLE device_readings DROP PARTITION {name}")
+            logger.info(f"[Rollup] Dropped raw partition device_readings.{name} (older than {cutoff})")
+        conn.commit()
+        if expired:
+            with self._stats_lock:
+                self._stats["partitions_dropped"] += len(expired)
+
+    def get_stats(self):
+        """
+        Return a snapshot of rollup job metrics.
+
+        Returns:
+            dict: runs, errors, run durations, head id, per-table watermarks, lag in ids
+                  behind head, and the number of raw partitions dropped.
+        """
+        with self._stats_lock:
+            stats = dict(self._stats)
+            stats["watermarks"] = dict(stats["watermarks"])
+        marks = stats["watermarks"].values()
+        stats["lag_ids"] = stats["head_id"] - min(marks) if marks else 0
+        return stats
@@ -0,0 +1,193 @@
+"""
+Project: IoT Smart Home
+File: timeseries.py
+Description:
+In-memory history of numeric device readings for the live charts.
+Each (device, metric) series is a numpy ring buffer of timestamps and values that grows
+on demand up to a fixed capacity and then overwrites its oldest samples.
+decimate_minmax() reduces a window of any length to at most two points per pixel column,
+keeping every spike, so drawing a million samples costs about as much as a few thousand.
+"""
+
+import threading
+import numpy as np
+
+
+class RingBuffer:
+    """
+    Fixed-capacity buffer of (timestamp, value) samples in arrival order.
+    Not thread-safe; TimeSeriesStore serializes access.
+    """
+    def __init__(self, capacity: int, initial: int = 1024):
+        """
+        Args:
+            capacity (int): Maximum samples kept; older samples are overwritten.
+            initial (int): Initial allocation, doubled as the buffer fills.
+        """
+        self.capacity = capacity
+        size = min(initial, capacity)
+        self._t = np.empty(size, dtype=np.float64)
+        self._v = np.empty(size, dtype=np.float64)
+        self._head = 0
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    def append(self, timestamp: float, value: float):
+        """
+        Add one sample, overwriting the oldest once the buffer is full.
+        """
+        size = len(self._t)
+        if self._count == size and size < self.capacity:
+            self._grow()
+            size = len(self._t)
+        self._t[self._head] = timestamp
+        self._v[self._head] = value
+        self._head = (self._head + 1) % size
+        if self._count < size:
+            self._count += 1
+
+    def _grow(self):
+        """
+        Double the allocation (up to capacity). Only called while not yet wrapped.
+        """
+        size = min(len(self._t) * 2, self.capacity)
+        t = np.empty(size, dtype=np.float64)
+        v = np.empty(size, dtype=np.float64)
+        t[:self._count] = self._t[:self._count]
+        v[:self._count] = self._v[:self._count]
+        self._t, self._v = t, v
+        self._head = self._count
+
+    def arrays(self, since: float = None):
+        """
+        Return copies of the samples in arrival order, optionally only those at or after `since`.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: Timestamps and values.
+        """
+        count, head = self._count, self._head
+        if count < len(self._t):
+            segments = [(0, count)]
+        else:
+            segments = [(head, count), (0, head)]
+
+        # Only the requested window is copied
+        parts_t, parts_v = [], []
+        for start, stop in segments:
+            if since is not None and not parts_t:
+                start += int(np.searchsorted(self._t[start:stop], since))
+            if start < stop:
+                parts_t.append(self._t[start:stop])
+                parts_v.append(self._v[start:stop])
+        if not parts_t:
+            return np.empty(0), np.empty(0)
+        return np.concatenate(parts_t), np.concatenate(parts_v)
+
+
+def decimate_minmax(t, v, bins: int):
+    """
+    Reduce samples to the minimum and maximum of each of `bins` equal-count buckets,
+    in time order. Peaks survive, which plain striding would drop.
+
+    Args:
+        t (np.ndarray): Timestamps, ascending.
+        v (np.ndarray): Values.
+        bins (int): Number of buckets (typically the plot width in pixels).
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: At most 2 * bins samples.
+    """
+    count = len(t)
+    if bins <= 0 or count <= 2 * bins:
+        return t, v
+
+    per_bin = count // bins
+    used = per_bin * bins
+    blocks = v[:used].reshape(bins, per_bin)
+    offsets = np.arange(bins) * per_bin
+    lo = blocks.argmin(axis=1) + offsets
+    hi = blocks.argmax(axis=1) + offsets
+
+    index = np.empty(bins * 2, dtype=np.intp)
+    index[0::2] = np.minimum(lo, hi)
+    index[1::2] = np.maximum(lo, hi)
+    if used < count:
+        # Leftover tail: its extremes plus the newest sample, which is always drawn
+        tail = v[used:]
+        extra = np.unique([used + tail.argmin(), used + tail.argmax(), count - 1])
+        index = np.concatenate((index, extra))
+    return t[index], v[index]
+
+
+class TimeSeriesStore:
+    """
+    Thread-safe collection of ring buffers keyed by (device key, metric).
+    Fed by DeviceStateStore with the values of every MQTT update; timestamps must not decrease
+    within a series, since windows are located by binary search.
+    """
+    def __init__(self, capacity: int = 100_000):
+        """
+        Args:
+            capacity (int): Maximum samples kept per series.
+        """
+        self.capacity = capacity
+        self._lock = threading.Lock()
+        self._series = {}
+        self._revisions = {}
+
+    def append(self, device_key: str, timestamp: float, values: dict):
+        """
+        Record one reading per numeric metric.
+
+        Args:
+            device_key (str): Device key.
+            timestamp (float): Epoch seconds of the observation.
+            values (dict): Metric → value; non-numeric values are skipped.
+        """
+        with self._lock:
+            for metric, value in values.items():
+                if not isinstance(value, (int, float)):
+                    continue
+                key = (device_key, metric)
+                series = self._series.get(key)
+                if series is None:
+                    series = self._series[key] = RingBuffer(self.capacity)
+                series.append(timestamp, value)
+                self._revisions[device_key] = self._revisions.get(device_key, 0) + 1
+
+    def revision(self, device_key: str) -> int:
+        """
+        Return a counter that changes whenever a sample is added for the device.
+        """
+        with self._lock:
+            return self._revisions.get(device_key, 0)
+
+    def metrics(self, device_key: str):
+        """
+        Return the metrics recorded for a device, in first-seen order.
+        """
+        with self._lock:
+            return [metric for key, metric in self._series if key == device_key]
+
+    def window(self, device_key: str, metric: str, since: float = None):
+        """
+        Return one series' samples at or after `since`.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: Timestamps and values (empty if the series is unknown).
+        """
+        with self._lock:
+            series = self._series.get((device_key, metric))
+            if series is None:
+                return np.empty(0), np.empty(0)
+            return series.arrays(since)
+
+    def get_stats(self):
+        """
+        Return series and sample counts.
+        """
+        with self._lock:
+            return {"series": len(self._series),
+                    "samples": sum(len(series) for series in self._series.values())}
@@ -0,0 +1,135 @@
+"""
+Project: IoT Smart Home
+File: topic_trie.py
+Description:
+Trie of MQTT topic filters for table-driven message dispatch.
+Filters may use the standard `+` (single level) and `#` (multi level) wildcards;
+matching a topic walks one trie level per topic level, independent of how many
+filters are registered.
+"""
+
+
+class _Node:
+    """
+    One topic level in the trie.
+    """
+    __slots__ = ("children", "handlers")
+
+    def __init__(self):
+        self.children = {}
+        self.handlers = []
+
+
+class TopicTrie:
+    """
+    Maps MQTT topic filters to handlers and finds every handler matching a topic.
+    """
+    def __init__(self):
+        """
+        Initialize an empty trie.
+        """
+        self._root = _Node()
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def insert(self, topic_filter: str, handler):
+        """
+        Register a handler for a topic filter.
+
+        Args:
+            topic_filter (str): Filter such as 'Home/dht', 'Home/+/dht/+' or 'Home/#'.
+            handler (Callable): Object returned by match() for matching topics.
+
+        Raises:
+            ValueError: If '#' is not the last level or a wildcard is mixed with other characters.
+        """
+        levels = topic_filter.split("/")
+        for position, level in enumerate(levels):
+            if ("#" in level and (level != "#" or position != len(levels) - 1)) or ("+" in level and level != "+"):
+                raise ValueError(f"Invalid topic filter: {topic_filter!r}")
+
+        node = self._root
+        for level in levels:
+            node = node.children.setdefault(level, _Node())
+        node.handlers.append(handler)
+        self._size += 1
+
+    def remove(self, topic_filter: str, handler):
+        """
+        Unregister a handler from a topic filter. Unknown pairs are ignored.
+
+        Args:
+            topic_filter (str): Filter the handler was registered with.
+            handler (Callable): Handler to remove.
+
+        Returns:
+            bool: True if the handler was removed.
+        """
+        path = [self._root]
+        for level in topic_filter.split("/"):
+            node = path[-1].children.get(level)
+            if node is None:
+                return False
+            path.append(node)
+
+        node = path[-1]
+        if handler not in node.handlers:
+            return False
+        node.handlers.remove(handler)
+        self._size -= 1
+
+        # Prune empty branches so the trie does not accumulate dead levels
+        levels = topic_filter.split("/")
+        for depth in range(len(levels), 0, -1):
+            child = path[depth]
+            if child.handlers or child.children:
+                break
+            del path[depth - 1].children[levels[depth - 1]]
+        return True
+
+    def match(self, topic: str):
+        """
+        Return every handler whose filter matches a topic.
+
+        Args:
+            topic (str): Concrete topic (no wildcards).
+
+        Returns:
+            list: Matching handlers (exact filters first at each level).
+        """
+        levels = topic.split("/")
+        matched = []
+        nodes = [self._root]
+        # Wildcards at the first level must not match system topics such as $SYS/...
+        system = topic.startswith("$")
+
+        for depth, level in enumerate(levels):
+            next_nodes = []
+            for node in nodes:
+                children = node.children
+                if not children:
+                    continue
+                exact = children.get(level)
+                if exact is not None:
+                    next_nodes.append(exact)
+                if system and depth == 0:
+                    continue
+                plus = children.get("+")
+                if plus is not None:
+                    next_nodes.append(plus)
+                hash_node = children.get("#")
+                if hash_node is not None:
+                    matched.extend(hash_node.handlers)
+            nodes = next_nodes
+            if not nodes:
+                return matched
+
+        for node in nodes:
+            matched.extend(node.handlers)
+            # 'a/#' also matches the parent topic 'a'
+            hash_node = node.children.get("#")
+            if hash_node is not None:
+                matched.extend(hash_node.handlers)
+        return matched
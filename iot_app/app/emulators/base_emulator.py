@@ -3,13 +3,17 @@ Project: IoT Smart Home
 File: base_emulator.py
 Description:
 Base logic class for all emulators. Handles value generation, MQTT publishing,
-DB logging, and periodic polling with QTimer support.
+DB logging, and periodic polling through the shared EmulatorScheduler.
+Every publish also records the typed state in the shared DeviceStateStore, if one is attached.
 """
 
 from abc import ABC, abstractmethod
 from datetime import datetime
-from PyQt5.QtCore import QTimer
-from iot_app.app.utils.logger import logger
+from iot_app.app.core.device_state import is_active
+from iot_app.app.core.payload_codec import encode_readings
+from iot_app.app.utils.logger import logger, get_logger
+
+_log = get_logger("emulator", "Emulator")
 
 TOPIC_BASE = "Home"
 
@@ -20,50 +24,68 @@ class BaseEmulator(ABC):
     Supports MQTT publishing, DB logging, and timed polling.
     """
 
-    def __init__(self, device_type: str, mqtt_client, db_client, interval_ms=5000):
+    def __init__(self, device_type: str, mqtt_client, db_client, interval_ms=5000, scheduler=None,
+                 device_id=None, room=None):
         """
         Initialize emulator with device type, MQTT and DB clients, and interval.
+        Fleet instances (with room and device_id) publish on Home/<room>/<type>/<id>,
+        the single home devices keep Home/<type>.
 
         Args:
             device_type (str): Unique key of the device (e.g., 'dht').
             mqtt_client: Connected instance of MQTTClient.
             db_client: Connected instance of DBClient.
             interval_ms (int): Polling frequency in milliseconds.
+            scheduler: Shared EmulatorScheduler driving periodic ticks.
+            device_id (int): Instance number within a fleet group, or None for the home device.
+            room (str): Room name of a fleet instance, or None for the home device.
         """
         self.device_type = device_type
-        self.topic = f"{TOPIC_BASE}/{device_type}"
+        self.device_id = device_id
+        self.room = room
+        if room is not None and device_id is not None:
+            self.device_key = f"{room}/{device_type}/{device_id}"
+        else:
+            self.device_key = device_type
+        self.topic = f"{TOPIC_BASE}/{self.device_key}"
         self.mqtt = mqtt_client
         self.db = db_client
         self.active = False
         self.current_value = None
         self.interval_ms = interval_ms
-
-        self.timer = QTimer()
-        self.timer.setInterval(self.interval_ms)
-        self.timer.timeout.connect(self._tick)
+        self.scheduler = scheduler
+        # Shared DeviceStateStore, attached by EmulatorsManager
+        self.state_store = None
 
         logger.debug(f"[Emulator] Initialized: {device_type} → {self.topic}")
 
     # ========================== State Control ==========================
 
-    def turn_on(self):
+    def turn_on(self, delay_ms=0):
         """
         Activate emulator and start periodic polling.
+        The first tick runs on the scheduler's worker pool after delay_ms.
+
+        Args:
+            delay_ms (int): Delay before the first tick, used to stagger fleet start-up.
         """
         self.active = True
-        self.timer.start()
-        self._tick()
-        logger.info(f"[Emulator] {self.device_type} turned ON")
+        if self.scheduler:
+            self.scheduler.schedule(self, delay_ms=delay_ms)
+        else:
+            self._tick()
+        logger.info(f"[Emulator] {self.device_key} turned ON")
 
     def turn_off(self):
         """
         Deactivate emulator and stop polling.
         """
         self.active = False
-        self.timer.stop()
+        if self.scheduler:
+            self.scheduler.unschedule(self)
         self.current_value = None
         self.publish()
-        logger.info(f"[Emulator] {self.device_type} turned OFF")
+        logger.info(f"[Emulator] {self.device_key} turned OFF")
 
     # ========================== Core Logic ==========================
 
@@ -74,25 +96,75 @@ class BaseEmulator(ABC):
         if not self.active:
             return
         self.generate_value()
+        self._emit()
+
+    def _emit(self):
+        """
+        Publish and persist the current value. Used after batch generation.
+        """
         self.publish()
         self.save_to_db()
 
+    @classmethod
+    def generate_batch(cls, emulators, now=None):
+        """
+        Generate one tick's values for a group of emulators of this class.
+        Sensor emulators override this with a vectorized implementation.
+
+        Args:
+            emulators (list): Active instances of this class.
+            now (datetime): Tick timestamp shared by the whole batch.
+        """
+        for emulator in emulators:
+            emulator.generate_value()
+
     def publish(self):
         """
-        Publish the current value to the MQTT broker on the associated topic.
+        Publish the current value to the MQTT broker on the associated topic,
+        using the payload encoding the client negotiated for that topic, and
+        record it in the state store.
         """
-        payload = self.build_payload()
+        if self.mqtt and self.mqtt.encoding_for(self.topic) == "binary":
+            payload = self.build_binary_payload()
+        else:
+            payload = self.build_payload()
         if self.mqtt:
             self.mqtt.publish(self.topic, payload)
-        logger.debug(f"[MQTT] Published to '{self.topic}': {payload}")
+        if self.state_store is not None:
+            values = dict(self.readings()) if self.current_value is not None else None
+            # Same rule as the listener, so the MQTT echo of this reading does not flip the state
+            self.state_store.update(self.device_key, self.device_type, is_active(self.device_type, values),
+                                    values or None, source="emulator")
+        _log.sampled(100, "DEBUG", "{} published to '{}': {}", self.device_key, self.topic, payload)
 
     def save_to_db(self):
         """
-        Save the current value to the database with a timestamp.
+        Save the current value to the database as typed numeric readings with a timestamp.
         """
         if self.db and self.current_value is not None:
             now = datetime.now()
-            self.db.insert_sensor_data(self.device_type, str(self.current_value), now)
+            self.db.insert_readings(self.device_key, self.device_type, self.readings(), now)
+
+    def build_binary_payload(self) -> bytes:
+        """
+        Build the compact binary payload (magic byte, schema id, packed readings).
+
+        Returns:
+            bytes: Encoded readings; header only when the device has no value.
+        """
+        return encode_readings(self.device_type, self.readings() if self.current_value is not None else None)
+
+    def readings(self):
+        """
+        Return the current value as numeric (metric, value) pairs for storage.
+        Subclasses override this to name their metrics.
+
+        Returns:
+            list[tuple]: (metric, float value) pairs; empty if there is nothing to store.
+        """
+        if isinstance(self.current_value, (int, float)):
+            return [(self.device_type, float(self.current_value))]
+        return []
 
     # ========================== Abstracts ==========================
 
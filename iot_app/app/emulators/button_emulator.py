@@ -6,7 +6,7 @@ Emulator for a doorbell button. Publishes 'pressed' on each trigger and logs the
 Includes internal timer to reset active state.
 """
 
-from PyQt5.QtCore import QTimer
+import threading
 from iot_app.app.emulators.base_emulator import BaseEmulator
 
 
@@ -15,24 +15,28 @@ class ButtonEmulator(BaseEmulator):
     Emulator for a momentary button (doorbell).
     Sends a 'pressed' signal and automatically resets after a short interval.
     """
-    def __init__(self, mqtt_client, db_client):
+    def __init__(self, mqtt_client, db_client, scheduler=None, device_id=None, room=None):
         """
         Initialize the button emulator with no polling and reset timer.
 
         Args:
             mqtt_client: MQTTClient instance for publishing.
             db_client: DBClient instance for logging.
+            scheduler: Shared EmulatorScheduler instance.
+            device_id (int): Fleet instance number, or None for the home device.
+            room (str): Fleet room name, or None for the home device.
         """
         super().__init__(
             device_type="button",
             mqtt_client=mqtt_client,
             db_client=db_client,
-            interval_ms=0
+            interval_ms=0,
+            scheduler=scheduler,
+            device_id=device_id,
+            room=room
         )
         self._active_for_ms = 7000
-        self._reset_timer = QTimer()
-        self._reset_timer.setSingleShot(True)
-        self._reset_timer.timeout.connect(self._reset_state)
+        self._reset_timer = None
 
     def press(self):
         """
@@ -42,7 +46,20 @@ class ButtonEmulator(BaseEmulator):
         self.active = True
         self.publish()
         self.save_to_db()
-        self._reset_timer.start(self._active_for_ms)
+        if self._reset_timer:
+            self._reset_timer.cancel()
+        self._reset_timer = threading.Timer(self._active_for_ms / 1000, self._reset_state)
+        self._reset_timer.daemon = True
+        self._reset_timer.start()
+
+    def readings(self):
+        """
+        Return the button press as a numeric event reading.
+
+        Returns:
+            list[tuple]: [('pressed', 1.0)] while pressed.
+        """
+        return [("pressed", 1.0)] if self.current_value == "pressed" else []
 
     def _reset_state(self):
         """
@@ -2,12 +2,13 @@
 Project: IoT Smart Home
 File: dht_emulator.py
 Description:
-Emulator for DHT sensor. Simulates temperature and humidity readings.
+Emulator for DHT sensor. Simulates temperature and humidity readings
+with a diurnal temperature curve and humidity correlated to temperature.
 """
 
-import random
 import json
 from iot_app.app.emulators.base_emulator import BaseEmulator
+from iot_app.app.emulators.sensor_models import hour_of_day, diurnal_temperature, correlated_humidity
 
 
 class DHTEmulator(BaseEmulator):
@@ -15,40 +16,74 @@ class DHTEmulator(BaseEmulator):
     Emulator class for DHT sensor that generates synthetic temperature and humidity values.
     Publishes readings to MQTT and logs them to the database.
     """
-    def __init__(self, mqtt_client, db_client):
+    def __init__(self, mqtt_client, db_client, scheduler=None, device_id=None, room=None, interval_ms=5000):
         """
-        Initialize the DHT emulator with a fixed polling interval.
+        Initialize the DHT emulator with a 5-second default polling interval.
 
         Args:
             mqtt_client: MQTTClient instance for publishing.
             db_client: DBClient instance for logging.
+            scheduler: Shared EmulatorScheduler instance.
+            device_id (int): Fleet instance number, or None for the home device.
+            room (str): Fleet room name, or None for the home device.
+            interval_ms (int): Polling frequency in milliseconds.
         """
         super().__init__(
             device_type="dht",
             mqtt_client=mqtt_client,
             db_client=db_client,
-            interval_ms=5000
+            interval_ms=interval_ms,
+            scheduler=scheduler,
+            device_id=device_id,
+            room=room
         )
 
     def generate_value(self):
         """
-        Generate random temperature and humidity values.
+        Generate temperature and humidity values for this device.
 
         Sets:
-            self.current_value (dict): A dictionary with temperature and humidity keys.
+            self.current_value (dict): Numeric temperature (°C) and humidity (%) values.
         """
-        temperature = round(random.uniform(18.0, 32.0), 1)
-        humidity = round(random.uniform(30.0, 90.0), 1)
-        self.current_value = {
-            "temperature": f"{temperature} °C",
-            "humidity": f"{humidity} %"
-        }
+        self.generate_batch([self])
+
+    @classmethod
+    def generate_batch(cls, emulators, now=None):
+        """
+        Generate one tick of temperature and humidity for a group of DHT emulators at once.
+
+        Args:
+            emulators (list[DHTEmulator]): Active DHT instances.
+            now (datetime): Tick timestamp shared by the whole batch.
+        """
+        ids = [emulator.device_id or 0 for emulator in emulators]
+        temperatures = diurnal_temperature(ids, hour_of_day(now))
+        humidities = correlated_humidity(temperatures)
+        for emulator, temperature, humidity in zip(emulators, temperatures.tolist(), humidities.tolist()):
+            emulator.current_value = {"temperature": temperature, "humidity": humidity}
+
+    def readings(self):
+        """
+        Return temperature and humidity as numeric readings.
+
+        Returns:
+            list[tuple]: [('temperature', °C), ('humidity', %)].
+        """
+        value = self.current_value
+        return [("temperature", value["temperature"]), ("humidity", value["humidity"])]
 
     def build_payload(self) -> str:
         """
         Build a JSON-formatted string payload from current temperature and humidity.
+        Units are applied here, at publish time.
 
         Returns:
             str: JSON string with temperature and humidity.
         """
-        return json.dumps(self.current_value)
+        value = self.current_value
+        if value is None:
+            return json.dumps(None)
+        return json.dumps({
+            "temperature": f"{value['temperature']} °C",
+            "humidity": f"{value['humidity']} %"
+        })
@@ -2,11 +2,12 @@
 Project: IoT Smart Home
 File: light_emulator.py
 Description:
-Emulator for Light Sensor. Simulates ambient light intensity (0–1000 lx).
+Emulator for Light Sensor. Simulates ambient light intensity (0–1000 lx)
+following the time of day.
 """
 
-import random
 from iot_app.app.emulators.base_emulator import BaseEmulator
+from iot_app.app.emulators.sensor_models import hour_of_day, daylight_lux
 
 
 class LightEmulator(BaseEmulator):
@@ -14,34 +15,64 @@ class LightEmulator(BaseEmulator):
     Emulator class for a light sensor that generates synthetic lux readings.
     Publishes data to MQTT and logs to the database.
     """
-    def __init__(self, mqtt_client, db_client):
+    def __init__(self, mqtt_client, db_client, scheduler=None, device_id=None, room=None, interval_ms=2000):
         """
-        Initialize the light sensor emulator with a 2-second polling interval.
+        Initialize the light sensor emulator with a 2-second default polling interval.
 
         Args:
             mqtt_client: MQTTClient instance for publishing.
             db_client: DBClient instance for logging.
+            scheduler: Shared EmulatorScheduler instance.
+            device_id (int): Fleet instance number, or None for the home device.
+            room (str): Fleet room name, or None for the home device.
+            interval_ms (int): Polling frequency in milliseconds.
         """
         super().__init__(
             device_type="light",
             mqtt_client=mqtt_client,
             db_client=db_client,
-            interval_ms=2000
+            interval_ms=interval_ms,
+            scheduler=scheduler,
+            device_id=device_id,
+            room=room
         )
 
     def generate_value(self):
         """
-        Generate a random ambient light intensity value (0–1000 lx).
-        Sets self.current_value to a formatted string.
+        Generate an ambient light intensity value (0–1000 lx).
+        Sets self.current_value to an integer lux value.
         """
-        lux = random.randint(0, 1000)
-        self.current_value = f"{lux} lx"
+        self.generate_batch([self])
+
+    @classmethod
+    def generate_batch(cls, emulators, now=None):
+        """
+        Generate one tick of light intensity for a group of light emulators at once.
+
+        Args:
+            emulators (list[LightEmulator]): Active light sensor instances.
+            now (datetime): Tick timestamp shared by the whole batch.
+        """
+        ids = [emulator.device_id or 0 for emulator in emulators]
+        for emulator, lux in zip(emulators, daylight_lux(ids, hour_of_day(now)).tolist()):
+            emulator.current_value = lux
+
+    def readings(self):
+        """
+        Return the light intensity as a numeric reading.
+
+        Returns:
+            list[tuple]: [('lux', value)].
+        """
+        return [("lux", float(self.current_value))]
 
     def build_payload(self) -> str:
         """
         Build the MQTT payload for the current lux value.
 
         Returns:
-            str: Light intensity in lux as string.
+            str: Light intensity in lux as string (e.g., '512 lx').
         """
-        return str(self.current_value)
+        if self.current_value is None:
+            return "None"
+        return f"{self.current_value} lx"
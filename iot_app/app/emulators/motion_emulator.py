@@ -2,11 +2,12 @@
 Project: IoT Smart Home
 File: motion_emulator.py
 Description:
-Emulator for Motion Sensor. Randomly simulates motion detection.
+Emulator for Motion Sensor. Simulates motion detection as Poisson-distributed
+events whose rate follows the time of day.
 """
 
-import random
 from iot_app.app.emulators.base_emulator import BaseEmulator
+from iot_app.app.emulators.sensor_models import hour_of_day, poisson_motion
 
 
 class MotionEmulator(BaseEmulator):
@@ -14,33 +15,65 @@ class MotionEmulator(BaseEmulator):
     Emulator class for a motion sensor that randomly simulates movement detection.
     Publishes results to MQTT and logs them to the database.
     """
-    def __init__(self, mqtt_client, db_client):
+    def __init__(self, mqtt_client, db_client, scheduler=None, device_id=None, room=None, interval_ms=3000):
         """
-        Initialize the motion emulator with a 3-second polling interval.
+        Initialize the motion emulator with a 3-second default polling interval.
 
         Args:
             mqtt_client: MQTTClient instance for publishing.
             db_client: DBClient instance for logging.
+            scheduler: Shared EmulatorScheduler instance.
+            device_id (int): Fleet instance number, or None for the home device.
+            room (str): Fleet room name, or None for the home device.
+            interval_ms (int): Polling frequency in milliseconds.
         """
         super().__init__(
             device_type="motion",
             mqtt_client=mqtt_client,
             db_client=db_client,
-            interval_ms=3000
+            interval_ms=interval_ms,
+            scheduler=scheduler,
+            device_id=device_id,
+            room=room
         )
 
     def generate_value(self):
         """
         Generate a motion reading.
-        80% chance to detect motion, 20% chance of no motion.
+        Sets self.current_value to True if at least one motion event occurred during the interval.
         """
-        self.current_value = "motion detected" if random.random() < 0.8 else "no motion"
+        self.generate_batch([self])
+
+    @classmethod
+    def generate_batch(cls, emulators, now=None):
+        """
+        Generate one tick of motion events for a group of motion emulators at once.
+
+        Args:
+            emulators (list[MotionEmulator]): Active motion sensor instances.
+            now (datetime): Tick timestamp shared by the whole batch.
+        """
+        ids = [emulator.device_id or 0 for emulator in emulators]
+        intervals = [emulator.interval_ms for emulator in emulators]
+        for emulator, detected in zip(emulators, poisson_motion(ids, hour_of_day(now), intervals).tolist()):
+            emulator.current_value = detected
+
+    def readings(self):
+        """
+        Return the motion state as a numeric reading.
+
+        Returns:
+            list[tuple]: [('motion', 1.0 or 0.0)].
+        """
+        return [("motion", 1.0 if self.current_value else 0.0)]
 
     def build_payload(self) -> str:
         """
         Return the current motion state as a payload string.
 
         Returns:
-            str: Either 'motion detected' or 'no motion'.
+            str: 'motion detected', 'no motion', or 'None' when the sensor is off.
         """
-        return self.current_value
+        if self.current_value is None:
+            return "None"
+        return "motion detected" if self.current_value else "no motion"
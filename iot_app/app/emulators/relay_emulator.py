@@ -13,19 +13,25 @@ class RelayEmulator(BaseEmulator):
     Emulator for a binary relay switch (ON/OFF).
     Publishes state immediately when toggled.
     """
-    def __init__(self, mqtt_client, db_client):
+    def __init__(self, mqtt_client, db_client, scheduler=None, device_id=None, room=None):
         """
         Initialize the relay emulator with polling disabled.
 
         Args:
             mqtt_client: MQTTClient instance for publishing.
             db_client: DBClient instance for logging.
+            scheduler: Shared EmulatorScheduler instance.
+            device_id (int): Fleet instance number, or None for the home device.
+            room (str): Fleet room name, or None for the home device.
         """
         super().__init__(
             device_type="relay",
             mqtt_client=mqtt_client,
             db_client=db_client,
-            interval_ms=0
+            interval_ms=0,
+            scheduler=scheduler,
+            device_id=device_id,
+            room=room
         )
 
     def generate_value(self):
@@ -34,9 +40,12 @@ class RelayEmulator(BaseEmulator):
         """
         pass
 
-    def turn_on(self):
+    def turn_on(self, delay_ms=0):
         """
         Set relay state to ON, publish and log the event.
+
+        Args:
+            delay_ms (int): Unused; a relay switches immediately.
         """
         self.active = True
         self.current_value = "1"
@@ -52,6 +61,15 @@ class RelayEmulator(BaseEmulator):
         self.publish()
         self.save_to_db()
 
+    def readings(self):
+        """
+        Return the relay state as a numeric reading.
+
+        Returns:
+            list[tuple]: [('state', 1.0 or 0.0)].
+        """
+        return [("state", 1.0 if self.current_value == "1" else 0.0)]
+
     def build_payload(self) -> str:
         """
         Return the current relay state as string payload.
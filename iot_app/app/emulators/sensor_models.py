@@ -0,0 +1,135 @@
+"""
+Project: IoT Smart Home
+File: sensor_models.py
+Description:
+Vectorized environment models used by the sensor emulators.
+Every function evaluates one tick for a whole group of devices at once with NumPy:
+diurnal temperature, humidity correlated with temperature, daylight-driven light
+intensity, and Poisson-distributed motion events.
+"""
+
+from datetime import datetime
+import numpy as np
+
+_rng = np.random.default_rng()
+
+
+def hour_of_day(now=None) -> float:
+    """
+    Return the fractional hour of day (0–24) for a timestamp.
+
+    Args:
+        now (datetime): Timestamp to convert; defaults to the current time.
+
+    Returns:
+        float: Hour of day including minutes and seconds.
+    """
+    now = now or datetime.now()
+    return now.hour + now.minute / 60 + now.second / 3600
+
+
+def device_offsets(device_ids, spread: float) -> np.ndarray:
+    """
+    Derive a stable per-device offset in [-spread, spread] from device ids.
+    Keeps each simulated device distinct without storing per-device state.
+    The home device (id 0) always gets a zero offset.
+
+    Args:
+        device_ids (array-like): Integer device ids (0 for the home device).
+        spread (float): Maximum absolute offset.
+
+    Returns:
+        np.ndarray: One offset per device.
+    """
+    ids = np.asarray(device_ids, dtype=np.uint64)
+    hashed = (ids * np.uint64(2654435761)) % np.uint64(1000)
+    offsets = (hashed.astype(np.float64) / 999.0 * 2.0 - 1.0) * spread
+    return np.where(ids == 0, 0.0, offsets)
+
+
+def diurnal_temperature(device_ids, hour: float) -> np.ndarray:
+    """
+    Indoor temperature following a daily sine curve (coolest ~04:00, warmest ~16:00).
+
+    Args:
+        device_ids (array-like): Device ids of the group.
+        hour (float): Fractional hour of day.
+
+    Returns:
+        np.ndarray: Temperatures in °C, rounded to 0.1.
+    """
+    n = len(device_ids)
+    base = 23.0 + 4.5 * np.sin(2 * np.pi * (hour - 10.0) / 24.0)
+    temps = base + device_offsets(device_ids, 2.5) + _rng.normal(0.0, 0.3, n)
+    return np.round(np.clip(temps, 18.0, 32.0), 1)
+
+
+def correlated_humidity(temperatures: np.ndarray) -> np.ndarray:
+    """
+    Relative humidity that falls as temperature rises, plus sensor noise.
+
+    Args:
+        temperatures (np.ndarray): Temperatures produced by diurnal_temperature.
+
+    Returns:
+        np.ndarray: Relative humidity in %, rounded to 0.1.
+    """
+    humidity = 60.0 - 2.2 * (temperatures - 23.0) + _rng.normal(0.0, 3.0, len(temperatures))
+    return np.round(np.clip(humidity, 30.0, 90.0), 1)
+
+
+def daylight_lux(device_ids, hour: float) -> np.ndarray:
+    """
+    Ambient light that follows the sun between 06:00 and 18:00, with per-device
+    window exposure, passing clouds, and artificial light in the evening.
+
+    Args:
+        device_ids (array-like): Device ids of the group.
+        hour (float): Fractional hour of day.
+
+    Returns:
+        np.ndarray: Light intensity in lux (integers, 0–1000).
+    """
+    n = len(device_ids)
+    sun = max(0.0, np.sin(np.pi * (hour - 6.0) / 12.0))
+    exposure = 0.75 + device_offsets(device_ids, 0.25)
+    clouds = _rng.uniform(0.7, 1.0, n)
+    lux = 1000.0 * sun * exposure * clouds
+    if 18.0 <= hour < 23.5:
+        lux = np.maximum(lux, _rng.uniform(250.0, 400.0, n))
+    return np.clip(lux, 0, 1000).astype(np.int64)
+
+
+def motion_rate_per_min(hour: float) -> float:
+    """
+    Expected motion events per minute for a room at a given hour of day.
+
+    Args:
+        hour (float): Fractional hour of day.
+
+    Returns:
+        float: Poisson rate (events per minute).
+    """
+    if 0.0 <= hour < 6.0:
+        return 0.5
+    if 7.0 <= hour < 9.0 or 17.0 <= hour < 23.0:
+        return 15.0
+    return 6.0
+
+
+def poisson_motion(device_ids, hour: float, interval_ms) -> np.ndarray:
+    """
+    Whether at least one motion event occurred during each device's polling interval.
+
+    Args:
+        device_ids (array-like): Device ids of the group.
+        hour (float): Fractional hour of day.
+        interval_ms (array-like or int): Polling interval per device (or shared).
+
+    Returns:
+        np.ndarray: Boolean array, True where motion was detected.
+    """
+    n = len(device_ids)
+    minutes = np.asarray(interval_ms, dtype=np.float64) / 60000.0
+    lam = motion_rate_per_min(hour) * (1.0 + device_offsets(device_ids, 0.5)) * minutes
+    return _rng.poisson(lam, n) > 0
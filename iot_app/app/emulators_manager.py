@@ -2,45 +2,502 @@
 Project: IoT Smart Home
 File: emulators_manager.py
 Description:
-Central manager for all emulators. Initializes and stores instances for shared use.
+Central manager for all emulators. Initializes and stores instances for shared use,
+including declarative fleets of N instances per device type. Also provides the shared
+EmulatorScheduler that drives every periodic emulator from a single timer thread and
+a worker pool.
 """
 
+import heapq
+import itertools
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+
 from iot_app.app.emulators.button_emulator import ButtonEmulator
 from iot_app.app.emulators.dht_emulator import DHTEmulator
 from iot_app.app.emulators.light_emulator import LightEmulator
 from iot_app.app.emulators.motion_emulator import MotionEmulator
 from iot_app.app.emulators.relay_emulator import RelayEmulator
+from iot_app.app.utils.logger import logger
+
+DEVICE_CLASSES = {
+    "button": ButtonEmulator,
+    "dht": DHTEmulator,
+    "light": LightEmulator,
+    "motion": MotionEmulator,
+    "relay": RelayEmulator,
+}
+
+# Types that poll on an interval and accept an interval_ms override; relay and button
+# only publish when toggled or pressed
+PERIODIC_TYPES = ("dht", "light", "motion")
+
+DEFAULT_ROOMS = ["living_room"]
+
+
+class EmulatorScheduler:
+    """
+    Heap-based scheduler shared by all emulators.
+    One timer thread pops every emulator that is due, and the generate/publish/persist
+    work for that batch runs on a worker pool.
+    """
+    def __init__(self, max_workers=4, chunk_size=256, resolution_ms=10, stats_window=1000):
+        """
+        Initialize the scheduler. The timer thread starts on the first schedule() call.
+
+        Args:
+            max_workers (int): Size of the worker pool executing emulator ticks.
+            chunk_size (int): Maximum emulators handed to a single worker task.
+            resolution_ms (int): Emulators due within this window of a tick are batched into it.
+            stats_window (int): Number of recent ticks kept for jitter/lag statistics.
+        """
+        self.chunk_size = chunk_size
+        self.resolution = resolution_ms / 1000
+
+        self._heap = []
+        self._entries = {}
+        self._in_flight = set()
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._running = False
+        self._thread = None
+        self.max_workers = max_workers
+        self._pool = None
+
+        self._stats_lock = threading.Lock()
+        self._jitter_ms = deque(maxlen=stats_window)
+        self._lag_ms = deque(maxlen=stats_window)
+        self._stats = {
+            "ticks": 0,
+            "dispatched": 0,
+            "overruns": 0,
+            "skipped_busy": 0,
+        }
+
+    # ==================== Registration ====================
+
+    def schedule(self, emulator, delay_ms=0):
+        """
+        Register an emulator for periodic ticks at its own interval_ms.
+        Re-scheduling an emulator replaces its previous entry.
+
+        Args:
+            emulator: A BaseEmulator instance.
+            delay_ms (int): Delay before the first tick.
+        """
+        if emulator.interval_ms <= 0:
+            return
+        with self._cond:
+            seq = next(self._seq)
+            due = time.monotonic() + delay_ms / 1000
+            self._entries[id(emulator)] = seq
+            heapq.heappush(self._heap, (due, seq, emulator))
+            self._cond.notify()
+        self.start()
+
+    def unschedule(self, emulator):
+        """
+        Remove an emulator from the schedule. Its heap entry is discarded lazily.
+
+        Args:
+            emulator: A BaseEmulator instance.
+        """
+        with self._cond:
+            self._entries.pop(id(emulator), None)
+
+    # ==================== Lifecycle ====================
+
+    def start(self):
+        """
+        Start the timer thread if it is not already running, with a fresh worker pool
+        if a previous stop() shut the old one down.
+        """
+        with self._cond:
+            if self._running:
+                return
+            self._running = True
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="EmulatorWorker")
+            pool = self._pool
+        self._thread = threading.Thread(target=self._run, args=(pool,), name="EmulatorScheduler", daemon=True)
+        self._thread.start()
+        logger.debug("[Scheduler] Started")
+
+    def stop(self):
+        """
+        Stop the timer thread and wait for queued emulator work to finish.
+        Scheduled emulators are kept; a later schedule() or start() resumes them.
+        """
+        with self._cond:
+            self._running = False
+            self._cond.notify()
+        if self._thread:
+            self._thread.join(timeout=2.0)
+            self._thread = None
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+        logger.debug("[Scheduler] Stopped")
+
+    # ==================== Timer Loop ====================
+
+    def _run(self, pool):
+        """
+        Wait for the earliest due emulator, then dispatch every emulator due at that moment.
+
+        Args:
+            pool (ThreadPoolExecutor): Worker pool of this run (replaced on every restart).
+        """
+        while True:
+            with self._cond:
+                while self._running:
+                    self._discard_stale()
+                    if not self._heap:
+                        self._cond.wait()
+                        continue
+                    wait = self._heap[0][0] - time.monotonic()
+                    if wait <= 0:
+                        break
+                    self._cond.wait(wait)
+                if not self._running:
+                    return
+                batch, jitter_ms, lag_ms = self._pop_due(time.monotonic())
+
+            # Keep same-type emulators adjacent so chunks vectorize well
+            batch.sort(key=lambda emulator: emulator.device_type)
+            self._record_tick(len(batch), jitter_ms, lag_ms)
+            try:
+                for start in range(0, len(batch), self.chunk_size):
+                    pool.submit(self._run_chunk, batch[start:start + self.chunk_size])
+            except RuntimeError:
+                # stop() shut the pool down while this tick was being dispatched
+                return
+
+    def _discard_stale(self):
+        """
+        Drop heap entries belonging to unscheduled or re-scheduled emulators.
+        """
+        while self._heap and self._entries.get(id(self._heap[0][2])) != self._heap[0][1]:
+            heapq.heappop(self._heap)
+
+    def _pop_due(self, now):
+        """
+        Pop all emulators due within the tick resolution and push their next occurrence.
+        Periods that were missed entirely are skipped and counted as overruns.
+
+        Args:
+            now (float): Current monotonic time.
+
+        Returns:
+            tuple: (batch of emulators, tick jitter in ms, worst lag in ms).
+        """
+        batch = []
+        jitter_ms = (now - self._heap[0][0]) * 1000
+        lag_ms = 0.0
+        overruns = 0
+        skipped = 0
+
+        horizon = now + self.resolution
+        while self._heap and self._heap[0][0] <= horizon:
+            due, seq, emulator = heapq.heappop(self._heap)
+            key = id(emulator)
+            if self._entries.get(key) != seq:
+                continue
+
+            lag_ms = max(lag_ms, (now - due) * 1000)
+            interval = emulator.interval_ms / 1000
+            missed = max(0, int((now - due) // interval))
+            overruns += missed
+            next_seq = next(self._seq)
+            self._entries[key] = next_seq
+            heapq.heappush(self._heap, (due + (missed + 1) * interval, next_seq, emulator))
+
+            if key in self._in_flight:
+                skipped += 1
+                continue
+            self._in_flight.add(key)
+            batch.append(emulator)
+
+        with self._stats_lock:
+            self._stats["overruns"] += overruns
+            self._stats["skipped_busy"] += skipped
+        return batch, jitter_ms, lag_ms
+
+    def _run_chunk(self, emulators):
+        """
+        Execute one worker task: generate values for each emulator class in the chunk
+        with a single vectorized call, then publish and persist every reading.
+
+        Args:
+            emulators (list): Emulators to tick.
+        """
+        now = datetime.now()
+        by_class = {}
+        for emulator in emulators:
+            if emulator.active:
+                by_class.setdefault(type(emulator), []).append(emulator)
+
+        try:
+            for cls, group in by_class.items():
+                try:
+                    cls.generate_batch(group, now)
+                except Exception as e:
+                    logger.warning(f"[Scheduler] Batch generation failed for {cls.__name__}: {e}")
+                    continue
+                for emulator in group:
+                    try:
+                        emulator._emit()
+                    except Exception as e:
+                        logger.warning(f"[Scheduler] Tick failed for {emulator.device_key}: {e}")
+        finally:
+            with self._cond:
+                for emulator in emulators:
+                    self._in_flight.discard(id(emulator))
+
+    # ==================== Statistics ====================
+
+    def _record_tick(self, size, jitter_ms, lag_ms):
+        """
+        Record statistics for one dispatched tick.
+        """
+        with self._stats_lock:
+            self._stats["ticks"] += 1
+            self._stats["dispatched"] += size
+            self._jitter_ms.append(jitter_ms)
+            self._lag_ms.append(lag_ms)
+
+    def get_stats(self):
+        """
+        Return scheduler statistics over the recent tick window.
+
+        Returns:
+            dict: Tick counts, jitter/lag averages and maxima, overrun and busy-skip counters.
+        """
+        with self._stats_lock:
+            stats = dict(self._stats)
+            jitter = list(self._jitter_ms)
+            lag = list(self._lag_ms)
+        with self._cond:
+            stats["scheduled"] = len(self._entries)
+            stats["in_flight"] = len(self._in_flight)
+        stats["jitter_avg_ms"] = sum(jitter) / len(jitter) if jitter else 0.0
+        stats["jitter_max_ms"] = max(jitter, default=0.0)
+        stats["lag_avg_ms"] = sum(lag) / len(lag) if lag else 0.0
+        stats["lag_max_ms"] = max(lag, default=0.0)
+        return stats
+
+
+class DeviceGroup:
+    """
+    One device type of a fleet spec. Instances are created lazily on first access,
+    and devices are assigned to rooms round-robin so each room is an arithmetic id range.
+    """
+    def __init__(self, device_type: str, count: int, rooms=None, interval_ms=None):
+        """
+        Initialize a device group from its spec entry.
+
+        Args:
+            device_type (str): Key into DEVICE_CLASSES.
+            count (int): Number of instances in the group (ids 1..count).
+            rooms (list[str]): Rooms to spread the instances across.
+            interval_ms (int): Polling interval override; None keeps the class default.
+                               Ignored for non-periodic types (relay, button).
+        """
+        if device_type not in DEVICE_CLASSES:
+            raise ValueError(f"Unknown device type in fleet spec: '{device_type}'")
+        self.device_type = device_type
+        self.count = int(count)
+        self.rooms = list(rooms or DEFAULT_ROOMS)
+        self.interval_ms = interval_ms
+        self._room_index = {room: idx for idx, room in enumerate(self.rooms)}
+        self.instances = {}
+
+    def room_of(self, device_id: int) -> str:
+        """
+        Return the room a device id is assigned to.
+        """
+        return self.rooms[(device_id - 1) % len(self.rooms)]
+
+    def ids(self, room=None):
+        """
+        Return the device ids of the group, optionally restricted to one room.
+
+        Args:
+            room (str): Optional room filter.
+
+        Returns:
+            range: Matching device ids (empty if the room is not part of the group).
+        """
+        if room is None:
+            return range(1, self.count + 1)
+        idx = self._room_index.get(room)
+        if idx is None:
+            return range(0)
+        return range(idx + 1, self.count + 1, len(self.rooms))
+
+    def contains(self, room: str, device_id: int) -> bool:
+        """
+        Check whether (room, device_id) addresses a device of this group.
+        """
+        return 1 <= device_id <= self.count and self.room_of(device_id) == room
 
 
 class EmulatorsManager:
     """
-    Manages and stores all emulator instances in a centralized dictionary.
-    Used to access emulator logic across the application.
+    Manages and stores all emulator instances in a centralized registry.
+    Holds the five home devices plus an optional fleet of lazily created instances,
+    indexed by device key ('dht' or '<room>/<type>/<id>').
     """
-    def __init__(self, mqtt_client, db_client):
+    def __init__(self, mqtt_client, db_client, scheduler=None, fleet_spec=None, state_store=None):
         """
-        Initialize all emulator instances and assign them to a shared dictionary.
+        Initialize the home emulators and register the optional fleet spec.
 
         Args:
             mqtt_client: Instance of the MQTTClient for publishing messages.
             db_client: Instance of the DBClient for data logging.
+            scheduler (EmulatorScheduler): Optional shared scheduler; one is created if omitted.
+            fleet_spec (dict): Optional fleet declaration, for example
+                {"dht": {"count": 2000, "rooms": ["kitchen", "office"], "interval_ms": 5000}}.
+            state_store (DeviceStateStore): Optional store every emulator records its published state in.
         """
+        self.mqtt = mqtt_client
+        self.db = db_client
+        self.scheduler = scheduler or EmulatorScheduler()
+        self.state_store = state_store
         self.emulators = {
-            "button": ButtonEmulator(mqtt_client, db_client),
-            "dht": DHTEmulator(mqtt_client, db_client),
-            "light": LightEmulator(mqtt_client, db_client),
-            "motion": MotionEmulator(mqtt_client, db_client),
-            "relay": RelayEmulator(mqtt_client, db_client),
+            device_type: cls(mqtt_client, db_client, scheduler=self.scheduler)
+            for device_type, cls in DEVICE_CLASSES.items()
         }
+        for emulator in self.emulators.values():
+            emulator.state_store = state_store
+        self.groups = {}
+        if fleet_spec:
+            self.load_fleet(fleet_spec)
+
+    # ==================== Fleet Registry ====================
 
-    def get(self, device_type: str):
+    def load_fleet(self, fleet_spec: dict):
         """
-        Retrieve an emulator instance by its type key (e.g., "relay", "dht").
+        Register device groups from a fleet spec. No instances are created yet.
 
         Args:
-            device_type (str): The device type key to retrieve.
+            fleet_spec (dict): Mapping of device type to {"count", "rooms", "interval_ms"}.
+        """
+        for device_type, spec in fleet_spec.items():
+            self.groups[device_type] = DeviceGroup(
+                device_type,
+                count=spec.get("count", 0),
+                rooms=spec.get("rooms"),
+                interval_ms=spec.get("interval_ms"),
+            )
+        total = sum(group.count for group in self.groups.values())
+        logger.info(f"[Manager] Fleet registered: {total} devices in {len(self.groups)} groups")
+
+    def _instantiate(self, group: DeviceGroup, device_id: int):
+        """
+        Return the fleet instance for a device id, creating and registering it on first use.
+        """
+        emulator = group.instances.get(device_id)
+        if emulator is None:
+            kwargs = {"scheduler": self.scheduler, "device_id": device_id, "room": group.room_of(device_id)}
+            if group.interval_ms is not None and group.device_type in PERIODIC_TYPES:
+                kwargs["interval_ms"] = group.interval_ms
+            emulator = DEVICE_CLASSES[group.device_type](self.mqtt, self.db, **kwargs)
+            emulator.state_store = self.state_store
+            group.instances[device_id] = emulator
+            self.emulators[emulator.device_key] = emulator
+        return emulator
+
+    def get(self, device_key: str):
+        """
+        Retrieve an emulator instance by its key.
+        Home devices use their type key (e.g., "relay", "dht"); fleet devices use
+        "<room>/<type>/<id>" and are instantiated on first lookup.
+
+        Args:
+            device_key (str): The device key to retrieve.
 
         Returns:
             Emulator instance if found, otherwise None.
         """
-        return self.emulators.get(device_type)
+        emulator = self.emulators.get(device_key)
+        if emulator is not None:
+            return emulator
+
+        parts = device_key.split("/")
+        if len(parts) != 3 or not parts[2].isdigit():
+            return None
+        room, device_type, device_id = parts[0], parts[1], int(parts[2])
+        group = self.groups.get(device_type)
+        if group is None or not group.contains(room, device_id):
+            return None
+        return self._instantiate(group, device_id)
+
+    def iter_group(self, device_type: str, room=None):
+        """
+        Yield every fleet instance of a group (optionally one room), creating them lazily.
+
+        Args:
+            device_type (str): The group's device type.
+            room (str): Optional room filter.
+        """
+        group = self.groups.get(device_type)
+        if group is None:
+            return
+        for device_id in group.ids(room):
+            yield self._instantiate(group, device_id)
+
+    def start_group(self, device_type: str, room=None):
+        """
+        Turn on every instance of a fleet group in O(group) time.
+        First ticks are staggered across one interval to avoid a thundering herd.
+
+        Args:
+            device_type (str): The group's device type.
+            room (str): Optional room filter.
+
+        Returns:
+            int: Number of devices started.
+        """
+        group = self.groups.get(device_type)
+        if group is None:
+            return 0
+        ids = group.ids(room)
+        size = len(ids)
+        for position, device_id in enumerate(ids):
+            emulator = self._instantiate(group, device_id)
+            emulator.turn_on(delay_ms=emulator.interval_ms * position // max(size, 1))
+        logger.info(f"[Manager] Started {size} '{device_type}' devices" + (f" in {room}" if room else ""))
+        return size
+
+    def stop_group(self, device_type: str, room=None):
+        """
+        Turn off every instantiated, active instance of a fleet group.
+
+        Args:
+            device_type (str): The group's device type.
+            room (str): Optional room filter.
+
+        Returns:
+            int: Number of devices stopped.
+        """
+        group = self.groups.get(device_type)
+        if group is None:
+            return 0
+        stopped = 0
+        for device_id in group.ids(room):
+            emulator = group.instances.get(device_id)
+            if emulator is not None and emulator.active:
+                emulator.turn_off()
+                stopped += 1
+        logger.info(f"[Manager] Stopped {stopped} '{device_type}' devices" + (f" in {room}" if room else ""))
+        return stopped
+
+    def fleet_size(self):
+        """
+        Return the number of declared fleet devices, instantiated or not.
+        """
+        return sum(group.count for group in self.groups.values())
@@ -0,0 +1,295 @@
+"""
+Project: IoT Smart Home
+File: headless.py
+Description:
+Headless load-generator entry point. Drives the regular emulator classes through the
+shared EmulatorScheduler without PyQt5, at a target aggregate publish rate, and reports
+achieved throughput and publish latency percentiles. Used to stress Mosquitto and MySQL.
+
+Usage:
+    python -m iot_app.app.headless --dht 2000 --light 500 --rooms kitchen,office --rate 5000 --duration 60
+"""
+
+import argparse
+import os
+import socket
+import threading
+import time
+from collections import deque
+
+from iot_app.app.core.db_client import DBClient
+from iot_app.app.core.mqtt_client import MQTTClient
+from iot_app.app.core.publish_aggregator import PublishAggregator
+from iot_app.app.emulators_manager import EmulatorsManager, EmulatorScheduler, DEVICE_CLASSES, PERIODIC_TYPES
+from iot_app.app.utils.logger import logger, set_console_level
+
+
+class PublishMeter:
+    """
+    Wraps an MQTTClient and records how long every accepted publish call takes.
+    Publishes the client rejects (queue full) are counted separately, so throughput
+    only reflects what the client took. Exposes the same publish() interface so
+    emulators can use it transparently.
+    """
+    def __init__(self, mqtt_client, window=200_000):
+        """
+        Initialize the meter around an MQTT client.
+
+        Args:
+            mqtt_client: The MQTTClient to forward publishes to.
+            window (int): Number of most recent latency samples kept for percentiles.
+        """
+        self.client = mqtt_client
+        self._lock = threading.Lock()
+        self._latencies_ms = deque(maxlen=window)
+        self._count = 0
+        self._rejected = 0
+
+    def encoding_for(self, topic):
+        """
+        Return the payload encoding the wrapped client negotiated for a topic.
+        """
+        return self.client.encoding_for(topic)
+
+    def publish(self, topic, message):
+        """
+        Forward a publish to the wrapped client and record its latency if it was accepted.
+
+        Returns:
+            bool: False if the client rejected the message.
+        """
+        started = time.perf_counter()
+        result = self.client.publish(topic, message)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        # MQTTClient returns False on rejection; a None result (no status) counts as accepted
+        accepted = result is not False
+        with self._lock:
+            if accepted:
+                self._count += 1
+                self._latencies_ms.append(elapsed_ms)
+            else:
+                self._rejected += 1
+        return accepted
+
+    def snapshot(self):
+        """
+        Return the accepted and rejected publish counts and latency percentiles over the sample window.
+
+        Returns:
+            dict: count (accepted), rejected, p50_ms, p95_ms, p99_ms and max_ms.
+        """
+        with self._lock:
+            count, rejected = self._count, self._rejected
+            samples = sorted(self._latencies_ms)
+        return {"count": count, "rejected": rejected, **percentiles(samples)}
+
+
+def percentiles(sorted_samples):
+    """
+    Compute p50/p95/p99/max from an already sorted list of samples.
+
+    Args:
+        sorted_samples (list[float]): Samples in ascending order.
+
+    Returns:
+        dict: p50_ms, p95_ms, p99_ms and max_ms (all 0.0 when empty).
+    """
+    if not sorted_samples:
+        return {"p50_ms": 0.0, "p95_ms": 0.0, "p99_ms": 0.0, "max_ms": 0.0}
+    last = len(sorted_samples) - 1
+    return {
+        "p50_ms": sorted_samples[int(last * 0.50)],
+        "p95_ms": sorted_samples[int(last * 0.95)],
+        "p99_ms": sorted_samples[int(last * 0.99)],
+        "max_ms": sorted_samples[-1],
+    }
+
+
+def build_fleet_spec(counts: dict, rooms, rate: float):
+    """
+    Build a fleet spec whose per-device interval yields the target aggregate rate.
+    Only periodic types publish on their own, so only they count towards the rate and get
+    an interval; relay and button groups are created without one.
+
+    Args:
+        counts (dict): Device type → number of instances.
+        rooms (list[str]): Rooms to spread devices across.
+        rate (float): Target aggregate publishes per second across the periodic devices.
+
+    Returns:
+        dict: Fleet spec for EmulatorsManager.
+    """
+    periodic = sum(count for device_type, count in counts.items() if device_type in PERIODIC_TYPES)
+    interval_ms = max(1, int(periodic * 1000 / rate)) if rate > 0 and periodic else 1000
+    spec = {}
+    for device_type, count in counts.items():
+        if count <= 0:
+            continue
+        spec[device_type] = {"count": count, "rooms": rooms}
+        if device_type in PERIODIC_TYPES:
+            spec[device_type]["interval_ms"] = interval_ms
+    return spec
+
+
+def run_headless(counts: dict, rooms=None, rate=1000.0, duration=60.0, report_every=5.0,
+                 broker_host="localhost", broker_port=1883, use_db=False, workers=4, binary=False,
+                 batch_window_ms=0, batch_bytes=64 * 1024, qos=0, max_inflight=20, max_queued=1000,
+                 connections=1):
+    """
+    Run the emulator fleet without a Qt event loop and report publish throughput.
+
+    Args:
+        counts (dict): Device type → number of instances (only periodic types publish).
+        rooms (list[str]): Rooms to spread devices across.
+        rate (float): Target aggregate publishes per second.
+        duration (float): Run time in seconds (0 runs until interrupted).
+        report_every (float): Seconds between progress reports.
+        broker_host (str): MQTT broker address.
+        broker_port (int): MQTT broker port.
+        use_db (bool): Also persist readings through DBClient.
+        workers (int): Scheduler worker pool size.
+        binary (bool): Publish compact binary payloads instead of JSON/text.
+        batch_window_ms (int): Aggregate publishes into batch frames over this window (0 disables batching).
+        batch_bytes (int): Maximum batch frame size.
+        qos (int): Publish QoS for all device topics.
+        max_inflight (int): QoS 1/2 in-flight window.
+        max_queued (int): Outgoing message limit before publishes are rejected (0 = unbounded).
+        connections (int): Parallel broker connections; publishes are sharded by topic.
+
+    Returns:
+        dict: Final report with throughput and latency percentiles.
+    """
+    encodings = {"Home/": "binary"} if binary else None
+    # Own client id: sharing the GUI's id would make the broker drop one of the two sessions
+    mqtt = MQTTClient(broker_host=broker_host, broker_port=broker_port, topics=[], payload_encodings=encodings,
+                      default_qos=qos, max_inflight=max_inflight, max_queued=max_queued, connections=connections,
+                      client_id=f"SmartHomeApp-{socket.gethostname()}-headless-{os.getpid()}")
+    mqtt.start()
+    deadline = time.monotonic() + 10
+    while not mqtt.is_connected and time.monotonic() < deadline:
+        time.sleep(0.1)
+    if not mqtt.is_connected:
+        logger.error(f"[Headless] Broker {broker_host}:{broker_port} not reachable, aborting.")
+        mqtt.stop()
+        return {}
+
+    db = None
+    if use_db:
+        db = DBClient()
+        db.connect()
+
+    aggregator = None
+    if batch_window_ms > 0:
+        aggregator = PublishAggregator(mqtt, window_ms=batch_window_ms, max_batch_bytes=batch_bytes)
+    meter = PublishMeter(aggregator or mqtt)
+    spec = build_fleet_spec(counts, rooms or ["room1"], rate)
+    manager = EmulatorsManager(meter, db, scheduler=EmulatorScheduler(max_workers=workers), fleet_spec=spec)
+
+    logger.success(f"[Headless] Starting {manager.fleet_size()} devices, target {rate:.0f} msg/s")
+    started = time.monotonic()
+    for device_type in spec:
+        manager.start_group(device_type)
+
+    last_count, last_rejected, last_time = 0, 0, started
+    try:
+        while duration <= 0 or time.monotonic() - started < duration:
+            time.sleep(report_every)
+            now = time.monotonic()
+            snap = meter.snapshot()
+            throughput = (snap["count"] - last_count) / (now - last_time)
+            rejected_rate = (snap["rejected"] - last_rejected) / (now - last_time)
+            last_count, last_rejected, last_time = snap["count"], snap["rejected"], now
+            sched = manager.scheduler.get_stats()
+            line = (f"[Headless] {throughput:,.0f} msg/s accepted, {rejected_rate:,.0f} msg/s rejected | "
+                    f"publish p50={snap['p50_ms']:.3f} ms "
+                    f"p95={snap['p95_ms']:.3f} ms p99={snap['p99_ms']:.3f} ms | "
+                    f"lag max={sched['lag_max_ms']:.1f} ms overruns={sched['overruns']}")
+            pub = mqtt.get_publish_stats()
+            ack = pub["latency_ms"].get(qos)
+            if ack:
+                line += f" | ack p50={ack['p50']:.2f} ms p99={ack['p99']:.2f} ms"
+            line += f" pending={pub['pending']} rejected={pub['rejected']}"
+            if connections > 1:
+                rates = " ".join(f"{shard['publish_rate']:,.0f}" for shard in mqtt.get_shard_stats())
+                line += f" | per-conn msg/s [{rates}]"
+            if aggregator:
+                agg = aggregator.get_stats()
+                line += f" | batches={agg['batches']} avg={agg['avg_batch_size']:.0f} msg"
+            if db:
+                write = db.get_write_stats()
+                line += f" | db queue={write['queue_depth']} dropped={write['dropped']}"
+            # Reports are the tool's output: printed regardless of the console log level
+            print(line, flush=True)
+    except KeyboardInterrupt:
+        logger.info("[Headless] Interrupted.")
+
+    for device_type in spec:
+        manager.stop_group(device_type)
+    manager.scheduler.stop()
+    if aggregator:
+        aggregator.stop()
+    mqtt.stop()
+    elapsed = time.monotonic() - started
+    if db:
+        db.close()
+
+    snap = meter.snapshot()
+    report = {"elapsed_s": elapsed, "throughput": snap["count"] / elapsed if elapsed else 0.0, **snap}
+    print(f"[Headless] Done: {snap['count']:,} publishes accepted, {snap['rejected']:,} rejected "
+          f"in {elapsed:.1f}s ({report['throughput']:,.0f} msg/s), p50={snap['p50_ms']:.3f} ms, "
+          f"p99={snap['p99_ms']:.3f} ms", flush=True)
+    return report
+
+
+def main(argv=None):
+    """
+    Parse command-line options and run the headless load generator.
+    """
+    parser = argparse.ArgumentParser(description="Headless IoT Smart Home load generator")
+    for device_type in DEVICE_CLASSES:
+        parser.add_argument(f"--{device_type}", type=int, default=0, help=f"number of {device_type} devices")
+    parser.add_argument("--rooms", default="room1", help="comma-separated room names")
+    parser.add_argument("--rate", type=float, default=1000.0, help="target aggregate msg/s")
+    parser.add_argument("--duration", type=float, default=60.0, help="seconds to run (0 = until Ctrl+C)")
+    parser.add_argument("--report-every", type=float, default=5.0, help="seconds between reports")
+    parser.add_argument("--host", default="localhost", help="MQTT broker host")
+    parser.add_argument("--port", type=int, default=1883, help="MQTT broker port")
+    parser.add_argument("--db", action="store_true", help="also persist readings to MySQL")
+    parser.add_argument("--workers", type=int, default=4, help="scheduler worker threads")
+    parser.add_argument("--binary", action="store_true", help="publish compact binary payloads")
+    parser.add_argument("--batch-window-ms", type=int, default=0,
+                        help="aggregate publishes into batch messages over this window (0 = off)")
+    parser.add_argument("--batch-bytes", type=int, default=64 * 1024, help="maximum batch message size")
+    parser.add_argument("--qos", type=int, choices=[0, 1, 2], default=0, help="publish QoS")
+    parser.add_argument("--max-inflight", type=int, default=20, help="QoS 1/2 in-flight window")
+    parser.add_argument("--max-queued", type=int, default=1000, help="outgoing message limit (0 = unbounded)")
+    parser.add_argument("--connections", type=int, default=1, help="parallel broker connections")
+    parser.add_argument("--log-level", default="WARNING", help="console log level")
+    args = parser.parse_args(argv)
+
+    set_console_level(args.log_level)
+    counts = {device_type: getattr(args, device_type) for device_type in DEVICE_CLASSES}
+    if not any(counts.values()):
+        counts["dht"] = 100
+    run_headless(
+        counts,
+        rooms=[room.strip() for room in args.rooms.split(",") if room.strip()],
+        rate=args.rate,
+        duration=args.duration,
+        report_every=args.report_every,
+        broker_host=args.host,
+        broker_port=args.port,
+        use_db=args.db,
+        workers=args.workers,
+        binary=args.binary,
+        batch_window_ms=args.batch_window_ms,
+        batch_bytes=args.batch_bytes,
+        qos=args.qos,
+        max_inflight=args.max_inflight,
+        max_queued=args.max_queued,
+        connections=args.connections,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,29 @@
+"""
+Project: IoT Smart Home
+File: health_bridge.py
+Description:
+Delivers HealthMonitor results to the Qt GUI thread.
+The monitor thread emits the signal; Qt queues it to receivers living on the GUI thread,
+so the status bar and dashboard update without ever blocking on a network call.
+"""
+
+from PyQt5.QtCore import QObject, pyqtSignal
+
+
+class HealthSignalBridge(QObject):
+    """
+    Emits each health check cycle's results on the GUI thread.
+    """
+    health_updated = pyqtSignal(dict)
+
+    def __init__(self, monitor, parent=None):
+        """
+        Initialize the bridge and register it with the monitor.
+
+        Args:
+            monitor (HealthMonitor): Monitor whose results are delivered.
+            parent (QObject): Optional Qt parent.
+        """
+        super().__init__(parent)
+        self.monitor = monitor
+        monitor.add_listener(self.health_updated.emit)
@@ -0,0 +1,56 @@
+"""
+Project: IoT Smart Home
+File: log_bridge.py
+Description:
+Hands log records buffered by GuiLogSink to the Qt GUI thread.
+The sink is drained once per frame and each batch is delivered through a Qt signal,
+so logging threads never touch widgets and never wait on the GUI.
+"""
+
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+
+
+class LogSignalBridge(QObject):
+    """
+    Drains a GuiLogSink on the GUI thread and emits records in batches.
+    """
+    records_ready = pyqtSignal(list, int)
+
+    def __init__(self, sink, frame_ms=33, max_per_frame=2000, parent=None):
+        """
+        Initialize the bridge and start the GUI-thread drain timer.
+        Must be constructed on the GUI thread.
+
+        Args:
+            sink (GuiLogSink): Buffered sink returned by add_gui_sink().
+            frame_ms (int): Drain interval in milliseconds (~30 fps by default).
+            max_per_frame (int): Maximum number of records emitted in a single frame.
+            parent (QObject): Optional Qt parent.
+        """
+        super().__init__(parent)
+        self.sink = sink
+        self.max_per_frame = max_per_frame
+        self._last_dropped = 0
+
+        self._timer = QTimer(self)
+        self._timer.setInterval(frame_ms)
+        self._timer.timeout.connect(self._drain)
+        self._timer.start()
+
+    def _drain(self):
+        """
+        Emit the records buffered since the last frame, with the sink's total dropped count.
+        Nothing is emitted when there are no new records and no new drops.
+        """
+        batch = self.sink.drain(self.max_per_frame)
+        dropped = self.sink.dropped
+        if not batch and dropped == self._last_dropped:
+            return
+        self._last_dropped = dropped
+        self.records_ready.emit(batch, dropped)
+
+    def stop(self):
+        """
+        Stop the drain timer.
+        """
+        self._timer.stop()
@@ -5,11 +5,15 @@ Description:
 Main GUI window for the IoT Smart Home app.
 Includes tab-based layout with Dashboard, Emulator Control,
 Logs, Room View Visualization, and Settings.
-Handles MQTT and DB connections, and manages periodic status pings.
+Handles MQTT and DB connections; service health is checked in the background
+by HealthMonitor and shown in the status bar and dashboard.
 """
 
+import os
 import sys
-from PyQt5.QtCore import QTimer
+import threading
+import time
+from PyQt5.QtCore import QTimer, pyqtSignal
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QTabWidget, QStatusBar, QLabel, QMessageBox
 )
@@ -21,9 +25,38 @@ from iot_app.app.ui.room_view_tab import RoomViewTab
 from iot_app.app.ui.settings_tab import SettingsTab
 from iot_app.app.utils.logger import logger
 from iot_app.app.core.db_client import DBClient
+from iot_app.app.core.device_state import DeviceStateStore
+from iot_app.app.core.health_monitor import HealthMonitor
 from iot_app.app.core.mqtt_client import MQTTClient
+from iot_app.app.core.mqtt_journal import MQTTJournal
+from iot_app.app.core.rollup import RollupJob
+from iot_app.app.core.timeseries import TimeSeriesStore
 from iot_app.app.emulators_manager import EmulatorsManager
+from iot_app.app.health_bridge import HealthSignalBridge
 from iot_app.app.mqtt_listener import MQTTListener
+from iot_app.app.mqtt_bridge import MQTTSignalBridge
+from iot_app.app.state_bridge import StateSignalBridge
+
+SERVICES = ("mqtt", "db")
+# Seconds the startup waits for a service before reporting it as failed (it keeps retrying)
+SERVICE_TIMEOUT_S = 5.0
+
+TAB_LABELS = {
+    "dashboard": "📊 Dashboard",
+    "emulators": "🧪 Emulators",
+    "logs": "📜 Logs",
+    "room_view": "🏠 Room View",
+    "settings": "⚙️ Settings",
+}
+# Services a tab needs before its live version replaces the placeholder.
+# The dashboard and room view read the local state/history stores and settings drives the
+# reconnects, so they go live as soon as the clients exist; emulator controls need the broker.
+TAB_DEPENDENCIES = {
+    "dashboard": (),
+    "emulators": ("mqtt",),
+    "room_view": (),
+    "settings": (),
+}
 
 
 class MainWindow(QMainWindow):
@@ -31,6 +64,8 @@ class MainWindow(QMainWindow):
     Main GUI window for the IoT Smart Home application.
     Initializes all tabs and handles MQTT/DB connections and updates.
     """
+    service_ready = pyqtSignal(str, bool)
+
     def __init__(self):
         super().__init__()
         self.setWindowTitle("IoT Smart Home")
@@ -39,19 +74,40 @@ class MainWindow(QMainWindow):
         self.db = None
         self.mqtt = None
         self.manager = None
-        self.listener = None
+        self.journal = None
+        self.rollup = None
+        self.health = None
+        self.health_bridge = None
         self.next_ping_secs = 30
-        self.first_ping_done = False
+
+        # Startup bookkeeping: phase → ms since construction, services ready / settled, live tabs
+        self._startup_started = time.perf_counter()
+        self._startup_phases = {}
+        self._services_started = False
+        self._ready = set()
+        self._settled = {}
+        self._live_tabs = set()
 
         self.tabs = QTabWidget()
         self.setCentralWidget(self.tabs)
 
+        self.mqtt_bridge = MQTTSignalBridge(parent=self)
+        self.mqtt_bridge.messages_ready.connect(self._handle_mqtt_batch)
+
+        # Latest state and reading history per device, fed by MQTT and the emulators;
+        # tabs subscribe through the bridge
+        self.history = TimeSeriesStore()
+        self.state_store = DeviceStateStore(history=self.history)
+        self.state_bridge = StateSignalBridge(self.state_store, parent=self)
+        self.state_bridge.states_changed.connect(self._on_first_reading)
+        self.listener = MQTTListener(self.state_store)
+
+        # Emitted from the startup worker threads; queued to the GUI thread
+        self.service_ready.connect(self._on_service_ready)
+
         self._init_status_bar()
         self._init_tabs_placeholder()
-
-        self.status_counter = 3
-        self.status_bar.showMessage("Connecting to services in 3 seconds...")
-        self._start_connection_countdown()
+        self.status_bar.showMessage("Connecting to services...")
 
     # ==================== UI Initialization ====================
 
@@ -84,94 +140,178 @@ class MainWindow(QMainWindow):
         self.room_view_tab = RoomViewTab(None, None, None)
         self.settings_tab = SettingsTab(None, None)
 
-        self.tabs.addTab(self.dashboard_tab, "📊 Dashboard")
-        self.tabs.addTab(self.emulators_tab, "🧪 Emulators")
-        self.tabs.addTab(self.logs_tab, "📜 Logs")
-        self.tabs.addTab(self.room_view_tab, "🏠 Room View")
-        self.tabs.addTab(self.settings_tab, "⚙️ Settings")
+        for name, label in TAB_LABELS.items():
+            self.tabs.addTab(getattr(self, f"{name}_tab"), label)
 
     # ==================== Service Initialization ====================
 
-    def _start_connection_countdown(self):
+    def showEvent(self, event):
         """
-        Begin countdown before attempting initial connection.
+        Start connecting to services once the window is on screen (first show only).
         """
-        self.timer = QTimer(self)
-        self.timer.timeout.connect(self._update_status_countdown)
-        self.timer.start(1000)
-
-    def _update_status_countdown(self):
+        super().showEvent(event)
+        if not self._services_started:
+            self._services_started = True
+            self._mark_phase("window_shown")
+            # Let the first frame paint before starting the connections
+            QTimer.singleShot(0, self._start_services)
+
+    def _start_services(self):
         """
-        Update countdown each second and connect when it reaches zero.
-        """
-        if self.status_counter > 1:
-            self.status_counter -= 1
-            self.status_bar.showMessage(f"Connecting to services in {self.status_counter} seconds...")
-        else:
-            self.timer.stop()
-            self._init_connections()
-
-    def _init_connections(self):
-        """
-        Initialize DB and MQTT connections, and delay tab finalization.
+        Create the clients and connect to MySQL and MQTT in parallel on background threads.
+        Tabs without service dependencies go live right away; the others follow as their
+        services report ready through service_ready.
         """
         self.db = DBClient()
+        # Raw MQTT stream recording for incident replay, opt-in: IOT_MQTT_JOURNAL=<directory>
+        journal_dir = os.environ.get("IOT_MQTT_JOURNAL", "")
+        self.journal = MQTTJournal(journal_dir) if journal_dir else None
         self.mqtt = MQTTClient(
             broker_host="localhost",
             broker_port=1883,
             topics=["Home/#"],
-            on_message_callback=self._handle_mqtt_message
+            on_message_callback=self.mqtt_bridge.submit,
+            journal=self.journal,
+            # Actuator and doorbell events must not be lost; periodic sensor samples stay at QoS 0
+            topic_qos={"Home/relay": 1, "Home/button": 1}
         )
+        # Emulators publish through the offline buffer and the DB write queue until connected
+        self.manager = EmulatorsManager(self.mqtt, self.db, state_store=self.state_store)
+
         self.mqtt.start()
-        self.manager = EmulatorsManager(self.mqtt, self.db)
-        QTimer.singleShot(1500, self._finalize_tabs)
+        threading.Thread(target=self._connect_db, name="StartupDB", daemon=True).start()
+        threading.Thread(target=self._wait_mqtt, name="StartupMQTT", daemon=True).start()
+        self._mark_phase("services_started")
+        self._go_live_ready_tabs()
 
-    def _finalize_tabs(self):
+    def _connect_db(self):
         """
-        After successful connection, replace placeholder tabs with live components.
+        Startup worker: create the DB pool (blocking) and report the outcome.
         """
         self.db.connect()
-        logger.info("🚀 System initialized and GUI loaded.")
+        self.service_ready.emit("db", self.db.is_connected)
 
-        mqtt_ok = self.mqtt and self.mqtt.is_connected
-        db_ok = self.db and self.db.test_connection
-
-        if not mqtt_ok or not db_ok:
-            logger.error("🛑 Connection failed. Prompting retry...")
-            self._show_connection_error_popup()
+    def _wait_mqtt(self):
+        """
+        Startup worker: wait for the broker to accept every connection. After a timeout the
+        failure is reported, and waiting continues: the network threads keep retrying.
+        """
+        if self.mqtt.wait_connected(SERVICE_TIMEOUT_S):
+            self.service_ready.emit("mqtt", True)
             return
+        self.service_ready.emit("mqtt", False)
+        if self.mqtt.wait_connected():
+            self.service_ready.emit("mqtt", True)
 
-        self.tabs.clear()
-        self.dashboard_tab = DashboardTab(self.db, self.mqtt, self.manager)
-        self.room_view_tab = RoomViewTab(self.db, self.mqtt, self.manager)
-        self.listener = MQTTListener(room_view=self.room_view_tab)
-        self.emulators_tab = EmulatorsTab(self.db, self.mqtt, self.manager)
-        self.settings_tab = SettingsTab(self.db, self.mqtt)
-
-        self.tabs.addTab(self.dashboard_tab, "📊 Dashboard")
-        self.tabs.addTab(self.emulators_tab, "🧪 Emulators")
-        self.tabs.addTab(self.logs_tab, "📜 Logs")
-        self.tabs.addTab(self.room_view_tab, "🏠 Room View")
-        self.tabs.addTab(self.settings_tab, "⚙️ Settings")
+    def _on_service_ready(self, name, ok):
+        """
+        Record a service's startup outcome (GUI thread) and bring dependent tabs live.
+        Once both services have settled, start the background jobs and log the timing report.
 
+        Args:
+            name (str): 'mqtt' or 'db'.
+            ok (bool): Whether the service is usable.
+        """
+        first_outcome = name not in self._settled
+        self._settled[name] = ok
+        if ok and name not in self._ready:
+            self._ready.add(name)
+            self._mark_phase(f"{name}_ready")
+            if name == "db":
+                self.rollup = RollupJob(self.db)
+                self.rollup.start()
+            self._go_live_ready_tabs()
+
+        if first_outcome and len(self._settled) == len(SERVICES):
+            self._on_services_settled()
+
+    def _on_services_settled(self):
+        """
+        Both startup connections finished (successfully or not): start health checks,
+        show the state and report startup timing; offer a retry if a service failed.
+        """
+        mqtt_ok, db_ok = self._settled["mqtt"], self._settled["db"]
         self.dashboard_tab.update_status()
-        self._start_ping_loop()
         self._update_status_bar(mqtt_ok, db_ok)
+        self._start_health_monitor()
+        self._log_startup_report()
 
-    # ==================== Ping Loop ====================
+        if mqtt_ok and db_ok:
+            logger.info("🚀 System initialized and GUI loaded.")
+        else:
+            logger.error("🛑 Connection failed. Prompting retry...")
+            self._show_connection_error_popup()
 
-    def _start_ping_loop(self):
+    def _go_live_ready_tabs(self):
         """
-        Start timers for updating the system status every 30 seconds.
+        Replace each placeholder tab whose service dependencies are ready with its live version.
         """
-        self.ping_timer = QTimer(self)
-        self.ping_timer.timeout.connect(self._do_ping)
-        self.ping_timer.start(30_000)
+        factories = {
+            "dashboard": lambda: DashboardTab(self.db, self.mqtt, self.manager, history=self.history),
+            "emulators": lambda: EmulatorsTab(self.db, self.mqtt, self.manager),
+            "room_view": lambda: RoomViewTab(self.db, self.mqtt, self.manager, state_bridge=self.state_bridge),
+            "settings": lambda: SettingsTab(self.db, self.mqtt),
+        }
+        for name, dependencies in TAB_DEPENDENCIES.items():
+            if name in self._live_tabs or not self._ready.issuperset(dependencies):
+                continue
+            placeholder = getattr(self, f"{name}_tab")
+            index = self.tabs.indexOf(placeholder)
+            current = self.tabs.currentIndex()
+            tab = factories[name]()
+            self.tabs.removeTab(index)
+            self.tabs.insertTab(index, tab, TAB_LABELS[name])
+            self.tabs.setCurrentIndex(current)
+            placeholder.deleteLater()
+            setattr(self, f"{name}_tab", tab)
+            self._live_tabs.add(name)
+            self._mark_phase(f"tab_{name}")
+            if name == "dashboard":
+                tab.update_status(self.health.get_results() if self.health else None)
+
+    # ==================== Startup Timing ====================
+
+    def _mark_phase(self, phase):
+        """
+        Record the time of a startup phase, once, relative to window construction.
+        """
+        if phase not in self._startup_phases:
+            elapsed_ms = (time.perf_counter() - self._startup_started) * 1000
+            self._startup_phases[phase] = elapsed_ms
+            logger.debug(f"[Startup] {phase} at {elapsed_ms:.0f} ms")
 
+    def _on_first_reading(self, device_keys):
+        """
+        Record the first device state delivered to the GUI, then stop listening.
+        """
+        self.state_bridge.states_changed.disconnect(self._on_first_reading)
+        self._mark_phase("first_reading")
+        logger.info(f"[Startup] First live reading after {self._startup_phases['first_reading']:.0f} ms")
+
+    def _log_startup_report(self):
+        """
+        Log the startup phases recorded so far, in order.
+        """
+        report = ", ".join(f"{phase} {ms:.0f} ms"
+                           for phase, ms in sorted(self._startup_phases.items(), key=lambda item: item[1]))
+        logger.info(f"[Startup] Timing: {report}")
+
+    # ==================== Health Checks ====================
+
+    def _start_health_monitor(self):
+        """
+        Start background health checks of MQTT and DB every 30 seconds.
+        Probes run on worker threads; results arrive through HealthSignalBridge.
+        """
         self.countdown_timer = QTimer(self)
         self.countdown_timer.timeout.connect(self._tick_ping_countdown)
         self.countdown_timer.start(1000)
 
+        self.health = HealthMonitor({"mqtt": self.mqtt.ping, "db": self.db.ping}, interval_s=30)
+        self.health_bridge = HealthSignalBridge(self.health, parent=self)
+        self.health_bridge.health_updated.connect(self._on_health_updated)
+        self.health.start()
+
     def _tick_ping_countdown(self):
         """
         Update the visual countdown label for the next status ping.
@@ -181,38 +321,59 @@ class MainWindow(QMainWindow):
             self.next_ping_secs = 30
         self.ping_timer_label.setText(f"Next update in: {self.next_ping_secs}s")
 
-    def _do_ping(self):
+    def _on_health_updated(self, results):
         """
-        Perform status check for MQTT and DB, update dashboard and status bar.
+        Show one health check cycle in the status bar and dashboard (GUI thread).
+        A service that failed at startup and now passes its probe is treated as ready.
+
+        Args:
+            results (dict): Probe name → result from HealthMonitor.
         """
         self.next_ping_secs = 30
-        if not self.first_ping_done:
-            self.first_ping_done = True
-            return
-
-        mqtt_ok = self.mqtt and self.mqtt.is_connected
-        db_ok = self.db and self.db.test_connection()
-
-        self._update_status_bar(mqtt_ok, db_ok)
-        self.dashboard_tab.update_status()
-
-    def _update_status_bar(self, mqtt_ok, db_ok):
+        for name in SERVICES:
+            if results.get(name, {}).get("ok") and name not in self._ready:
+                self._on_service_ready(name, True)
+        mqtt_ok = results.get("mqtt", {}).get("ok", False)
+        db_ok = results.get("db", {}).get("ok", False)
+        self._update_status_bar(mqtt_ok, db_ok, results)
+        self.dashboard_tab.update_status(results)
+
+    def _update_status_bar(self, mqtt_ok, db_ok, health=None):
         """
         Update the status bar colors and message based on current connection state.
+
+        Args:
+            mqtt_ok (bool): MQTT broker reachable.
+            db_ok (bool): Database reachable.
+            health (dict): Optional HealthMonitor results, adding round-trip times.
         """
+        health = health or {}
         color = "#10b981" if mqtt_ok and db_ok else "#f43f5e"
         mqtt_text = "Connected" if mqtt_ok else "Disconnected"
         db_text = "Synced" if db_ok else "No Connection"
+        if mqtt_ok and health.get("mqtt", {}).get("rtt_ms") is not None:
+            mqtt_text += f" ({health['mqtt']['rtt_ms']:.0f} ms)"
+        if db_ok and health.get("db", {}).get("rtt_ms") is not None:
+            db_text += f" ({health['db']['rtt_ms']:.0f} ms)"
         self.status_bar.showMessage(f"MQTT: {mqtt_text} | DB: {db_text}")
         self.status_bar.setStyleSheet(f"background-color: #111111; color: {color}; font-size: 12px;")
 
     # ==================== MQTT Handler ====================
 
+    def _handle_mqtt_batch(self, messages):
+        """
+        Dispatch a coalesced batch of MQTT messages on the GUI thread.
+
+        Args:
+            messages (list[tuple]): (topic, payload) pairs, latest payload per topic.
+        """
+        for topic, payload in messages:
+            self._handle_mqtt_message(topic, payload)
+
     def _handle_mqtt_message(self, topic, payload):
         """
         Forward incoming MQTT messages to the listener.
         """
-        logger.debug(f"[MainWindow] MQTT message routed | Topic: '{topic}' | Payload: {payload}")
         if self.listener:
             try:
                 self.listener.route_message(topic, payload)
@@ -231,7 +392,42 @@ class MainWindow(QMainWindow):
         msg.setText("Failed to connect to MQTT broker or Database.\nPlease check your setup and try again.")
         msg.setStandardButtons(QMessageBox.Retry)
         if msg.exec_() == QMessageBox.Retry:
-            self._init_connections()
+            self._retry_services()
+
+    def _retry_services(self):
+        """
+        Retry the services that are not ready: skip the MQTT backoff wait and run a health
+        check now (the DB probe recreates the pool). Recovered services go live through
+        _on_health_updated or the MQTT startup worker.
+        """
+        if "mqtt" not in self._ready:
+            self.mqtt.reconnect()
+        self.health.check_now()
+
+    # ==================== Shutdown ====================
+
+    def closeEvent(self, event):
+        """
+        Stop the background work and release the services when the window closes.
+        Producers stop first (health probes, rollups, emulators), then MQTT so nothing more
+        is journaled, then the journal and finally the DB client, which flushes queued rows.
+        """
+        logger.info("[MainWindow] Shutting down...")
+        self.mqtt_bridge.stop()
+        if self.health:
+            self.countdown_timer.stop()
+            self.health.stop()
+        if self.rollup:
+            self.rollup.stop()
+        if self.manager:
+            self.manager.scheduler.stop()
+        if self.mqtt:
+            self.mqtt.stop()
+        if self.journal:
+            self.journal.close()
+        if self.db and not self.db.close():
+            logger.error("[MainWindow] Shutdown could not write every queued DB row.")
+        super().closeEvent(event)
 
 
 # ==================== App Entry Point ====================
@@ -0,0 +1,130 @@
+"""
+Project: IoT Smart Home
+File: mqtt_bridge.py
+Description:
+Thread-safe bridge between the paho MQTT network thread and the Qt GUI thread.
+Messages are queued without locks, coalesced to the latest payload per topic,
+and dispatched on the GUI thread at a fixed frame rate.
+Batch frames from a PublishAggregator are unpacked on arrival so coalescing
+still works per device topic.
+"""
+
+from collections import deque
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+from iot_app.app.core.payload_codec import is_batch, decode_batch
+from iot_app.app.utils.logger import logger
+
+
+class MQTTSignalBridge(QObject):
+    """
+    Hands MQTT messages from the network thread to the GUI thread.
+    A flood of messages costs at most one dispatch per topic per frame.
+    """
+    messages_ready = pyqtSignal(list)
+
+    def __init__(self, frame_ms=33, max_pending=100_000, max_dispatch_per_frame=2000, parent=None):
+        """
+        Initialize the bridge and start the GUI-thread drain timer.
+        Must be constructed on the GUI thread.
+
+        Args:
+            frame_ms (int): Drain interval in milliseconds (~30 fps by default).
+            max_pending (int): Capacity of the incoming queue; oldest messages are discarded beyond it.
+            max_dispatch_per_frame (int): Maximum number of topics dispatched in a single frame.
+            parent (QObject): Optional Qt parent.
+        """
+        super().__init__(parent)
+        self.max_dispatch_per_frame = max_dispatch_per_frame
+
+        # deque.append / popleft are atomic in CPython, so producer and consumer need no lock
+        self._queue = deque(maxlen=max_pending)
+        self._carry = {}
+
+        self._received = 0
+        self._drained = 0
+        self._dispatched = 0
+        self._frames = 0
+
+        self._timer = QTimer(self)
+        self._timer.setInterval(frame_ms)
+        self._timer.timeout.connect(self._drain)
+        self._timer.start()
+
+    # ==================== Producer Side (any thread) ====================
+
+    def submit(self, topic: str, payload):
+        """
+        Queue an incoming message. Safe to call from the paho network thread.
+
+        Args:
+            topic (str): The MQTT topic.
+            payload: The message payload.
+        """
+        if isinstance(payload, bytes) and is_batch(payload):
+            try:
+                entries = decode_batch(payload)
+            except ValueError as e:
+                logger.warning(f"[Bridge] Dropping malformed batch on '{topic}': {e}")
+                return
+            self._queue.extend(entries)
+            self._received += len(entries)
+            return
+        self._queue.append((topic, payload))
+        self._received += 1
+
+    # ==================== Consumer Side (GUI thread) ====================
+
+    def _drain(self):
+        """
+        Pop everything queued since the last frame, keep only the latest payload
+        per topic, and emit one batch for the GUI to dispatch.
+        """
+        latest = self._carry
+        popleft = self._queue.popleft
+        count = len(self._queue)
+        for _ in range(count):
+            topic, payload = popleft()
+            latest.pop(topic, None)
+            latest[topic] = payload
+        self._drained += count
+
+        if not latest:
+            return
+
+        if len(latest) > self.max_dispatch_per_frame:
+            items = list(latest.items())
+            batch = items[:self.max_dispatch_per_frame]
+            self._carry = dict(items[self.max_dispatch_per_frame:])
+        else:
+            batch = list(latest.items())
+            self._carry = {}
+
+        self._frames += 1
+        self._dispatched += len(batch)
+        try:
+            self.messages_ready.emit(batch)
+        except Exception as e:
+            logger.warning(f"[Bridge] Dispatch failed: {e}")
+
+    def stop(self):
+        """
+        Stop the drain timer.
+        """
+        self._timer.stop()
+
+    def get_stats(self):
+        """
+        Return counters describing bridge throughput and coalescing.
+
+        Returns:
+            dict: Received, dispatched, coalesced and discarded message counts plus queue depth.
+        """
+        pending = len(self._queue)
+        return {
+            "received": self._received,
+            "dispatched": self._dispatched,
+            "coalesced": self._drained - self._dispatched - len(self._carry),
+            "discarded": max(0, self._received - self._drained - pending),
+            "pending": pending + len(self._carry),
+            "frames": self._frames,
+        }
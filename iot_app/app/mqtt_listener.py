@@ -2,90 +2,230 @@
 Project: IoT Smart Home
 File: mqtt_listener.py
 Description:
-MQTT listener and message router for updating Room View
-based on received sensor data and device states.
+MQTT listener and message router that feeds received sensor data and device
+states into the DeviceStateStore shared by the GUI tabs.
+Handlers are registered per device instance (and for the fleet topic pattern)
+under MQTT topic filters and dispatched through a topic trie; topics without a
+handler are counted.
+Payloads may be text/JSON or the compact binary encoding from payload_codec;
+batch frames published on 'Home/_batch' are fanned back out to the device handlers.
 """
 
 import json
-from iot_app.app.utils.logger import logger
+from collections import Counter
+from functools import partial
+from iot_app.app.core.device_state import is_active
+from iot_app.app.core.payload_codec import decode_payload, decode_batch
+from iot_app.app.core.topic_trie import TopicTrie
+from iot_app.app.utils.logger import logger, get_logger
+
+_log = get_logger("listener", "Listener")
+
+TOPIC_BASE = "Home"
+HOME_DEVICES = ("dht", "light", "motion", "button", "relay")
+EMPTY_PAYLOADS = ("None", "null", "", None)
+BATCH_FILTER = f"{TOPIC_BASE}/_batch/#"
+FLEET_FILTER = f"{TOPIC_BASE}/+/+/+"
+
+
+# ==================== Payload Parsers ====================
+
+def _number(value) -> float:
+    """
+    Parse a number that may carry a unit suffix (e.g. '23.4 °C' or 512).
+    """
+    return float(str(value).split()[0])
+
+
+def parse_dht(payload: str):
+    """
+    Parse a DHT JSON payload into (active, values).
+    """
+    data = json.loads(payload)
+    if not data:
+        return False, None
+    return True, {"temperature": _number(data["temperature"]), "humidity": _number(data["humidity"])}
+
+
+def parse_light(payload: str):
+    """
+    Parse a light payload ('N lx') into (active, values).
+    """
+    return True, {"lux": _number(payload)}
+
+
+def parse_motion(payload: str):
+    """
+    Parse a motion payload into (active, values); active while motion is detected.
+    """
+    detected = "motion" in payload.lower() and "no motion" not in payload.lower()
+    return detected, {"motion": 1.0 if detected else 0.0}
+
+
+def parse_relay(payload: str):
+    """
+    Parse a relay payload ('1' / '0') into (active, values); anything else resets the device.
+    """
+    if payload == "1":
+        return True, {"state": 1.0}
+    if payload == "0":
+        return False, {"state": 0.0}
+    return False, None
+
+
+def parse_button(payload: str):
+    """
+    Parse a button payload into (active, values); only 'pressed' is a press ('idle' resets).
+    """
+    if payload == "pressed":
+        return True, {"pressed": 1.0}
+    return False, None
+
+
+PAYLOAD_PARSERS = {
+    "dht": parse_dht,
+    "light": parse_light,
+    "motion": parse_motion,
+    "relay": parse_relay,
+    "button": parse_button,
+}
 
 
 class MQTTListener:
-    def __init__(self, room_view):
+    """
+    Table-driven MQTT router: topic filter → handler, matched through a TopicTrie.
+    """
+    def __init__(self, state_store, device_keys=HOME_DEVICES, max_tracked_unknown=1000, fleet=True):
+        """
+        Initialize the MQTTListener and register the home devices.
+
+        Args:
+            state_store (DeviceStateStore): Store receiving every parsed device state.
+            device_keys (Iterable[str]): Home device keys (equal to their device types) to register.
+            max_tracked_unknown (int): Number of distinct unknown topics counted individually.
+            fleet (bool): Also route fleet topics ('Home/<room>/<type>/<id>') into the store.
+        """
+        self.store = state_store
+        self.routes = TopicTrie()
+        self.max_tracked_unknown = max_tracked_unknown
+
+        self.routed = 0
+        self.unknown = 0
+        self.batches = 0
+        self.unknown_topics = Counter()
+
+        self.register(BATCH_FILTER, self._handle_batch)
+        for key in device_keys:
+            self.register_device(key, key)
+        if fleet:
+            self.register(FLEET_FILTER, self._handle_fleet)
+
+    # ==================== Registry ====================
+
+    def register(self, topic_filter: str, handler):
+        """
+        Register a handler for an MQTT topic filter ('+' and '#' wildcards allowed).
+
+        Args:
+            topic_filter (str): Topic filter, e.g. 'Home/+/dht/+'.
+            handler (Callable[[str, str], None]): Called with (topic, payload) for every matching message.
+        """
+        self.routes.insert(topic_filter, handler)
+
+    def unregister(self, topic_filter: str, handler):
         """
-        Initialize the MQTTListener with a reference to the Room View tab.
+        Remove a handler registered with register().
+
+        Returns:
+            bool: True if the handler was removed.
+        """
+        return self.routes.remove(topic_filter, handler)
+
+    def register_device(self, device_key: str, device_type: str):
+        """
+        Register the state handler for one device instance.
 
         Args:
-            room_view: Instance of RoomViewTab responsible for updating UI elements.
+            device_key (str): Device key as used in its topic (e.g., 'dht' or 'kitchen/dht/12').
+            device_type (str): Device type selecting the payload parser.
+
+        Returns:
+            Callable: The registered handler (pass it to unregister()).
         """
-        self.room_view = room_view
+        handler = partial(self._handle_state, device_key, device_type)
+        self.register(f"{TOPIC_BASE}/{device_key}", handler)
+        return handler
+
+    # ==================== Dispatch ====================
 
     def route_message(self, topic: str, payload: str):
         """
-        Route incoming MQTT messages to the appropriate handler and update the Room View accordingly.
+        Route an incoming MQTT message to every handler whose filter matches its topic.
 
         Args:
             topic (str): The MQTT topic the message was received on.
-            payload (str): The message content as a string.
+            payload (str | bytes): The message content as a string, or bytes for binary payloads.
         """
-        logger.debug(f"[Listener] Received → {topic}: {payload}")
-
-        # ===== Validate topic prefix =====
-        if not topic.startswith("Home/"):
+        _log.sampled(1000, "DEBUG", "Received → {}: {}", topic, payload)
+
+        handlers = self.routes.match(topic)
+        if not handlers:
+            self.unknown += 1
+            if topic in self.unknown_topics or len(self.unknown_topics) < self.max_tracked_unknown:
+                self.unknown_topics[topic] += 1
+            _log.rate_limited(10.0, "DEBUG", "No handler for '{}'", topic)
             return
 
-        key = topic.split("/")[-1].lower()
+        self.routed += 1
+        for handler in handlers:
+            try:
+                handler(topic, payload)
+            except Exception as e:
+                logger.warning(f"[Listener] Failed to handle {topic}: {e}")
 
-        # ===== Handle empty or invalid payload =====
-        if payload in ("None", "null", "", None):
-            self.room_view.update_device_state(key, active=False, reading=None)
-            return
+    def _handle_batch(self, topic, payload):
+        """
+        Fan a PublishAggregator batch frame back out as individual messages.
+        """
+        entries = decode_batch(payload)
+        self.batches += 1
+        for sub_topic, sub_payload in entries:
+            self.route_message(sub_topic, sub_payload)
+
+    def _handle_fleet(self, topic, payload):
+        """
+        Route a fleet device message ('Home/<room>/<type>/<id>') by the type in its topic.
+        """
+        device_key = topic[len(TOPIC_BASE) + 1:]
+        device_type = device_key.split("/")[1]
+        if device_type in PAYLOAD_PARSERS:
+            self._handle_state(device_key, device_type, topic, payload)
+
+    def _handle_state(self, device_key, device_type, topic, payload):
+        """
+        Parse a device payload into typed values and record it in the state store.
+        """
+        if isinstance(payload, bytes):
+            _, values = decode_payload(payload)
+            active = is_active(device_type, values)
+        elif payload in EMPTY_PAYLOADS:
+            active, values = False, None
+        else:
+            active, values = PAYLOAD_PARSERS[device_type](payload)
+        self.store.update(device_key, device_type, active, values, source="mqtt")
+
+    def get_stats(self):
+        """
+        Return routing counters.
 
-        reading = None
-        active = False
-
-        try:
-            # ===== DHT Sensor =====
-            if key == "dht":
-                data = json.loads(payload)
-                temp = data.get("temperature", "?")
-                hum = data.get("humidity", "?")
-                reading = f"{temp}, {hum}"
-                active = True
-
-            # ===== Light Sensor =====
-            elif key == "light":
-                reading = payload
-                active = True
-
-            # ===== Motion Sensor =====
-            elif key == "motion":
-                reading = payload
-                active = "motion" in payload.lower()
-
-            # ===== Button Press =====
-            elif key == "button":
-                self.room_view.pulse_button()
-                return
-
-            # ===== Relay State =====
-            elif key == "relay":
-                if payload == "1":
-                    reading = "ON"
-                    active = True
-                elif payload == "0":
-                    reading = "OFF"
-                    active = False
-                else:
-                    self.room_view.update_device_state(key, active=False, reading=None)
-                    return
-
-            # ===== Unknown Key =====
-            else:
-                return
-
-            # ===== Final Update =====
-            self.room_view.update_device_state(key, active, reading)
-
-        except Exception as e:
-            logger.warning(f"[Listener] Failed to handle {topic}: {e}")
+        Returns:
+            dict: routed and unknown message counts, fanned-out batch frames, registered handler count,
+                  and the most frequent unknown topics.
+        """
+        return {
+            "routed": self.routed,
+            "unknown": self.unknown,
+            "batches": self.batches,
+            "handlers": len(self.routes),
+            "top_unknown": self.unknown_topics.most_common(10),
+        }
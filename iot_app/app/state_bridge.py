@@ -0,0 +1,58 @@
+"""
+Project: IoT Smart Home
+File: state_bridge.py
+Description:
+Delivers DeviceStateStore change notifications to the Qt GUI thread.
+The store wakes the bridge through a queued signal when its dirty set becomes non-empty;
+the bridge waits at most one frame, drains the changed keys and emits them in one batch.
+Nothing runs while no device changes, so tabs need no polling timers.
+"""
+
+from PyQt5.QtCore import QObject, QTimer, Qt, pyqtSignal
+
+
+class StateSignalBridge(QObject):
+    """
+    Emits the keys of changed devices on the GUI thread, at most once per frame.
+    """
+    states_changed = pyqtSignal(list)
+    _wake = pyqtSignal()
+
+    def __init__(self, store, frame_ms=33, parent=None):
+        """
+        Initialize the bridge and register it with the store.
+        Must be constructed on the GUI thread.
+
+        Args:
+            store (DeviceStateStore): Store whose changes are delivered.
+            frame_ms (int): Delay between the first change and delivery, batching a frame's changes.
+            parent (QObject): Optional Qt parent.
+        """
+        super().__init__(parent)
+        self.store = store
+        self.batches = 0
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(frame_ms)
+        self._timer.timeout.connect(self._flush)
+
+        # Emitted from any updating thread; the queued connection runs the slot on the GUI thread
+        self._wake.connect(self._schedule, Qt.QueuedConnection)
+        store.add_waker(self._wake.emit)
+
+    def _schedule(self):
+        """
+        Start the frame timer unless a delivery is already pending.
+        """
+        if not self._timer.isActive():
+            self._timer.start()
+
+    def _flush(self):
+        """
+        Drain the store's dirty keys and emit them.
+        """
+        keys = self.store.drain_dirty()
+        if keys:
+            self.batches += 1
+            self.states_changed.emit(sorted(keys))
@@ -3,12 +3,14 @@ Project: IoT Smart Home
 File: dashboard_tab.py
 Description:
 UI module for the DashboardTab screen.
-Displays general system status: MQTT, emulators, DB, etc.
+Displays general system status: MQTT, emulators, DB, etc.,
+and live rolling charts of device readings when a history store is provided.
 """
 
 from PyQt5.QtWidgets import QWidget, QLabel, QVBoxLayout, QHBoxLayout, QFrame
 from PyQt5.QtGui import QFont
 from PyQt5.QtCore import Qt
+from iot_app.app.ui.live_charts import LiveChartsPanel
 from iot_app.app.ui.theme import COLORS, SIZES
 
 
@@ -16,7 +18,7 @@ class DashboardTab(QWidget):
     """
     Main dashboard UI displaying connection status for MQTT, DB, and emulators.
     """
-    def __init__(self, db_client=None, mqtt_client=None, manager=None):
+    def __init__(self, db_client=None, mqtt_client=None, manager=None, history=None):
         """
         Initialize the dashboard tab with references to MQTT, DB, and emulator manager.
 
@@ -24,6 +26,7 @@ class DashboardTab(QWidget):
             db_client: Optional DBClient instance.
             mqtt_client: Optional MQTTClient instance.
             manager: Optional EmulatorsManager instance.
+            history: Optional TimeSeriesStore feeding the live charts.
         """
         super().__init__()
         self.setStyleSheet(f"background-color: {COLORS['background']}; color: {COLORS['text']};")
@@ -31,7 +34,9 @@ class DashboardTab(QWidget):
         self.db_client = db_client
         self.mqtt_client = mqtt_client
         self.manager = manager
+        self.history = history
 
+        self.charts = None
         self.mqtt_status_label = None
         self.db_status_label = None
         self.emulator_status_label = None
@@ -77,9 +82,15 @@ class DashboardTab(QWidget):
         container.setLayout(cards_layout)
         container.setMaximumWidth(1000)
 
-        layout.addStretch()
-        layout.addWidget(container, alignment=Qt.AlignHCenter)
-        layout.addStretch()
+        if self.history is None:
+            layout.addStretch()
+            layout.addWidget(container, alignment=Qt.AlignHCenter)
+            layout.addStretch()
+        else:
+            layout.setSpacing(SIZES["padding"])
+            layout.addWidget(container, alignment=Qt.AlignHCenter)
+            self.charts = LiveChartsPanel(self.history)
+            layout.addWidget(self.charts, 1)
 
         self.setLayout(layout)
 
@@ -141,24 +152,27 @@ class DashboardTab(QWidget):
 
     # ============================ Status Update ============================
 
-    def update_status(self):
+    def update_status(self, health=None):
         """
-        Update the status of each card (MQTT, DB, Emulators) based on current connection states.
+        Update the status of each card (MQTT, DB, Emulators). Never touches the network:
+        MQTT and DB come from HealthMonitor results, or from the clients' cached
+        connection state until the first health check has finished.
+
+        Args:
+            health (dict): Optional probe name → result from HealthMonitor.
         """
-        mqtt_ok = self.mqtt_client.test_connection() if self.mqtt_client else False
+        health = health or {}
+        mqtt = health.get("mqtt")
+        mqtt_ok = mqtt["ok"] if mqtt else bool(self.mqtt_client and self.mqtt_client.is_connected)
         if mqtt_ok:
-            self._update_card(self.mqtt_status_label, "Connected", COLORS["success"])
+            self._update_card(self.mqtt_status_label, self._with_rtt("Connected", mqtt), COLORS["success"])
         else:
             self._update_card(self.mqtt_status_label, "Disconnected", "#991b1b")
 
-        db_ok = False
-        if self.db_client:
-            try:
-                db_ok = self.db_client.test_connection()
-            except Exception:
-                db_ok = False
+        db = health.get("db")
+        db_ok = db["ok"] if db else bool(self.db_client and self.db_client.is_connected)
         if db_ok:
-            self._update_card(self.db_status_label, "Synced", COLORS["success"])
+            self._update_card(self.db_status_label, self._with_rtt("Synced", db), COLORS["success"])
         else:
             self._update_card(self.db_status_label, "No Connection", "#991b1b")
 
@@ -171,6 +185,15 @@ class DashboardTab(QWidget):
         except Exception:
             self._update_card(self.emulator_status_label, "Unavailable", "#6b7280")
 
+    @staticmethod
+    def _with_rtt(text, result):
+        """
+        Append a probe's round-trip time to a status text, if known.
+        """
+        if result and result["rtt_ms"] is not None:
+            return f"{text} · {result['rtt_ms']:.0f} ms"
+        return text
+
     def _update_card(self, card, text, bg_color):
         """
         Update a specific card's banner text and background color.
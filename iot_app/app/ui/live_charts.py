@@ -0,0 +1,186 @@
+"""
+Project: IoT Smart Home
+File: live_charts.py
+Description:
+Rolling live charts of device readings for the DashboardTab.
+Reads from the in-memory TimeSeriesStore, decimates each window to at most two points
+per pixel column and redraws on a throttled timer. The x axis is time relative to now,
+so axes stay fixed and a redraw only blits the lines over a cached background;
+the full figure is redrawn only when a line is added, the y range changes or the canvas resizes.
+"""
+
+import math
+import time
+
+from PyQt5.QtCore import QTimer
+from PyQt5.QtWidgets import QWidget, QVBoxLayout
+from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg
+from matplotlib.figure import Figure
+
+from iot_app.app.core.timeseries import decimate_minmax
+from iot_app.app.ui.theme import COLORS
+
+LINE_COLORS = ["#3b82f6", "#facc15", "#10b981", "#ef4444", "#a78bfa"]
+
+
+class LiveChartsPanel(QWidget):
+    """
+    One chart per device, one line per metric, covering the last `window_s` seconds.
+    """
+    def __init__(self, history, device_keys=("dht", "light", "motion", "relay"),
+                 window_s=300, redraw_ms=250, parent=None):
+        """
+        Initialize the figure and start the redraw timer.
+
+        Args:
+            history (TimeSeriesStore): Source of the samples.
+            device_keys (Iterable[str]): Devices to chart, one axes each.
+            window_s (int): Seconds of history shown.
+            redraw_ms (int): Minimum interval between redraws.
+            parent (QWidget): Optional Qt parent.
+        """
+        super().__init__(parent)
+        self.history = history
+        self.device_keys = list(device_keys)
+        self.window_s = window_s
+
+        self._lines = {key: {} for key in self.device_keys}
+        self._revisions = {}
+        self._samples = {}
+        self._background = None
+        self.full_draws = 0
+        self.blits = 0
+
+        # Fixed margins: tight_layout re-measures every tick label on each full draw
+        self.figure = Figure(facecolor=COLORS["background"])
+        self.figure.subplots_adjust(left=0.05, right=0.99, bottom=0.12, top=0.88, wspace=0.3)
+        self.canvas = FigureCanvasQTAgg(self.figure)
+        self.axes = {}
+        for i, key in enumerate(self.device_keys):
+            ax = self.figure.add_subplot(1, len(self.device_keys), i + 1)
+            self._style_axes(ax, key)
+            self.axes[key] = ax
+        self.canvas.mpl_connect("draw_event", self._on_draw)
+
+        layout = QVBoxLayout()
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.addWidget(self.canvas)
+        self.setLayout(layout)
+
+        self._timer = QTimer(self)
+        self._timer.setInterval(redraw_ms)
+        self._timer.timeout.connect(self.redraw)
+        self._timer.start()
+
+    def _style_axes(self, ax, key):
+        """
+        Apply the dark theme and the fixed relative time range to one axes.
+        """
+        ax.set_facecolor(COLORS["card"])
+        ax.set_title(key, color=COLORS["text"], fontsize=9)
+        ax.set_xlim(-self.window_s, 0)
+        ax.set_ylim(0, 1)
+        ax.tick_params(colors=COLORS["text_secondary"], labelsize=7)
+        for spine in ax.spines.values():
+            spine.set_color(COLORS["border"])
+
+    # ==================== Drawing ====================
+
+    def _on_draw(self, event):
+        """
+        After a full draw, cache the static figure and draw the lines on top.
+        """
+        self._background = self.canvas.copy_from_bbox(self.figure.bbox)
+        self._draw_lines()
+
+    def _draw_lines(self):
+        """
+        Draw the (animated) lines onto the canvas buffer.
+        """
+        for key, lines in self._lines.items():
+            ax = self.axes[key]
+            for line in lines.values():
+                ax.draw_artist(line)
+
+    def redraw(self):
+        """
+        Refresh every chart from the history; blit unless the axes themselves changed.
+        Skipped while the panel is not visible.
+        """
+        if not self.isVisible():
+            return
+        now = time.time()
+        since = now - self.window_s
+        full = self._background is None
+
+        for key, ax in self.axes.items():
+            full |= self._sync_lines(key, ax)
+            bins = max(int(ax.bbox.width), 1)
+            revision = self.history.revision(key)
+            refetch = self._revisions.get(key) != revision
+            self._revisions[key] = revision
+
+            lo, hi = math.inf, -math.inf
+            for metric, line in self._lines[key].items():
+                if refetch or (key, metric) not in self._samples:
+                    t, v = self.history.window(key, metric, since)
+                    self._samples[key, metric] = decimate_minmax(t, v, bins)
+                t, v = self._samples[key, metric]
+                line.set_data(t - now, v)
+                if len(v):
+                    lo, hi = min(lo, v.min()), max(hi, v.max())
+            if lo <= hi:
+                full |= self._fit_y(ax, lo, hi)
+
+        if full:
+            self.full_draws += 1
+            self.canvas.draw()
+        else:
+            self.blits += 1
+            self.canvas.restore_region(self._background)
+            self._draw_lines()
+            self.canvas.blit(self.figure.bbox)
+
+    def _sync_lines(self, key, ax):
+        """
+        Add a line for every metric that appeared since the last redraw.
+
+        Returns:
+            bool: True if a line was added (the legend needs a full redraw).
+        """
+        lines = self._lines[key]
+        added = False
+        for metric in self.history.metrics(key):
+            if metric in lines:
+                continue
+            color = LINE_COLORS[len(lines) % len(LINE_COLORS)]
+            lines[metric], = ax.plot([], [], color=color, linewidth=1.2, label=metric, animated=True)
+            added = True
+        if added:
+            ax.legend(loc="upper left", fontsize=7, facecolor=COLORS["card"],
+                      edgecolor=COLORS["border"], labelcolor=COLORS["text"])
+        return added
+
+    @staticmethod
+    def _fit_y(ax, lo, hi):
+        """
+        Rescale the y axis if the data left it or shrank to under a quarter of it.
+
+        Returns:
+            bool: True if the limits changed.
+        """
+        bottom, top = ax.get_ylim()
+        pad = max((hi - lo) * 0.1, 0.5)
+        if lo >= bottom and hi <= top and (hi - lo + 2 * pad) >= (top - bottom) / 4:
+            return False
+        ax.set_ylim(lo - pad, hi + pad)
+        return True
+
+    def get_stats(self):
+        """
+        Return redraw counters.
+
+        Returns:
+            dict: Full figure draws and blitted redraws.
+        """
+        return {"full_draws": self.full_draws, "blits": self.blits}
@@ -4,29 +4,194 @@ File: logs_tab.py
 Description:
 UI module for the LogsTab screen.
 Displays a live console for event logs, with timestamp, color-coded levels,
-clear and save options. Buttons become active only when logs exist.
+level filter, search, clear and save options. Buttons become active only when logs exist.
+Log records are kept in a fixed-capacity ring buffer and shown through a virtualized
+list view, so memory and repaint cost stay flat in long-running sessions. Records arrive
+in per-frame batches from the non-blocking GuiLogSink via LogSignalBridge.
 """
 
+from collections import deque
 from PyQt5.QtWidgets import (
-    QWidget, QVBoxLayout, QLabel, QTextEdit, QPushButton, QHBoxLayout, QFileDialog
+    QWidget, QVBoxLayout, QLabel, QListView, QPushButton, QHBoxLayout, QFileDialog,
+    QComboBox, QLineEdit
 )
-from PyQt5.QtCore import Qt
-from datetime import datetime
+from PyQt5.QtCore import Qt, QAbstractListModel, QModelIndex
+from PyQt5.QtGui import QColor
+from iot_app.app.log_bridge import LogSignalBridge
 from iot_app.app.ui.theme import COLORS, get_font, SIZES
 from iot_app.app.utils.logger import logger, add_gui_sink
 
+# Minimum level shown for each filter option (Loguru severity numbers)
+LEVEL_FILTERS = {
+    "All levels": 0,
+    "DEBUG+": 10,
+    "INFO+": 20,
+    "SUCCESS+": 25,
+    "WARNING+": 30,
+    "ERROR+": 40,
+}
+
+LEVEL_COLORS = {
+    "CRITICAL": COLORS["error"],
+    "ERROR": COLORS["error"],
+    "WARNING": COLORS["hover"],
+    "SUCCESS": COLORS["success"],
+    "INFO": COLORS["success"],
+}
+
+
+class LogListModel(QAbstractListModel):
+    """
+    List model over a ring buffer of log entries.
+    The buffer holds every record up to its capacity; the model exposes the subset
+    matching the current level filter and search text.
+    Entries are tuples (seq, level_no, level_name, text).
+    """
+    def __init__(self, capacity=5000, parent=None):
+        """
+        Initialize an empty model.
+
+        Args:
+            capacity (int): Maximum number of entries retained; the oldest are evicted first.
+            parent (QObject): Optional Qt parent.
+        """
+        super().__init__(parent)
+        self._buffer = deque(maxlen=capacity)
+        self._visible = deque()
+        self._seq = 0
+        self._min_level = 0
+        self._search = ""
+        self._colors = {}
+
+    # ==================== Qt Model Interface ====================
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._visible)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        entry = self._visible[index.row()]
+        if role == Qt.DisplayRole:
+            return entry[3]
+        if role == Qt.ForegroundRole:
+            level = entry[2]
+            if level not in self._colors:
+                self._colors[level] = QColor(LEVEL_COLORS.get(level, COLORS["text"]))
+            return self._colors[level]
+        return None
+
+    # ==================== Buffer Operations ====================
+
+    def append_entries(self, entries):
+        """
+        Append a batch of (level_no, level_name, text) entries to the buffer.
+        Emits one removal for evicted rows and one insertion for new matching rows.
+
+        Args:
+            entries (list[tuple]): New log entries, oldest first.
+        """
+        if not entries:
+            return
+        buffer = self._buffer
+        matching = []
+        for level_no, level_name, text in entries:
+            self._seq += 1
+            entry = (self._seq, level_no, level_name, text)
+            buffer.append(entry)
+            if self._matches(entry):
+                matching.append(entry)
+
+        # Drop visible rows whose entries were evicted from the ring buffer
+        oldest = buffer[0][0]
+        evicted = 0
+        for entry in self._visible:
+            if entry[0] >= oldest:
+                break
+            evicted += 1
+        if evicted:
+            self.beginRemoveRows(QModelIndex(), 0, evicted - 1)
+            for _ in range(evicted):
+                self._visible.popleft()
+            self.endRemoveRows()
+
+        # Entries evicted within this batch are no longer in the buffer
+        matching = [entry for entry in matching if entry[0] >= oldest]
+        if matching:
+            first = len(self._visible)
+            self.beginInsertRows(QModelIndex(), first, first + len(matching) - 1)
+            self._visible.extend(matching)
+            self.endInsertRows()
+
+    def set_filter(self, min_level=None, search=None):
+        """
+        Change the level filter and/or search text and rebuild the visible rows from the buffer.
+
+        Args:
+            min_level (int): Minimum Loguru severity shown.
+            search (str): Case-insensitive substring the message must contain.
+        """
+        if min_level is not None:
+            self._min_level = min_level
+        if search is not None:
+            self._search = search.lower()
+        self.beginResetModel()
+        self._visible = deque(entry for entry in self._buffer if self._matches(entry))
+        self.endResetModel()
+
+    def clear(self):
+        """
+        Remove every entry from the buffer.
+        """
+        self.beginResetModel()
+        self._buffer.clear()
+        self._visible.clear()
+        self.endResetModel()
+
+    def visible_lines(self):
+        """
+        Return the text of every visible row, oldest first.
+
+        Returns:
+            list[str]: Rendered log lines.
+        """
+        return [entry[3] for entry in self._visible]
+
+    def buffered_count(self):
+        """
+        Return the number of entries held in the ring buffer.
+
+        Returns:
+            int: Buffered entry count.
+        """
+        return len(self._buffer)
+
+    def _matches(self, entry):
+        """
+        Check an entry against the current level filter and search text.
+        """
+        return entry[1] >= self._min_level and (not self._search or self._search in entry[3].lower())
+
 
 class LogsTab(QWidget):
     """
-    GUI tab displaying real-time application logs with options to clear and save.
+    GUI tab displaying real-time application logs with options to filter, search, clear and save.
     """
-    def __init__(self):
+    def __init__(self, capacity=5000, frame_ms=33):
         """
         Initialize the Logs tab and connect to the centralized Loguru sink.
+
+        Args:
+            capacity (int): Number of log records kept in the ring buffer.
+            frame_ms (int): Interval at which buffered records are appended to the view.
         """
         super().__init__()
+        self.model = LogListModel(capacity, parent=self)
         self.init_ui()
-        add_gui_sink(self._loguru_sink)
+
+        self.log_sink = add_gui_sink(capacity=capacity * 2)
+        self.log_bridge = LogSignalBridge(self.log_sink, frame_ms=frame_ms, parent=self)
+        self.log_bridge.records_ready.connect(self._append_batch)
 
     # ========================= UI Setup =========================
 
@@ -43,13 +208,45 @@ class LogsTab(QWidget):
         layout.setContentsMargins(SIZES["margin"], SIZES["margin"], SIZES["margin"], SIZES["margin"])
         layout.setSpacing(SIZES["padding"])
 
+        header_layout = QHBoxLayout()
         title = QLabel("📜 Live Logs")
         title.setFont(get_font("title", bold=True))
         title.setStyleSheet(f"color: {COLORS['highlight']};")
-        layout.addWidget(title, alignment=Qt.AlignLeft)
+        header_layout.addWidget(title, alignment=Qt.AlignLeft)
+        header_layout.addStretch()
+
+        self.dropped_label = QLabel("")
+        self.dropped_label.setStyleSheet(f"color: {COLORS['error']};")
+        self.dropped_label.setToolTip("Log records discarded or sampled out while the GUI was overloaded")
+        self.dropped_label.hide()
+        header_layout.addWidget(self.dropped_label)
 
-        self.log_console = QTextEdit()
-        self.log_console.setReadOnly(True)
+        field_style = f"""
+            background-color: {COLORS['secondary']};
+            color: {COLORS['text']};
+            border: 1px solid {COLORS['border']};
+            border-radius: {SIZES['corner_radius']}px;
+            padding: 4px 8px;
+        """
+
+        self.level_filter = QComboBox()
+        self.level_filter.addItems(LEVEL_FILTERS)
+        self.level_filter.setStyleSheet(field_style)
+        self.level_filter.currentTextChanged.connect(self._apply_level_filter)
+        header_layout.addWidget(self.level_filter)
+
+        self.search_box = QLineEdit()
+        self.search_box.setPlaceholderText("🔍 Search logs...")
+        self.search_box.setClearButtonEnabled(True)
+        self.search_box.setStyleSheet(field_style)
+        self.search_box.textChanged.connect(self._apply_search)
+        header_layout.addWidget(self.search_box)
+        layout.addLayout(header_layout)
+
+        self.log_console = QListView()
+        self.log_console.setModel(self.model)
+        self.log_console.setUniformItemSizes(True)
+        self.log_console.setSelectionMode(QListView.ExtendedSelection)
         self.log_console.setStyleSheet(f"""
             background-color: {COLORS['secondary']};
             color: {COLORS['text']};
@@ -100,54 +297,69 @@ class LogsTab(QWidget):
 
     # ========================= Log Handling =========================
 
-    def append_log(self, message: str):
+    def append_log(self, message: str, level_name="INFO", level_no=20):
         """
-        Append a new log message to the text box with timestamp and color.
+        Append a single log line to the console. GUI thread only.
 
         Args:
-            message (str): The log message to append.
+            message (str): The log message to append (already timestamped).
+            level_name (str): Loguru level name, used for coloring.
+            level_no (int): Loguru severity number, used for filtering.
         """
-        timestamp = datetime.now().strftime("%H:%M:%S")
-        full_msg = f"[{timestamp}] {message}"
+        self._append_batch([(level_no, level_name, message)], self.log_sink.dropped)
 
-        if "[ERROR]" in message:
-            color = COLORS["error"]
-        elif "[WARNING]" in message:
-            color = COLORS["hover"]
-        elif "[INFO]" in message:
-            color = COLORS["success"]
-        else:
-            color = COLORS["text"]
+    def _append_batch(self, batch, dropped):
+        """
+        Append a batch of records delivered by the log bridge (runs at most once per frame).
+
+        Args:
+            batch (list[tuple]): Records as (level_no, level_name, line).
+            dropped (int): Total records dropped by the sink so far.
+        """
+        if dropped:
+            self.dropped_label.setText(f"⚠️ {dropped:,} dropped")
+            self.dropped_label.show()
+        if not batch:
+            return
 
-        self.log_console.append(f'<span style="color:{color}">{full_msg}</span>')
-        self.log_console.moveCursor(self.log_console.textCursor().End)
+        scrollbar = self.log_console.verticalScrollBar()
+        at_bottom = scrollbar.value() >= scrollbar.maximum()
+        self.model.append_entries(batch)
+        if at_bottom:
+            self.log_console.scrollToBottom()
 
         self.clear_button.setEnabled(True)
         self.save_button.setEnabled(True)
 
-    def _loguru_sink(self, message):
+    def _apply_level_filter(self, label):
         """
-        Custom sink method to capture Loguru messages into the GUI.
+        Show only records at or above the selected level.
+        """
+        self.model.set_filter(min_level=LEVEL_FILTERS.get(label, 0))
+        self.log_console.scrollToBottom()
 
-        Args:
-            message: Incoming message from Loguru.
+    def _apply_search(self, text):
+        """
+        Show only records containing the search text.
         """
-        self.append_log(message.strip())
+        self.model.set_filter(search=text)
+        self.log_console.scrollToBottom()
 
     def clear_logs(self):
         """
-        Clear the log display and disable action buttons.
+        Clear the log buffer and disable action buttons.
         """
-        self.log_console.clear()
+        self.log_sink.clear()
+        self.model.clear()
         self.clear_button.setEnabled(False)
         self.save_button.setEnabled(False)
 
     def save_logs(self):
         """
-        Open file dialog and save logs to a text file.
+        Open file dialog and save the currently shown logs to a text file.
         """
         path, _ = QFileDialog.getSaveFileName(self, "Save Log File", "logs.txt", "Text Files (*.txt)")
         if path:
             with open(path, 'w', encoding='utf-8') as file:
-                file.write(self.log_console.toPlainText())
+                file.write("\n".join(self.model.visible_lines()) + "\n")
             logger.info(f"[LOGS] Logs exported to '{path}'")
@@ -3,23 +3,189 @@ Project: IoT Smart Home
 File: room_view_tab.py
 Description:
 GUI tab for visualizing smart devices in a room layout.
-Displays active status and latest reading for each emulator.
+Displays active status and latest reading for each home device, redrawn only
+when the DeviceStateStore reports a change (no polling timer).
+Tile styles live in one stylesheet keyed on dynamic properties, so a change only
+re-polishes the affected widget. Fleet devices are shown in a model/view tile grid
+that paints visible tiles only; updates are applied with a bounded budget per frame
+and deferred while the tab is hidden.
 """
 
 from PyQt5.QtWidgets import (
-    QWidget, QLabel, QVBoxLayout, QHBoxLayout, QGridLayout, QFrame, QSizePolicy
+    QWidget, QLabel, QVBoxLayout, QHBoxLayout, QGridLayout, QFrame, QSizePolicy,
+    QListView, QStyledItemDelegate, QStyle
 )
-from PyQt5.QtCore import Qt, QTimer
+from PyQt5.QtCore import Qt, QTimer, QAbstractListModel, QModelIndex, QSize, QRectF
+from PyQt5.QtGui import QColor, QBrush, QPen, QFontMetrics
 from iot_app.app.ui.theme import COLORS, get_font, SIZES
-from iot_app.app.utils.logger import logger
+from iot_app.app.utils.logger import get_logger
+
+_log = get_logger("room", "ROOM")
+
+# Device key in the state store → tile key in the room layout
+TILE_KEYS = {
+    "button": "doorbell",
+    "light": "light",
+    "motion": "motion",
+    "dht": "dht",
+    "relay": "relay",
+}
+
+# Applied once to the tab; tiles and labels switch looks through dynamic properties
+ROOM_STYLE = """
+    QFrame#deviceTile {
+        background-color: #1a1a1a;
+        border: 2px solid #444;
+        border-radius: 8px;
+    }
+    QFrame#deviceTile[active="true"] {
+        background-color: #10b981;
+        border: 2px solid #0f766e;
+    }
+    QFrame#deviceTile QLabel {
+        color: white;
+        border: none;
+        background: transparent;
+    }
+    QLabel#readingLabel {
+        color: white;
+        font-weight: bold;
+        padding-left: 6px;
+    }
+    QLabel#readingLabel[waiting="true"] {
+        color: gray;
+        font-weight: normal;
+    }
+"""
+
+WAITING_TEXT = "🔄 Waiting..."
+
+# Roles of the fleet tile model
+ActiveRole = Qt.UserRole + 1
+ReadingRole = Qt.UserRole + 2
+
+
+def _repolish(widget):
+    """
+    Re-apply the stylesheet to one widget after a dynamic property changed.
+    """
+    style = widget.style()
+    style.unpolish(widget)
+    style.polish(widget)
+
+
+# ==================== Fleet Tile Grid ====================
+
+class FleetTileModel(QAbstractListModel):
+    """
+    One row per fleet device: key, active flag and display reading.
+    New devices are appended; state changes emit dataChanged for their row only.
+    """
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._keys = []
+        self._rows = {}
+        self._active = []
+        self._readings = []
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._keys)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row = index.row()
+        if role == Qt.DisplayRole:
+            return self._keys[row]
+        if role == ActiveRole:
+            return self._active[row]
+        if role == ReadingRole:
+            return self._readings[row]
+        if role == Qt.ToolTipRole:
+            return f"{self._keys[row]}: {self._readings[row] or 'no value'}"
+        return None
+
+    def apply(self, states):
+        """
+        Apply a batch of device states.
+
+        Args:
+            states (list[DeviceState]): Changed fleet device states.
+        """
+        new = [state for state in states if state.device_key not in self._rows]
+        if new:
+            first = len(self._keys)
+            self.beginInsertRows(QModelIndex(), first, first + len(new) - 1)
+            for state in new:
+                self._rows[state.device_key] = len(self._keys)
+                self._keys.append(state.device_key)
+                self._active.append(state.active)
+                self._readings.append(state.reading)
+            self.endInsertRows()
+
+        new_keys = {state.device_key for state in new}
+        for state in states:
+            if state.device_key in new_keys:
+                continue
+            row = self._rows[state.device_key]
+            reading = state.reading
+            if self._active[row] == state.active and self._readings[row] == reading:
+                continue
+            self._active[row] = state.active
+            self._readings[row] = reading
+            index = self.index(row)
+            self.dataChanged.emit(index, index, [ActiveRole, ReadingRole])
+
+
+class TileDelegate(QStyledItemDelegate):
+    """
+    Paints a fleet tile from precomputed brushes and pens; no per-paint style lookups.
+    """
+    TILE_SIZE = QSize(150, 46)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._fill = {True: QBrush(QColor("#10b981")), False: QBrush(QColor("#1a1a1a"))}
+        self._border = {True: QPen(QColor("#0f766e"), 2), False: QPen(QColor("#444444"), 2)}
+        self._text_pen = QPen(QColor("white"))
+        self._muted_pen = QPen(QColor("gray"))
+        self._selected_pen = QPen(QColor(COLORS["highlight"]), 2)
+        self._title_font = get_font("small", bold=True)
+        self._reading_font = get_font("small")
+        self._title_metrics = QFontMetrics(self._title_font)
+
+    def sizeHint(self, option, index):
+        return self.TILE_SIZE
+
+    def paint(self, painter, option, index):
+        active = bool(index.data(ActiveRole))
+        reading = index.data(ReadingRole)
+        rect = QRectF(option.rect).adjusted(3, 3, -3, -3)
+
+        painter.save()
+        painter.setRenderHint(painter.Antialiasing)
+        painter.setBrush(self._fill[active])
+        painter.setPen(self._selected_pen if option.state & QStyle.State_Selected else self._border[active])
+        painter.drawRoundedRect(rect, 6, 6)
+
+        text_rect = rect.adjusted(8, 2, -6, -2)
+        top, bottom = text_rect.adjusted(0, 0, 0, -text_rect.height() / 2), text_rect.adjusted(0, text_rect.height() / 2, 0, 0)
+        painter.setFont(self._title_font)
+        painter.setPen(self._text_pen)
+        painter.drawText(top, Qt.AlignLeft | Qt.AlignVCenter,
+                         self._title_metrics.elidedText(index.data(Qt.DisplayRole), Qt.ElideLeft, int(top.width())))
+        painter.setFont(self._reading_font)
+        painter.setPen(self._text_pen if reading else self._muted_pen)
+        painter.drawText(bottom, Qt.AlignLeft | Qt.AlignVCenter, reading or "—")
+        painter.restore()
 
 
 class RoomViewTab(QWidget):
     """
     Visual interface for showing device status in a smart room layout.
-    Includes live updates from the EmulatorsManager.
+    Subscribes to DeviceStateStore changes through a StateSignalBridge.
     """
-    def __init__(self, db_client, mqtt_client, manager):
+    def __init__(self, db_client, mqtt_client, manager, state_bridge=None, max_updates_per_frame=500, frame_ms=33):
         """
         Initialize the Room View with connections to services.
 
@@ -27,35 +193,53 @@ class RoomViewTab(QWidget):
             db_client: The database client instance.
             mqtt_client: The MQTT client instance.
             manager: The emulators manager instance.
+            state_bridge (StateSignalBridge): Delivers device state changes; None for the placeholder tab.
+            max_updates_per_frame (int): Device updates applied per frame; the rest carry over.
+            frame_ms (int): Delay before applying carried-over updates.
         """
         super().__init__()
         self.db = db_client
         self.mqtt = mqtt_client
         self.manager = manager
+        self.store = state_bridge.store if state_bridge else None
+        self.max_updates_per_frame = max_updates_per_frame
 
         self.device_boxes = {}
         self.reading_labels = {}
         self._doorbell_seconds_left = 0
+        self._button_version = 0
+
+        # Changed keys not yet drawn (dict keeps arrival order and deduplicates)
+        self._pending = {}
+        self._frame_timer = QTimer(self)
+        self._frame_timer.setSingleShot(True)
+        self._frame_timer.setInterval(frame_ms)
+        self._frame_timer.timeout.connect(self._apply_pending)
 
         self._doorbell_timer = QTimer()
         self._doorbell_timer.setInterval(1000)
         self._doorbell_timer.timeout.connect(self._tick_doorbell_timer)
 
+        self.setStyleSheet(ROOM_STYLE)
         self.init_ui()
 
-        self._refresh_timer = QTimer()
-        self._refresh_timer.timeout.connect(self.refresh)
-        self._refresh_timer.start(500)
+        if state_bridge:
+            state_bridge.states_changed.connect(self.on_states_changed)
+            self.on_states_changed(self.store.keys())
 
     # ==================== UI Layout ====================
 
     def init_ui(self):
         """
-        Build the split-screen layout: left (text info) and right (visual map).
+        Build the split-screen layout: left (text info) and right (visual map),
+        with the fleet tile grid below (hidden until a fleet device reports).
         """
+        outer = QVBoxLayout()
+        outer.setContentsMargins(SIZES["margin"], SIZES["margin"],
+                                 SIZES["margin"], SIZES["margin"])
+        outer.setSpacing(SIZES["padding"])
+
         main_layout = QHBoxLayout()
-        main_layout.setContentsMargins(SIZES["margin"], SIZES["margin"],
-                                       SIZES["margin"], SIZES["margin"])
         main_layout.setSpacing(SIZES["padding"])
 
         left_panel = self._build_left_panel()
@@ -63,7 +247,23 @@ class RoomViewTab(QWidget):
 
         main_layout.addWidget(left_panel, 1)
         main_layout.addWidget(right_panel, 2)
-        self.setLayout(main_layout)
+        outer.addLayout(main_layout, 3)
+
+        self.fleet_model = FleetTileModel(self)
+        self.fleet_view = QListView()
+        self.fleet_view.setViewMode(QListView.IconMode)
+        self.fleet_view.setResizeMode(QListView.Adjust)
+        self.fleet_view.setMovement(QListView.Static)
+        self.fleet_view.setUniformItemSizes(True)
+        self.fleet_view.setLayoutMode(QListView.Batched)
+        self.fleet_view.setBatchSize(200)
+        self.fleet_view.setGridSize(TileDelegate.TILE_SIZE)
+        self.fleet_view.setItemDelegate(TileDelegate(self.fleet_view))
+        self.fleet_view.setModel(self.fleet_model)
+        self.fleet_view.setVisible(False)
+        outer.addWidget(self.fleet_view, 2)
+
+        self.setLayout(outer)
 
     def _build_left_panel(self):
         """
@@ -84,8 +284,9 @@ class RoomViewTab(QWidget):
             name.setStyleSheet("background-color: black; color: white; padding: 3px 8px;")
             name.setFont(get_font("normal", bold=True))
 
-            value = QLabel("🔄 Waiting...")
-            value.setStyleSheet("color: white; font-weight: bold; padding-left: 6px;")
+            value = QLabel(WAITING_TEXT)
+            value.setObjectName("readingLabel")
+            value.setProperty("waiting", True)
             value.setFont(get_font("small"))
 
             row.addWidget(name)
@@ -116,13 +317,13 @@ class RoomViewTab(QWidget):
 
         for (row, col), (text, key) in positions.items():
             box = QFrame()
-            box.setStyleSheet(self._style_inactive())
+            box.setObjectName("deviceTile")
+            box.setProperty("active", False)
             box.setFixedSize(120, 100)
 
             label = QLabel(text)
             label.setFont(get_font("normal", bold=True))
             label.setAlignment(Qt.AlignCenter)
-            label.setStyleSheet("color: white; border: none;")
 
             layout = QVBoxLayout()
             layout.addStretch()
@@ -137,26 +338,6 @@ class RoomViewTab(QWidget):
         panel.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
         return panel
 
-    # ==================== Style Helpers ====================
-
-    def _style_inactive(self):
-        return """
-            QFrame {
-                background-color: #1a1a1a;
-                border: 2px solid #444;
-                border-radius: 8px;
-            }
-        """
-
-    def _style_active(self):
-        return """
-            QFrame {
-                background-color: #10b981;
-                border: 2px solid #0f766e;
-                border-radius: 8px;
-            }
-        """
-
     # ==================== Refresh and Update ====================
 
     def _tick_doorbell_timer(self):
@@ -166,56 +347,82 @@ class RoomViewTab(QWidget):
         self._doorbell_seconds_left -= 1
         if self._doorbell_seconds_left <= 0:
             self._doorbell_timer.stop()
-        self.refresh()
+        self._render_doorbell()
 
-    def refresh(self):
+    def on_states_changed(self, device_keys):
         """
-        Refresh UI with latest emulator states and readings.
+        Queue changed devices for drawing and apply up to one frame's budget now.
+
+        Args:
+            device_keys (list[str]): Changed device keys from the state store.
         """
-        if self.manager is None:
+        if self.store is None:
             return
+        pending = self._pending
+        for key in device_keys:
+            pending[key] = None
+        if self.isVisible():
+            self._apply_pending()
 
-        key_map = {
-            "button": "doorbell",
-            "light": "light",
-            "motion": "motion",
-            "dht": "dht",
-            "relay": "relay",
-        }
-
-        for emu_key, gui_key in key_map.items():
-            emulator = self.manager.get(emu_key)
-            if emulator is None:
-                continue
-
-            active = getattr(emulator, "active", False)
-            reading = getattr(emulator, "current_value", None)
-
-            if emu_key == "button":
-                if active and self._doorbell_seconds_left > 0:
-                    reading = f"Pressed ({self._doorbell_seconds_left})"
-                else:
-                    reading = None
+    def showEvent(self, event):
+        """
+        Draw the changes that accumulated while the tab was hidden.
+        """
+        super().showEvent(event)
+        if self._pending:
+            self._apply_pending()
 
-            if emu_key == "relay":
-                if not active:
-                    reading = None
-                elif reading == "1":
-                    reading = "ON"
-                elif reading == "0":
-                    reading = "OFF"
+    def _apply_pending(self):
+        """
+        Draw at most max_updates_per_frame queued devices; schedule the rest for the next frame.
+        """
+        if not self._pending or not self.isVisible():
+            return
+        keys = []
+        for key in self._pending:
+            keys.append(key)
+            if len(keys) >= self.max_updates_per_frame:
+                break
+        for key in keys:
+            del self._pending[key]
+
+        fleet = []
+        for key, state in self.store.snapshot(keys).items():
+            if key in TILE_KEYS:
+                self._render_home(key, state)
+            else:
+                fleet.append(state)
+        if fleet:
+            self.fleet_model.apply(fleet)
+            if not self.fleet_view.isVisible():
+                self.fleet_view.setVisible(True)
 
-            if isinstance(reading, dict):
-                reading = f"{reading.get('temperature', '')}, {reading.get('humidity', '')}".strip(", ")
+        if self._pending and not self._frame_timer.isActive():
+            self._frame_timer.start()
 
-            if reading is not None and not isinstance(reading, str):
-                reading = str(reading)
+    def _render_home(self, key, state):
+        """
+        Draw one home device; a new button press starts the doorbell pulse.
+        """
+        if key == "button":
+            if state.active and state.version != self._button_version:
+                self.pulse_doorbell()
+            self._button_version = state.version
+            return
+        self.update_device_state(TILE_KEYS[key], state.active, state.reading)
 
-            self.update_device_state(gui_key, active, reading)
+    def _render_doorbell(self):
+        """
+        Show the doorbell tile lit with its countdown while a pulse is running.
+        """
+        pressed = self._doorbell_seconds_left > 0
+        reading = f"Pressed ({self._doorbell_seconds_left})" if pressed else None
+        self.update_device_state("doorbell", pressed, reading)
 
     def update_device_state(self, device_key: str, active: bool, reading: str = None):
         """
-        Update the visual box and label for a given device.
+        Update the visual box and label for a given device. Only properties that
+        changed are set, and only the affected widget is re-polished.
 
         Args:
             device_key (str): The device ID used in the GUI.
@@ -224,27 +431,26 @@ class RoomViewTab(QWidget):
         """
         changed = False
 
-        if device_key in self.device_boxes:
-            box = self.device_boxes[device_key]
-            new_style = self._style_active() if active else self._style_inactive()
-            if box.styleSheet() != new_style:
-                box.setStyleSheet(new_style)
-                changed = True
+        box = self.device_boxes.get(device_key)
+        if box is not None and box.property("active") != active:
+            box.setProperty("active", active)
+            _repolish(box)
+            changed = True
 
-        if device_key in self.reading_labels:
-            label = self.reading_labels[device_key]
-            new_text = reading if reading is not None else "🔄 Waiting..."
+        label = self.reading_labels.get(device_key)
+        if label is not None:
+            new_text = reading if reading is not None else WAITING_TEXT
             if label.text() != new_text:
                 label.setText(new_text)
                 changed = True
-
-            if reading:
-                label.setStyleSheet("color: white; font-weight: bold; padding-left: 6px;")
-            else:
-                label.setStyleSheet("color: gray; font-weight: normal;")
+            waiting = not reading
+            if label.property("waiting") != waiting:
+                label.setProperty("waiting", waiting)
+                _repolish(label)
 
         if changed:
-            logger.info(f"[ROOM] {device_key} updated → {'ON' if active else 'OFF'}, Reading: {reading or '-'}")
+            # Fires on every reading change, so DEBUG with lazy formatting
+            _log.debug("{} updated → {}, Reading: {}", device_key, "ON" if active else "OFF", reading or "-")
 
     def pulse_doorbell(self, duration_ms: int = 7000):
         """
@@ -254,17 +460,5 @@ class RoomViewTab(QWidget):
             duration_ms (int): Time in milliseconds for the bell to stay active.
         """
         self._doorbell_seconds_left = duration_ms // 1000
-        QTimer.singleShot(0, self._start_doorbell_timer_safe)
-
-    def _start_doorbell_timer_safe(self):
-        """
-        Ensure doorbell timer is started within GUI thread context.
-        """
         self._doorbell_timer.start()
-
-    def pulse_button(self):
-        """
-        Compatibility alias for external MQTT calls.
-        Triggers the doorbell pulse animation.
-        """
-        self.pulse_doorbell()
+        self._render_doorbell()
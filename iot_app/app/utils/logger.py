@@ -3,12 +3,17 @@ Project: IoT Smart Home
 File: logger.py
 Description:
 Centralized logger configuration using Loguru.
-Supports colored output, file logging, and optional GUI sink.
+Supports colored output, file logging, and an optional non-blocking GUI sink.
+Hot paths log through get_logger(): lazy `{}` formatting, per-subsystem level
+gates, and sampled or rate-limited records for per-message events.
 """
 
 from loguru import logger
 import sys
 import os
+import threading
+import time
+from collections import deque
 from datetime import datetime
 
 # ==================== Log Directory & File Setup ====================
@@ -25,18 +30,28 @@ log_file = os.path.join(LOG_DIR, f"{timestamp}.log")
 # Remove any existing handlers to avoid duplication
 logger.remove()
 
-# Console handler with colored output and detailed formatting
-logger.add(
+CONSOLE_FORMAT = ("<green>{time:HH:mm:ss}</green> | "
+                  "<level>{level: <8}</level> | "
+                  "<cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> - "
+                  "<level>{message}</level>")
+
+# Minimum level accepted by each registered handler, used to skip records nobody would emit
+_handler_levels = {}
+
+# Console handler with colored output and detailed formatting.
+# INFO by default: at DEBUG every received message is formatted and printed;
+# IOT_CONSOLE_LEVEL=DEBUG brings the per-message records back
+CONSOLE_LEVEL = os.environ.get("IOT_CONSOLE_LEVEL", "INFO").upper()
+_console_handler_id = logger.add(
     sys.stdout,
     colorize=True,
-    format="<green>{time:HH:mm:ss}</green> | "
-           "<level>{level: <8}</level> | "
-           "<cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> - "
-           "<level>{message}</level>"
+    format=CONSOLE_FORMAT,
+    level=CONSOLE_LEVEL
 )
+_handler_levels[_console_handler_id] = logger.level(CONSOLE_LEVEL).no
 
 # File handler with rotation and compression
-logger.add(
+_file_handler_id = logger.add(
     log_file,
     rotation="1 week",
     retention="2 weeks",
@@ -44,14 +59,308 @@ logger.add(
     level="INFO",
     format="{time:YYYY-MM-DD HH:mm:ss} | {level: <8} | {name}:{function}:{line} - {message}"
 )
+_handler_levels[_file_handler_id] = logger.level("INFO").no
 
 # ==================== GUI Sink Support ====================
 
-def add_gui_sink(gui_callback):
+GUI_FORMAT = "{level.icon} [{level}] {message}"
+
+
+class GuiLogSink:
+    """
+    Non-blocking Loguru sink that buffers records for a GUI consumer.
+    Loguru calls it synchronously on the logging thread (paho, DB writer, workers),
+    so it only formats the line and appends to a bounded deque; the GUI drains it
+    in batches on its own thread. Under overload, records below WARNING are sampled
+    and, once the buffer is full, dropped — every lost record is counted.
+    """
+    def __init__(self, capacity=10000, overload_ratio=0.5, sample_every=10):
+        """
+        Initialize the sink buffer.
+
+        Args:
+            capacity (int): Maximum number of buffered records.
+            overload_ratio (float): Fill level (0–1) above which low-level records are sampled.
+            sample_every (int): While overloaded, keep one in this many records below WARNING.
+        """
+        self.capacity = capacity
+        self.overload_level = int(capacity * overload_ratio)
+        self.sample_every = max(1, sample_every)
+        self.handler_id = None
+        self.dropped = 0
+
+        # deque.append / popleft are atomic in CPython, so producers and the GUI need no lock
+        self._records = deque(maxlen=capacity)
+        self._sample_counter = 0
+
+    def write(self, message):
+        """
+        Loguru sink entry point. Never blocks the calling thread.
+
+        Args:
+            message: Formatted Loguru message (with .record attached).
+        """
+        record = message.record
+        level = record["level"]
+        depth = len(self._records)
+
+        if depth >= self.overload_level and level.no < 30:
+            self._sample_counter += 1
+            if depth >= self.capacity or self._sample_counter % self.sample_every:
+                self.dropped += 1
+                return
+        elif depth >= self.capacity:
+            # Buffer full and the record matters: the oldest buffered record gives way
+            self.dropped += 1
+
+        line = f"[{record['time']:%H:%M:%S}] {message.strip()}"
+        self._records.append((level.no, level.name, line))
+
+    def drain(self, max_items=None):
+        """
+        Pop buffered records, oldest first. Intended for the GUI thread.
+
+        Args:
+            max_items (int): Maximum number of records returned (None for all).
+
+        Returns:
+            list[tuple]: Records as (level_no, level_name, line).
+        """
+        count = len(self._records)
+        if max_items is not None:
+            count = min(count, max_items)
+        popleft = self._records.popleft
+        return [popleft() for _ in range(count)]
+
+    def pending(self):
+        """
+        Return the number of buffered records.
+
+        Returns:
+            int: Records waiting to be drained.
+        """
+        return len(self._records)
+
+    def clear(self):
+        """
+        Discard every buffered record.
+        """
+        self._records.clear()
+
+
+def add_gui_sink(capacity=10000, level="INFO"):
+    """
+    Register a buffered, non-blocking log sink for GUI components (e.g., LogsTab).
+
+    Args:
+        capacity (int): Maximum number of records buffered between GUI drains.
+        level (str): Minimum level forwarded to the GUI.
+
+    Returns:
+        GuiLogSink: The sink; drain it from the GUI thread.
+    """
+    sink = GuiLogSink(capacity)
+    sink.handler_id = logger.add(sink.write, format=GUI_FORMAT, level=level)
+    _handler_levels[sink.handler_id] = logger.level(level).no
+    _levels_changed()
+    return sink
+
+
+# ==================== Console Level Control ====================
+
+def set_console_level(level=CONSOLE_LEVEL):
     """
-    Add a custom log sink for GUI components (e.g., QTextEdit).
+    Replace the console handler with one filtered at the given level.
+    Used by headless runs where per-message DEBUG/INFO output would dominate CPU time.
 
     Args:
-        gui_callback (Callable): Function to handle log messages.
+        level (str): Minimum level printed to stdout (e.g., 'WARNING').
+    """
+    global _console_handler_id
+    logger.remove(_console_handler_id)
+    _handler_levels.pop(_console_handler_id, None)
+    _console_handler_id = logger.add(sys.stdout, colorize=True, format=CONSOLE_FORMAT, level=level)
+    _handler_levels[_console_handler_id] = logger.level(level).no
+    _levels_changed()
+
+
+# ==================== Subsystem Logging Facade ====================
+
+# Per-subsystem minimum levels, e.g. IOT_LOG_LEVELS="mqtt=WARNING,emulator=ERROR"
+_subsystem_levels = {}
+for _item in os.environ.get("IOT_LOG_LEVELS", "").split(","):
+    if "=" in _item:
+        _name, _level = _item.split("=", 1)
+        _subsystem_levels[_name.strip().lower()] = _level.strip().upper()
+
+_LEVEL_NO = {name: logger.level(name).no
+             for name in ("TRACE", "DEBUG", "INFO", "SUCCESS", "WARNING", "ERROR", "CRITICAL")}
+_levels_generation = 0
+_subsystem_loggers = {}
+
+
+def _levels_changed():
+    """
+    Invalidate the cached thresholds of every subsystem logger.
     """
-    logger.add(gui_callback, format="{level.icon} [{level}] {message}", level="INFO")
+    global _levels_generation
+    _levels_generation += 1
+
+
+def set_subsystem_level(subsystem, level=None):
+    """
+    Override the minimum level of one subsystem (None removes the override).
+
+    Args:
+        subsystem (str): Subsystem name passed to get_logger (e.g., 'mqtt').
+        level (str): Minimum level such as 'DEBUG' or 'WARNING'.
+    """
+    if level is None:
+        _subsystem_levels.pop(subsystem, None)
+    else:
+        _subsystem_levels[subsystem] = level.upper()
+    _levels_changed()
+
+
+def get_logger(subsystem, tag=None):
+    """
+    Return the shared logging facade for a subsystem.
+
+    Args:
+        subsystem (str): Subsystem name used for level overrides (e.g., 'mqtt', 'db').
+        tag (str): Prefix shown in messages (defaults to the subsystem name in upper case).
+
+    Returns:
+        SubsystemLogger: Facade bound to the subsystem.
+    """
+    facade = _subsystem_loggers.get(subsystem)
+    if facade is None:
+        facade = _subsystem_loggers.setdefault(subsystem, SubsystemLogger(subsystem, tag or subsystem.upper()))
+    return facade
+
+
+class SubsystemLogger:
+    """
+    Thin facade over Loguru for hot paths.
+    A record below the subsystem's threshold costs one integer comparison: the message
+    template is only formatted with its `{}` arguments once a handler will accept it.
+    Per-message events go through sampled() or rate_limited() instead of one record each.
+    """
+    def __init__(self, subsystem, tag):
+        """
+        Initialize the facade.
+
+        Args:
+            subsystem (str): Subsystem name used for level overrides.
+            tag (str): Prefix shown in messages, e.g. 'MQTT' → '[MQTT] ...'.
+        """
+        self.subsystem = subsystem
+        self._prefix = f"[{tag}] "
+        self._logger = logger.bind(subsystem=subsystem)
+        self._generation = -1
+        self._threshold = 0
+        self._lock = threading.Lock()
+        self._sample_counts = {}
+        self._rate_state = {}
+
+    def threshold(self):
+        """
+        Return the minimum severity number that will be emitted for this subsystem.
+        The threshold is the stricter of the subsystem override and the most permissive handler.
+
+        Returns:
+            int: Loguru severity number.
+        """
+        if self._generation != _levels_generation:
+            floor = min(_handler_levels.values(), default=0)
+            override = _subsystem_levels.get(self.subsystem)
+            self._threshold = max(floor, logger.level(override).no if override else 0)
+            self._generation = _levels_generation
+        return self._threshold
+
+    def enabled(self, level="DEBUG"):
+        """
+        Check whether a record at the given level would be emitted.
+
+        Args:
+            level (str): Level name.
+
+        Returns:
+            bool: True if enabled.
+        """
+        return logger.level(level).no >= self.threshold()
+
+    def log(self, level, message, *args):
+        """
+        Emit a record with lazily formatted `{}` arguments if the level is enabled.
+
+        Args:
+            level (str): Level name.
+            message (str): Message template with `{}` placeholders.
+            *args: Values substituted into the template.
+        """
+        if _LEVEL_NO[level] >= self.threshold():
+            self._logger.opt(depth=1).log(level, self._prefix + message, *args)
+
+    # The level shortcuts inline the gate so a filtered record costs a single comparison
+
+    def debug(self, message, *args):
+        if 10 >= self.threshold():
+            self._logger.opt(depth=1).debug(self._prefix + message, *args)
+
+    def info(self, message, *args):
+        if 20 >= self.threshold():
+            self._logger.opt(depth=1).info(self._prefix + message, *args)
+
+    def success(self, message, *args):
+        if 25 >= self.threshold():
+            self._logger.opt(depth=1).success(self._prefix + message, *args)
+
+    def warning(self, message, *args):
+        if 30 >= self.threshold():
+            self._logger.opt(depth=1).warning(self._prefix + message, *args)
+
+    def error(self, message, *args):
+        if 40 >= self.threshold():
+            self._logger.opt(depth=1).error(self._prefix + message, *args)
+
+    def sampled(self, every, level, message, *args):
+        """
+        Emit one record out of every `every` calls with the same message template.
+
+        Args:
+            every (int): Sampling period.
+            level (str): Level name.
+            message (str): Message template with `{}` placeholders.
+            *args: Values substituted into the template.
+        """
+        if _LEVEL_NO[level] < self.threshold():
+            return
+        with self._lock:
+            count = self._sample_counts.get(message, 0)
+            self._sample_counts[message] = count + 1
+        if count % every == 0:
+            self._logger.opt(depth=1).log(level, f"{self._prefix}{message} (1 in {every})", *args)
+
+    def rate_limited(self, interval_s, level, message, *args):
+        """
+        Emit at most one record per interval for the same message template,
+        reporting how many were suppressed since the last one.
+
+        Args:
+            interval_s (float): Minimum seconds between records.
+            level (str): Level name.
+            message (str): Message template with `{}` placeholders.
+            *args: Values substituted into the template.
+        """
+        if _LEVEL_NO[level] < self.threshold():
+            return
+        now = time.monotonic()
+        with self._lock:
+            last, suppressed = self._rate_state.get(message, (0.0, 0))
+            if now - last < interval_s:
+                self._rate_state[message] = (last, suppressed + 1)
+                return
+            self._rate_state[message] = (now, 0)
+        suffix = f" (+{suppressed} suppressed)" if suppressed else ""
+        self._logger.opt(depth=1).log(level, self._prefix + message + suffix, *args)
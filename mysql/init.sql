@@ -29,9 +29,70 @@ FLUSH PRIVILEGES;
 -- ==========================================
 
 -- Create the device_data table if it doesn't exist
+-- Partitioned by month on timestamp; DBClient.ensure_partitions() splits
+-- pmax into upcoming monthly partitions at connect time
 CREATE TABLE IF NOT EXISTS device_data (
-    id INT AUTO_INCREMENT PRIMARY KEY,       -- Unique ID for each record
+    id INT AUTO_INCREMENT,                   -- Unique ID for each record
     device_type VARCHAR(50),                 -- Type of device (e.g., dht, light)
     value TEXT,                              -- Sensor reading or value
-    timestamp DATETIME DEFAULT CURRENT_TIMESTAMP  -- Auto-filled timestamp
+    timestamp DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,  -- Auto-filled timestamp
+    PRIMARY KEY (id, timestamp),             -- Partition column must be part of the key
+    INDEX idx_type_ts (device_type, timestamp),
+    INDEX idx_ts (timestamp)
+)
+PARTITION BY RANGE (TO_DAYS(timestamp)) (
+    PARTITION p_start VALUES LESS THAN (TO_DAYS('2025-07-01')),
+    PARTITION pmax VALUES LESS THAN MAXVALUE
+);
+
+-- ==========================================
+-- 📈 Numeric Readings (narrow metric table)
+-- ==========================================
+
+-- One row per device metric with a numeric value, so range scans and
+-- aggregates run on indexed DOUBLE columns instead of parsing text
+CREATE TABLE IF NOT EXISTS device_readings (
+    id BIGINT AUTO_INCREMENT,                -- Unique ID for each reading
+    device_id VARCHAR(64) NOT NULL,          -- Device key (e.g., dht, kitchen/dht/12)
+    device_type VARCHAR(20) NOT NULL,        -- Type of device (e.g., dht, light)
+    metric VARCHAR(20) NOT NULL,             -- Metric name (e.g., temperature, lux)
+    value DOUBLE NOT NULL,                   -- Numeric reading
+    ts DATETIME(3) NOT NULL,                 -- Reading time (millisecond precision)
+    PRIMARY KEY (id, ts),                    -- Partition column must be part of the key
+    INDEX idx_device_metric_ts (device_id, metric, ts),   -- Per-device ranges, latest per device
+    INDEX idx_type_ts (device_type, ts)                   -- Per-type ranges
+)
+PARTITION BY RANGE (TO_DAYS(ts)) (
+    PARTITION p_start VALUES LESS THAN (TO_DAYS('2025-07-01')),
+    PARTITION pmax VALUES LESS THAN MAXVALUE
+);
+
+-- ==========================================
+-- 📉 Rollups (downsampled history)
+-- ==========================================
+
+-- Per-device aggregates of device_readings at 1-minute, 1-hour and 1-day
+-- resolution. Only mergeable aggregates are stored (min, max, sum, count),
+-- so RollupJob can fold new readings into existing buckets incrementally;
+-- avg is sum_value / sample_count
+CREATE TABLE IF NOT EXISTS device_readings_1m (
+    device_id VARCHAR(64) NOT NULL,          -- Device key (e.g., dht, kitchen/dht/12)
+    device_type VARCHAR(20) NOT NULL,        -- Type of device (e.g., dht, light)
+    metric VARCHAR(20) NOT NULL,             -- Metric name (e.g., temperature, lux)
+    bucket DATETIME NOT NULL,                -- Bucket start
+    min_value DOUBLE NOT NULL,
+    max_value DOUBLE NOT NULL,
+    sum_value DOUBLE NOT NULL,
+    sample_count INT UNSIGNED NOT NULL,
+    PRIMARY KEY (device_id, metric, bucket)
+);
+
+CREATE TABLE IF NOT EXISTS device_readings_1h LIKE device_readings_1m;
+CREATE TABLE IF NOT EXISTS device_readings_1d LIKE device_readings_1m;
+
+-- Highest device_readings.id already folded into each rollup table
+CREATE TABLE IF NOT EXISTS rollup_watermarks (
+    rollup_table VARCHAR(32) PRIMARY KEY,
+    last_id BIGINT NOT NULL DEFAULT 0,
+    updated_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
 );